@@ -0,0 +1,171 @@
+import os
+import json
+
+import numpy as np
+
+# 컬럼별 바이너리 파일 ({컬럼명}.bin) + meta.json 저장소 (meta.json 갱신이 commit 시점)
+
+def write_column_store(store_dir: str, columns: dict, meta: dict = None):
+    """
+    store_dir: 컬럼별 바이너리 파일 ({컬럼명}.bin) 과 meta.json 을 저장할 폴더
+    columns: {컬럼명: 1차원 NumPy 배열} (모두 같은 길이, 고정 폭 dtype)
+    meta: meta.json 에 함께 기록할 정보
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    meta_file = os.path.join(store_dir, 'meta.json')
+
+    # meta.json 이 없으면 유효하지 않은 store 로 취급 -> 쓰는 도중 중단되면 다시 생성
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+
+    n_rows = None
+    column_dtypes = {}
+
+    for name, values in columns.items():
+
+        values = np.ascontiguousarray(values)
+
+        if values.ndim != 1 or values.dtype.hasobject:
+            raise ValueError(f"Error: '{name}' 컬럼은 고정 폭 dtype 의 1차원 배열이어야 합니다.")
+
+        if n_rows is None:
+            n_rows = len(values)
+        elif len(values) != n_rows:
+            raise ValueError("Error: 'columns'에 포함된 컬럼들의 길이가 일치하지 않습니다.")
+
+        values.tofile(os.path.join(store_dir, f'{name}.bin'))
+        column_dtypes[name] = values.dtype.str
+
+    store_meta = dict(meta or {})
+    store_meta.update({'n_rows': int(n_rows or 0), 'columns': column_dtypes})
+
+    with open(f'{meta_file}.tmp', 'w') as f:
+        json.dump(store_meta, f)
+    os.replace(f'{meta_file}.tmp', meta_file)
+
+    return store_meta
+
+def read_column_store_meta(store_dir: str):
+
+    meta_file = os.path.join(store_dir, 'meta.json')
+
+    if not os.path.exists(meta_file):
+        return None
+
+    with open(meta_file) as f:
+        return json.load(f)
+
+def read_column_store(store_dir: str, columns: list = None, mmap: bool = True):
+
+    # 필요한 컬럼만 memory-map 으로 읽음 (column projection)
+    meta = read_column_store_meta(store_dir)
+
+    if meta is None:
+        raise FileNotFoundError(f"Error: column store 가 없습니다: {store_dir}")
+
+    columns = list(meta['columns']) if columns is None else list(columns)
+    n_rows = meta['n_rows']
+    result = {}
+
+    for name in columns:
+
+        if name not in meta['columns']:
+            raise KeyError(f"Error: '{name}' 컬럼이 column store 에 없습니다.")
+
+        dtype = np.dtype(meta['columns'][name])
+        column_file = os.path.join(store_dir, f'{name}.bin')
+
+        if n_rows == 0:
+            result[name] = np.empty(0, dtype=dtype)
+        elif mmap:
+            result[name] = np.memmap(column_file, dtype=dtype, mode='r', shape=(n_rows,))
+        else:
+            result[name] = np.fromfile(column_file, dtype=dtype, count=n_rows)
+
+    return result, meta
+
+def json_safe_labels(labels):
+
+    # NumPy scalar 를 json 으로 저장 가능한 파이썬 값으로 변환
+    return [label.item() if hasattr(label, 'item') else label for label in labels]
+
+def fixed_width_strings(values, dtype, name: str = 'values'):
+
+    # 문자열을 고정 폭 dtype 으로 변환 (NumPy 는 긴 값을 조용히 잘라내므로 변환 전에 길이 확인)
+    dtype = np.dtype(dtype)
+    values = np.asarray(values).astype(dtype.kind)
+    width = dtype.itemsize // (4 if dtype.kind == 'U' else 1)
+
+    if len(values) > 0:
+        too_long = np.char.str_len(values) > width
+        if too_long.any():
+            raise ValueError(f"Error: '{name}' 값이 고정 폭 {dtype} 보다 깁니다: {values[too_long][:5].tolist()}")
+
+    return np.ascontiguousarray(values, dtype=dtype)
+
+def append_column_store(store_dir: str, columns: dict, meta_update: dict = None):
+
+    # 기존 column store 뒤에 행을 추가 (meta.json 의 n_rows 갱신이 commit 시점)
+    meta = read_column_store_meta(store_dir)
+
+    if meta is None:
+        return write_column_store(store_dir, columns, meta_update)
+
+    if set(columns) != set(meta['columns']):
+        raise ValueError("Error: 'columns'의 컬럼 구성이 기존 column store 와 일치하지 않습니다.")
+
+    n_rows = meta['n_rows']
+    n_new = None
+    typed_columns = {}
+
+    for name, dtype in meta['columns'].items():
+
+        dtype = np.dtype(dtype)
+        values = np.asarray(columns[name])
+
+        if dtype.kind in 'US':
+            typed_columns[name] = fixed_width_strings(values, dtype, name)
+        else:
+            typed_columns[name] = np.ascontiguousarray(values, dtype=dtype)
+
+        if n_new is None:
+            n_new = len(values)
+        elif len(values) != n_new:
+            raise ValueError("Error: 'columns'에 포함된 컬럼들의 길이가 일치하지 않습니다.")
+
+    for name, values in typed_columns.items():
+
+        column_file = os.path.join(store_dir, f'{name}.bin')
+
+        # commit 되지 않은 꼬리 (이전 append 도중 중단된 부분) 는 잘라낸 뒤 추가
+        with open(column_file, 'r+b' if os.path.exists(column_file) else 'wb') as f:
+            f.truncate(n_rows * values.dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+
+    meta['n_rows'] = n_rows + int(n_new or 0)
+    meta.update(meta_update or {})
+
+    meta_file = os.path.join(store_dir, 'meta.json')
+    with open(f'{meta_file}.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(f'{meta_file}.tmp', meta_file)
+
+    return meta
+
+def truncate_column_store(store_dir: str, n_rows: int):
+
+    # n_rows 이후 행은 무효 처리 (파일 꼬리는 다음 append_column_store 에서 잘림)
+    meta = read_column_store_meta(store_dir)
+
+    if meta is None or meta['n_rows'] <= n_rows:
+        return meta
+
+    meta['n_rows'] = int(n_rows)
+
+    meta_file = os.path.join(store_dir, 'meta.json')
+    with open(f'{meta_file}.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(f'{meta_file}.tmp', meta_file)
+
+    return meta
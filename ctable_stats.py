@@ -0,0 +1,324 @@
+import numpy as np
+import pandas as pd
+
+# ctable (ct00 / ct01 / ct10 / ct11) 배열에서 RR / Wald CI / chi-square / Fisher p-value / p.adjust 를 일괄 계산
+# (rr_calculator_20250611.ipynb 의 R epitools::riskratio + fisher.test + p.adjust 대체, full_to_final 결과를 입력으로 사용)
+
+_log_factorial_table = np.zeros(1)
+
+def log_factorial(n):
+
+    # log(n!) 조회 테이블 (필요한 최대값까지 한 번만 늘림)
+    global _log_factorial_table
+
+    from scipy import special
+
+    n = np.asarray(n, dtype=np.int64)
+    max_n = int(n.max()) if n.size > 0 else 0
+
+    if max_n >= len(_log_factorial_table):
+        size = max(max_n + 1, 2 * len(_log_factorial_table))
+        _log_factorial_table = special.gammaln(np.arange(size, dtype=np.float64) + 1)
+
+    return _log_factorial_table[n]
+
+def hypergeom_logpmf(x, m, n, k):
+
+    # 흰 공 m 개, 검은 공 n 개에서 k 개를 뽑을 때 흰 공이 x 개일 log 확률
+    return log_factorial(m) - log_factorial(x) - log_factorial(m - x) \
+         + log_factorial(n) - log_factorial(k - x) - log_factorial(n - k + x) \
+         - log_factorial(m + n) + log_factorial(k) + log_factorial(m + n - k)
+
+def stirling_error(n):
+
+    # log(n!) - log(sqrt(2 pi n) (n / e)^n) (R stirlerr 와 같은 급수, n <= 15 는 log-factorial 테이블 사용)
+    n = np.asarray(n, dtype=np.float64)
+    result = np.zeros(n.shape)
+
+    small = (n > 0) & (n <= 15)
+    small_n = n[small]
+    result[small] = log_factorial(small_n.astype(np.int64)) - (small_n + 0.5) * np.log(small_n) + small_n - 0.5 * np.log(2 * np.pi)
+
+    large = n > 15
+    large_n = n[large]
+    nn = large_n * large_n
+    s0, s1, s2, s3, s4 = 1 / 12, 1 / 360, 1 / 1260, 1 / 1680, 1 / 1188
+    result[large] = np.select(
+        [large_n > 500, large_n > 80, large_n > 35],
+        [
+            (s0 - s1 / nn) / large_n,
+            (s0 - (s1 - s2 / nn) / nn) / large_n,
+            (s0 - (s1 - (s2 - s3 / nn) / nn) / nn) / large_n
+        ],
+        (s0 - (s1 - (s2 - (s3 - s4 / nn) / nn) / nn) / nn) / large_n
+    )
+
+    return result
+
+def binomial_deviance(x, mu):
+
+    # x log(x / mu) + mu - x 를 x ~ mu 에서도 정확하게 (R bd0 와 같은 급수)
+    x = np.asarray(x, dtype=np.float64)
+    mu = np.asarray(mu, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = x * np.log(x / mu) + mu - x
+
+    near = np.abs(x - mu) < 0.1 * (x + mu)
+    idx = np.flatnonzero(near)
+
+    v = (x[idx] - mu[idx]) / (x[idx] + mu[idx])
+    s = (x[idx] - mu[idx]) * v
+    ej = 2 * x[idx] * v
+    v = v * v
+
+    for j in range(1, 1000):
+
+        if idx.size == 0:
+            break
+
+        ej = ej * v
+        s_next = s + ej / (2 * j + 1)
+        done = s_next == s
+
+        result[idx[done]] = s_next[done]
+        idx, s, ej, v = idx[~done], s_next[~done], ej[~done], v[~done]
+
+    return result
+
+def binomial_logpmf(x, size, p, q):
+
+    # R dbinom_raw 의 log 버전 (0 < x < size 인 경우만 사용)
+    lc = stirling_error(size) - stirling_error(x) - stirling_error(size - x) \
+       - binomial_deviance(x, size * p) - binomial_deviance(size - x, size * q)
+    lf = np.log(2 * np.pi) + np.log(x) + np.log1p(-x / size)
+
+    return lc - 0.5 * lf
+
+def hypergeom_pmf(x, m, n, k):
+
+    # R dhyper 와 같은 방식 (세 이항확률의 비) 으로 계산한 초기하분포 확률 (큰 표본에서도 상대오차가 작음)
+    x, m, n, k = (np.asarray(v, dtype=np.float64) for v in (x, m, n, k))
+    p = k / (m + n)
+    q = (m + n - k) / (m + n)
+
+    def log_binomial(x, size):
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inner = binomial_logpmf(np.clip(x, 1, None), np.maximum(size, 2), p, q)
+
+        # x == 0 / x == size 인 경우
+        edge_zero = np.where(p < 0.1, -binomial_deviance(size, size * q) - size * p, size * np.log(q))
+        edge_full = np.where(q < 0.1, -binomial_deviance(size, size * p) - size * q, size * np.log(p))
+
+        return np.where(x == 0, np.where(size == 0, 0.0, edge_zero), np.where(x == size, edge_full, inner))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_pmf = log_binomial(x, m) + log_binomial(k - x, n) - log_binomial(k, m + n)
+
+    valid = (x >= 0) & (x <= m) & (k - x >= 0) & (k - x <= n)
+
+    return np.where(valid, np.exp(log_pmf), 0.0)
+
+def hypergeom_tail_sum(start, stop, step: int, m, n, k, max_terms: int = 1024):
+
+    # pmf(start) + pmf(start + step) + ... + pmf(stop) 를 인접 확률비로 누적 (max_terms 안에 수렴한 행만 유효)
+    term = hypergeom_pmf(start, m, n, k)
+    total = term.copy()
+    x = start.copy()
+    active = (x != stop) & (term > 0)
+    converged = ~active
+
+    for _ in range(max_terms):
+
+        idx = np.flatnonzero(active)
+
+        if idx.size == 0:
+            break
+
+        xi, mi, ni, ki = x[idx], m[idx], n[idx], k[idx]
+
+        if step < 0:
+            ratio = xi * (ni - ki + xi) / ((mi - xi + 1.0) * (ki - xi + 1.0))
+        else:
+            ratio = (mi - xi) * (ki - xi) / ((xi + 1.0) * (ni - ki + xi + 1.0))
+
+        term[idx] *= ratio
+        total[idx] += term[idx]
+        x[idx] = xi + step
+
+        done = (x[idx] == stop[idx]) | (term[idx] <= total[idx] * 1e-17)
+        converged[idx[done]] = True
+        active[idx[done]] = False
+
+    return total, converged
+
+def fisher_exact_p_values(ct00, ct01, ct10, ct11):
+    """
+    R fisher.test (양측) 와 같은 p-value 를 행 단위 반복 없이 계산
+
+    관측 테이블보다 확률이 작거나 같은 (상대오차 1e-7 허용) 테이블의 확률 합
+    -> 초기하분포는 단봉이므로 mode 양쪽에서 경계를 이진 탐색한 뒤 두 꼬리 확률을 합산
+    """
+    from scipy import stats
+
+    x = np.asarray(ct00, dtype=np.int64)
+    m = x + np.asarray(ct10, dtype=np.int64)
+    n = np.asarray(ct01, dtype=np.int64) + np.asarray(ct11, dtype=np.int64)
+    k = x + np.asarray(ct01, dtype=np.int64)
+
+    lo = np.maximum(0, k - n)
+    hi = np.minimum(k, m)
+    mode = np.clip((k + 1) * (m + 1) // (m + n + 2), lo, hi)
+
+    threshold = hypergeom_logpmf(x, m, n, k) + np.log1p(1e-7)
+
+    def is_below(values):
+        return hypergeom_logpmf(np.clip(values, lo, hi), m, n, k) <= threshold
+
+    # 왼쪽 꼬리: [lo, mode] (비감소 구간) 에서 logpmf <= threshold 인 가장 큰 값 (없으면 lo - 1)
+    below_stop, above_start = lo - 1, mode + 1
+    while True:
+        active = above_start - below_stop > 1
+        if not active.any():
+            break
+        mid = (below_stop + above_start) // 2
+        below = is_below(mid)
+        below_stop = np.where(active & below, mid, below_stop)
+        above_start = np.where(active & ~below, mid, above_start)
+    left_stop = below_stop
+
+    # 오른쪽 꼬리: [mode + 1, hi] (비증가 구간) 에서 logpmf <= threshold 인 가장 작은 값 (없으면 hi + 1)
+    above_stop, below_start = mode, hi + 1
+    while True:
+        active = below_start - above_stop > 1
+        if not active.any():
+            break
+        mid = (above_stop + below_start) // 2
+        below = is_below(mid)
+        below_start = np.where(active & below, mid, below_start)
+        above_stop = np.where(active & ~below, mid, above_stop)
+    right_start = below_start
+
+    # 꼬리 확률: 경계에서 바깥쪽으로 확률비를 곱해 가며 합산, 수렴하지 않은 행만 scipy cdf / sf 사용
+    left_p = np.zeros(len(x))
+    has_left = left_stop >= lo
+    left_p[has_left], converged = hypergeom_tail_sum(left_stop[has_left], lo[has_left], -1, m[has_left], n[has_left], k[has_left])
+    slow = np.flatnonzero(has_left)[~converged]
+    left_p[slow] = stats.hypergeom.cdf(left_stop[slow], m[slow] + n[slow], m[slow], k[slow])
+
+    right_p = np.zeros(len(x))
+    has_right = right_start <= hi
+    right_p[has_right], converged = hypergeom_tail_sum(right_start[has_right], hi[has_right], 1, m[has_right], n[has_right], k[has_right])
+    slow = np.flatnonzero(has_right)[~converged]
+    right_p[slow] = stats.hypergeom.sf(right_start[slow] - 1, m[slow] + n[slow], m[slow], k[slow])
+
+    return np.minimum(left_p + right_p, 1.0)
+
+def p_adjust(p_values, method: str = 'fdr'):
+
+    # R p.adjust 와 같은 보정 (결측은 유지, 결측이 아닌 값 개수로 보정)
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(p_values.shape, np.nan)
+    valid = ~np.isnan(p_values)
+    p = p_values[valid]
+    n = len(p)
+
+    if n == 0:
+        return adjusted
+
+    if method in ('fdr', 'BH'):
+        order = np.argsort(-p, kind='stable')
+        ranks = np.arange(n, 0, -1)
+        p_sorted = np.minimum.accumulate(n / ranks * p[order])
+        result = np.empty(n)
+        result[order] = np.minimum(p_sorted, 1.0)
+    elif method == 'bonferroni':
+        result = np.minimum(p * n, 1.0)
+    elif method == 'none':
+        result = p
+    else:
+        raise ValueError(f"Error: 지원하지 않는 보정 방법입니다: {method}")
+
+    adjusted[valid] = result
+
+    return adjusted
+
+def compute_ctable_stats(ct00, ct01, ct10, ct11, conf_level: float = 0.95, batch_size: int = 1_000_000) -> dict:
+    """
+    ct00 / ct01 / ct10 / ct11 배열에서 epitools::riskratio (wald) 와 같은 통계량을 일괄 계산
+
+    2x2 테이블: matrix(c(ct00, ct01, ct10, ct11), nrow = 2, byrow = TRUE)
+    rr = (ct11 / (ct10 + ct11)) / (ct01 / (ct00 + ct01))
+
+    return: {rr_values, rr_lower_cis, rr_upper_cis, log_rr_values, chisq_values, chisq_p_values, fisher_p_values}
+    """
+    from scipy import stats
+
+    ct00, ct01, ct10, ct11 = (np.asarray(ct, dtype=np.int64) for ct in (ct00, ct01, ct10, ct11))
+    n_rows = len(ct00)
+    z = stats.norm.ppf(0.5 * (1 + conf_level))
+
+    result = {
+        col: np.empty(n_rows, dtype=np.float64)
+        for col in ['rr_values', 'rr_lower_cis', 'rr_upper_cis', 'log_rr_values', 'chisq_values', 'chisq_p_values', 'fisher_p_values']
+    }
+
+    # 메모리 사용량을 제한하기 위해 batch_size 행씩 계산
+    for start in range(0, n_rows, batch_size):
+
+        stop = min(start + batch_size, n_rows)
+        a, b, c, d = (ct[start:stop].astype(np.float64) for ct in (ct11, ct10, ct01, ct00))
+        n1, n0 = a + b, c + d
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+
+            rr = (a / n1) / (c / n0)
+            log_rr = np.log(rr)
+            se_log_rr = np.sqrt(1 / a - 1 / n1 + 1 / c - 1 / n0)
+
+            # 보정 없는 Pearson chi-square (chisq.test(correct = FALSE))
+            total = n1 + n0
+            chisq = total * (a * d - b * c) ** 2 / (n1 * n0 * (a + c) * (b + d))
+
+        result['rr_values'][start:stop] = rr
+        result['rr_lower_cis'][start:stop] = np.exp(log_rr - z * se_log_rr)
+        result['rr_upper_cis'][start:stop] = np.exp(log_rr + z * se_log_rr)
+        result['log_rr_values'][start:stop] = log_rr
+        result['chisq_values'][start:stop] = chisq
+        result['chisq_p_values'][start:stop] = stats.chi2.sf(chisq, 1)
+        result['fisher_p_values'][start:stop] = fisher_exact_p_values(ct00[start:stop], ct01[start:stop], ct10[start:stop], ct11[start:stop])
+
+    return result
+
+def final_to_stat(final_ctable, adjusted_method='fdr', return_option=True, save_option=False, save_path=None, include_chisq_values=False):
+    """
+    rr_calculator (R) 의 final_table_generator 대체: stat_cut_result_{fu}.csv 와 같은 컬럼 / 정렬
+
+    final_ctable: full_to_final 결과 (cause_abb, outcome_abb, ct00, ct01, ct10, ct11)
+    adjusted_method: p.adjust 방법 ('fdr', 'BH', 'bonferroni', 'none')
+    include_chisq_values: True 이면 chi-square 통계량 (chisq_values) 컬럼도 추가
+    """
+    stat_ctable = final_ctable.reset_index(drop=True).copy()
+    stats_dict = compute_ctable_stats(stat_ctable['ct00'], stat_ctable['ct01'], stat_ctable['ct10'], stat_ctable['ct11'])
+
+    for col in ['rr_values', 'rr_lower_cis', 'rr_upper_cis', 'log_rr_values']:
+        stat_ctable[col] = stats_dict[col]
+
+    if include_chisq_values:
+        stat_ctable['chisq_values'] = stats_dict['chisq_values']
+
+    stat_ctable['chisq_p_values'] = stats_dict['chisq_p_values']
+    stat_ctable['fisher_p_values'] = stats_dict['fisher_p_values']
+    stat_ctable['adjusted_chisq_p_values'] = p_adjust(stats_dict['chisq_p_values'], adjusted_method)
+    stat_ctable['adjusted_fisher_p_values'] = p_adjust(stats_dict['fisher_p_values'], adjusted_method)
+
+    # rr 내림차순 정렬 (dplyr::arrange(desc()) 와 같이 동점은 기존 순서 유지, 결측은 마지막)
+    order = np.argsort(-stat_ctable['rr_values'].to_numpy(), kind='stable')
+    stat_ctable = stat_ctable.iloc[order].reset_index(drop=True)
+
+    if save_option and save_path is not None:
+        stat_ctable.to_csv(save_path, index=False)
+
+    if return_option:
+        return stat_ctable
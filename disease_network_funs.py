@@ -1,26 +1,37 @@
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
 from concurrent.futures import ProcessPoolExecutor
+import os
+import json
+import hashlib
+import shutil
+import time
 import logging
 import pickle
 import multiprocessing as mp
 from multiprocessing import Pool
+from multiprocessing import shared_memory
 import pyreadstat
 import re
-import networkx as nx
-from infomap import Infomap
 from collections import defaultdict
-from joblib import Parallel, delayed
 import pickle
 from collections import Counter
-import scipy
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.patches import Rectangle
 import math
-from matplotlib.patches import FancyArrowPatch
-import seaborn as sns
+
+from column_store import (
+    write_column_store, read_column_store_meta, read_column_store, append_column_store, truncate_column_store, json_safe_labels,
+    fixed_width_strings
+)
+from pipeline_codec import (
+    codec_path, disease_code_dtype, std_attr_cols, factorize_column, PipelineCodec, build_codec, get_codec
+)
+from ctable_stats import fisher_exact_p_values, p_adjust, compute_ctable_stats, final_to_stat
+
+# networkx / infomap / scipy / matplotlib / seaborn 은 import 비용이 커서 사용하는 함수 안에서 import
+# (Pool 워커 생성, notebook 의 reload(fun_py) 시 NumPy 만 필요한 작업은 비용을 내지 않음)
 
 sas_path = "/home/hashjamm/project_data/disease_network/sas_files/"
 edge_pids_path = "/home/hashjamm/results/disease_network/edge_pids/"
@@ -29,6 +40,9 @@ ctable_path = "/home/hashjamm/results/disease_network/ctables/"
 pids_info_path = "/home/hashjamm/results/disease_network/"
 final_results_path = "/home/hashjamm/results/disease_network/final_results/"
 network_path = "/home/hashjamm/results/disease_network/default_network_properties/"
+matched_cache_path = "/home/hashjamm/project_data/disease_network/matched_cache/"
+
+matched_demo_cols = ['SEX', 'AGE_GROUP', 'SGG', 'CTRB_PT_TYPE_CD']
 
 # def process_disease_pair(cause_abb, diseases_list, all_outcome_np):
     
@@ -171,8 +185,87 @@ network_path = "/home/hashjamm/results/disease_network/default_network_propertie
         
 #     return local_cause_abb_list, local_outcome_abb_list, local_ct00_list, local_ct01_list, local_ct10_list, local_ct11_list
 
+class OutcomeIndex:
+    """
+    follow-up 연도별 outcome 테이블 (PERSON_ID, abb_sick) 을 질병 코드별로 묶은 CSR 형태 인덱스
+
+    codes: 정렬된 질병 코드
+    offsets: codes[i] 의 PID 는 pids[offsets[i]:offsets[i + 1]] (정렬, 중복 제거됨)
+    pids: 질병 코드 순서로 이어붙인 PERSON_ID (int64)
+    """
+
+    def __init__(self, codes, offsets, pids):
+        self.codes = np.asarray(codes)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.pids = np.asarray(pids, dtype=np.int64)
+
+        if len(self.offsets) != len(self.codes) + 1:
+            raise ValueError("Error: 'offsets' 길이는 'codes' 길이 + 1 이어야 합니다.")
+
+        self._code_to_pos = {str(code): pos for pos, code in enumerate(self.codes.tolist())}
+
+    @classmethod
+    def from_outcome_np(cls, all_outcome_np, codec: PipelineCodec = None):
+
+        # 연도별로 한 번만 정렬: (질병 코드, PID) 순 정렬 후 중복 제거
+        # codec 을 넘기면 문자열 정렬 대신 고정 dictionary 로 질병 코드를 정수화 (목록에 없는 질병은 제외)
+        if codec is None:
+            outcome_pids = all_outcome_np[:, 0].astype(np.int64)
+            codes, code_ids = np.unique(all_outcome_np[:, 1].astype(str), return_inverse=True)
+        else:
+            outcome_pids, code_ids = codec.encode_outcome_np(all_outcome_np)
+            codes = codec.diseases
+
+        order = np.lexsort((outcome_pids, code_ids))
+        outcome_pids = outcome_pids[order]
+        code_ids = code_ids[order]
+
+        keep = np.ones(len(outcome_pids), dtype=bool)
+        keep[1:] = (outcome_pids[1:] != outcome_pids[:-1]) | (code_ids[1:] != code_ids[:-1])
+        outcome_pids = outcome_pids[keep]
+        code_ids = code_ids[keep]
+
+        offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(code_ids, minlength=len(codes)))
+
+        return cls(codes, offsets, outcome_pids)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return str(code) in self._code_to_pos
+
+    def get(self, code):
+
+        # 해당 질병의 정렬된 PID slice (view) 반환, 없는 코드는 빈 배열
+        pos = self._code_to_pos.get(str(code))
+
+        if pos is None:
+            return self.pids[:0]
+
+        return self.pids[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def isin(self, code, person_ids):
+
+        # person_ids 각각이 해당 outcome 을 가지는지 여부 (sorted merge)
+        return sorted_isin(person_ids, self.get(code))
+
+def sorted_isin(values, sorted_unique):
+
+    # np.isin 대체: sorted_unique 가 정렬 + 중복 제거된 배열일 때 searchsorted 로 포함 여부 판단
+    values = np.asarray(values)
+
+    if len(sorted_unique) == 0:
+        return np.zeros(values.shape, dtype=bool)
+
+    pos = np.searchsorted(sorted_unique, values)
+    pos[pos == len(sorted_unique)] = 0
+
+    return sorted_unique[pos] == values
+
 def process_disease_pair_unfiltered(cause_abb, diseases_list, all_outcome_np):
-    
+
     local_cause_abb_list = []
     local_outcome_abb_list = []
     local_ct00_list = []
@@ -181,427 +274,3117 @@ def process_disease_pair_unfiltered(cause_abb, diseases_list, all_outcome_np):
     local_ct11_list = []
     local_edge_pids_dict = {}
 
+    # all_outcome_np 로 연도별 OutcomeIndex 를 넘기면 인덱스 생성을 생략
+    if isinstance(all_outcome_np, OutcomeIndex):
+        outcome_index = all_outcome_np
+    else:
+        outcome_index = OutcomeIndex.from_outcome_np(all_outcome_np)
+
     # cause 데이터 불러오기 및 NumPy 변환
-    cause_df = pyreadstat.read_sas7bdat(f'{matched_path}matched_{str(cause_abb).lower()}.sas7bdat')[0]
-    
-    if 'case' in cause_df.columns:
-        cause_df = cause_df[['PERSON_ID', 'case']].rename(columns={'case': 'cause'})
-    
-    cause_np = cause_df[['PERSON_ID', 'cause']].values
-    
+    cause_np = read_matched_cause_np(cause_abb)
+
+    cause_pids = cause_np[:, 0].astype(np.int64)
+    cause_flags = cause_np[:, 1].astype(np.int64)
+
     case_number = np.sum(cause_np[:, 1] == 1)
     control_number = np.sum(cause_np[:, 1] == 0)
-    
+
     for outcome_abb in diseases_list:
-        
-        if cause_abb == outcome_abb: 
+
+        if cause_abb == outcome_abb:
             continue
-        
-        # outcome 데이터 필터링
-        outcome_np = all_outcome_np[all_outcome_np[:, 1] == outcome_abb][:, [0]]
-        
-        if outcome_np.size == 0:
-            
+
+        # outcome 데이터 필터링 (질병 코드별 PID slice)
+        outcome_pids = outcome_index.get(outcome_abb)
+
+        if outcome_pids.size == 0:
+
             local_cause_abb_list.append(cause_abb)
             local_outcome_abb_list.append(outcome_abb)
             local_ct00_list.append(control_number)
             local_ct01_list.append(0)
             local_ct10_list.append(case_number)
             local_ct11_list.append(0)
-        
-        else:
-        
-            outcome_np = np.hstack([outcome_np, np.ones((outcome_np.shape[0], 1), dtype=int)])
+            continue
 
-            person_id_cause = set(cause_np[:, 0])
-            person_id_outcome = set(outcome_np[:, 0])
+        # PERSON_ID 기준 매칭 (sorted merge)
+        match_outcome_indices = sorted_isin(cause_pids, outcome_pids)
 
-            match_ids = person_id_cause.intersection(person_id_outcome)
+        if not match_outcome_indices.any():
 
-            if not match_ids:
-                
-                local_cause_abb_list.append(cause_abb)
-                local_outcome_abb_list.append(outcome_abb)
-                local_ct00_list.append(control_number)
-                local_ct01_list.append(0)
-                local_ct10_list.append(case_number)
-                local_ct11_list.append(0)
-                
-            else:
+            local_cause_abb_list.append(cause_abb)
+            local_outcome_abb_list.append(outcome_abb)
+            local_ct00_list.append(control_number)
+            local_ct01_list.append(0)
+            local_ct10_list.append(case_number)
+            local_ct11_list.append(0)
+            continue
 
-                # PERSON_ID 기준으로 병합 (NumPy 방식)
-                one_final_np = np.zeros((cause_np.shape[0], 3), dtype=int)
-                one_final_np[:, 0:2] = cause_np  # cause (PERSON_ID, cause)
+        edge_pids = cause_pids[(cause_flags == 1) & match_outcome_indices]
+        if len(edge_pids) > 0:
+            update_edge_pids_dict = {(cause_abb, outcome_abb): edge_pids}
+            local_edge_pids_dict.update(update_edge_pids_dict)
+
+        # 교차 테이블 (crosstab 대체): cause * 2 + outcome 위치별 카운트
+        cause_outcome_counts = np.bincount(cause_flags * 2 + match_outcome_indices, minlength=4)
+
+        ct00, ct01, ct10, ct11 = cause_outcome_counts[:4]
+
+        local_cause_abb_list.append(cause_abb)
+        local_outcome_abb_list.append(outcome_abb)
+        local_ct00_list.append(ct00)
+        local_ct01_list.append(ct01)
+        local_ct10_list.append(ct10)
+        local_ct11_list.append(ct11)
 
-                match_outcome_indices = np.isin(cause_np[:, 0], list(match_ids))
-                one_final_np[match_outcome_indices, 2] = 1  # outcome status
-                
-                edge_pids = one_final_np[(one_final_np[:, 1] == 1) & (one_final_np[:, 2] == 1)][:, 0]
-                if len(edge_pids) > 0:
-                    update_edge_pids_dict = {(cause_abb, outcome_abb): edge_pids}
-                    local_edge_pids_dict.update(update_edge_pids_dict)
-                
-                # 교차 테이블 (crosstab 대체)
-                cause_outcome_matrix = np.zeros((2, 2), dtype=int)
-                for row in one_final_np:
-                    cause_outcome_matrix[row[1], row[2]] += 1
-
-                ct00, ct01, ct10, ct11 = cause_outcome_matrix.flatten()
-
-                local_cause_abb_list.append(cause_abb)
-                local_outcome_abb_list.append(outcome_abb)
-                local_ct00_list.append(ct00)
-                local_ct01_list.append(ct01)
-                local_ct10_list.append(ct10)
-                local_ct11_list.append(ct11)
-        
     return local_cause_abb_list, local_outcome_abb_list, local_ct00_list, local_ct01_list, local_ct10_list, local_ct11_list, local_edge_pids_dict
 
-def updating_disease_pair(previous_ctable_unfiltered_np, post_distinct_ctable_unfilterd_np):
-    
-    # B의 4열의 값을 A의 3열에서 빼고, A의 4열에서 더하기
-    previous_ctable_unfiltered_np[:, 2] -= post_distinct_ctable_unfilterd_np[:, 3]  # A의 3열에 B의 4열을 뺌
-    previous_ctable_unfiltered_np[:, 3] += post_distinct_ctable_unfilterd_np[:, 3]  # A의 4열에 B의 4열을 더함
+def matched_sas_file(cause_abb):
+    return f'{matched_path}matched_{str(cause_abb).lower()}.sas7bdat'
 
-    # B의 6열의 값을 A의 5열에서 빼고, A의 6열에서 더하기
-    previous_ctable_unfiltered_np[:, 4] -= post_distinct_ctable_unfilterd_np[:, 5]  # A의 5열에 B의 6열을 뺌
-    previous_ctable_unfiltered_np[:, 5] += post_distinct_ctable_unfilterd_np[:, 5]  # A의 6열에 B의 6열을 더함
-    
-    updated_df = pd.DataFrame(previous_ctable_unfiltered_np, columns=['cause_abb', 'outcome_abb', 'ct00', 'ct01', 'ct10', 'ct11'])
-        
-    return updated_df
+def matched_cache_dir(cause_abb):
+    return f'{matched_cache_path}matched_{str(cause_abb).lower()}'
 
-def filtered_pair_cont_part_extract(updated_need_cause):
+def matched_cache_is_fresh(cause_abb):
 
-    local_cause_abb_list = []
-    local_outcome_abb_list = []
-    local_ct00_list = []
-    local_ct01_list = []
-    local_ct10_list = []
-    local_ct11_list = []
+    # 원본 SAS 파일의 mtime, size 가 cache 생성 당시와 같을 때만 유효
+    meta = read_column_store_meta(matched_cache_dir(cause_abb))
 
-    # cause 데이터 불러오기 및 NumPy 변환
-    cause_df = pyreadstat.read_sas7bdat(f'{matched_path}matched_{str(updated_need_cause).lower()}.sas7bdat')[0]
+    if meta is None:
+        return False
 
-    if 'case' in cause_df.columns:
-        cause_df = cause_df[['PERSON_ID', 'case']].rename(columns={'case': 'cause'})
+    try:
+        source_stat = os.stat(matched_sas_file(cause_abb))
+    except FileNotFoundError:
+        # 원본이 없으면 비교할 대상이 없으므로 cache 사용
+        return True
 
-    cause_np = cause_df[['PERSON_ID', 'cause']].values
+    return meta.get('source_mtime_ns') == source_stat.st_mtime_ns and meta.get('source_size') == source_stat.st_size
 
-    case_number = np.sum(cause_np[:, 1] == 1)
-    control_number = np.sum(cause_np[:, 1] == 0)
+def convert_matched_cohort(cause_abb):
+    """
+    matched_{cause}.sas7bdat 를 한 번만 파싱해 타입이 고정된 컬럼 파일로 저장
 
-    local_cause_abb_list.append(updated_need_cause)
-    local_ct00_list.append(control_number)
-    local_ct01_list.append(0)
-    local_ct10_list.append(case_number)
-    local_ct11_list.append(0)
-    
-    return local_cause_abb_list, local_ct00_list, local_ct01_list, local_ct10_list, local_ct11_list
+    PERSON_ID: int32, case: int8 ('cause' 컬럼명은 'case' 로 통일)
+    SEX, AGE_GROUP, SGG, CTRB_PT_TYPE_CD: 정수 코드 + meta.json 의 label 목록
+    """
+    sas_file = matched_sas_file(cause_abb)
+    source_stat = os.stat(sas_file)
 
-def full_to_final(full_ctable, return_option=True, save_option=False, save_path=None):
-    final_ctable = full_ctable.loc[
-        (full_ctable['ct00'] >= 5) &
-        (full_ctable['ct01'] >= 5) &
-        (full_ctable['ct10'] >= 5) &
-        (full_ctable['ct11'] >= 5)
-    ]
-    
-    final_ctable = final_ctable.reset_index(drop=True)
-    
-    if save_option and save_path is not None:
-        final_ctable.to_csv(save_path, index=False)
-    
-    if return_option:
-        return final_ctable
+    matched_df = pyreadstat.read_sas7bdat(sas_file)[0]
 
-def make_counts_dict(df: pd.DataFrame, collist: list, prefix_list: list):
-    col_num = len(collist)
-    
-    if col_num != len(prefix_list):
-        raise ValueError("Error: 'collist'와 'prefix_list'의 길이가 일치하지 않습니다.")
-    
-    if col_num == 0:
-        raise ValueError("Error: 'collist' 길이가 0입니다.")
-    
-    if not all(col in df.columns for col in collist):
-        raise ValueError("Error: 'collist'에 포함된 일부 컬럼이 데이터프레임에 없습니다.")
+    if 'case' not in matched_df.columns:
+        matched_df = matched_df.rename(columns={'cause': 'case'})
 
-    if col_num == 1:
-        counts_dict = df[collist[0]].value_counts().to_dict()
-        try:
-            counts_dict = dict(sorted(counts_dict.items(), key=lambda item: int(item[0])))
-        except ValueError:
-            print("정수로 변환할 수 없는 key가 존재합니다.")
-            raise
+    person_ids = matched_df['PERSON_ID'].to_numpy(dtype=np.int64)
 
-        counts_dict = {
-            f"{prefix_list[0]}_{k}_counts": v for k, v in counts_dict.items()
+    if len(person_ids) > 0 and (person_ids.min() < np.iinfo(np.int32).min or person_ids.max() > np.iinfo(np.int32).max):
+        raise ValueError(f"Error: {cause_abb} - PERSON_ID 가 int32 범위를 벗어납니다.")
+
+    columns = {
+        'PERSON_ID': person_ids.astype(np.int32),
+        'case': matched_df['case'].to_numpy().astype(np.int8)
+    }
+    labels = {}
+
+    for col in matched_demo_cols:
+        if col in matched_df.columns:
+            columns[col], col_labels = factorize_column(matched_df[col])
+            labels[col] = json_safe_labels(col_labels)
+
+    return write_column_store(
+        matched_cache_dir(cause_abb),
+        columns,
+        {
+            'cause_abb': str(cause_abb),
+            'source_mtime_ns': source_stat.st_mtime_ns,
+            'source_size': source_stat.st_size,
+            'labels': labels
         }
-        return counts_dict
+    )
+
+def convert_all_matched_cohorts(diseases_list, processes=None, only_stale=True):
+
+    # 최초 1회 (또는 SAS 파일 갱신 후) 실행하는 일괄 변환
+    targets = [cause_abb for cause_abb in diseases_list if not (only_stale and matched_cache_is_fresh(cause_abb))]
+
+    if processes is None or processes <= 1:
+        return [convert_matched_cohort(cause_abb) for cause_abb in tqdm(targets)]
+
+    with Pool(processes=processes) as pool:
+        return pool.map(convert_matched_cohort, targets)
+
+def load_matched_cohort(cause_abb, columns: list = None, refresh: bool = True) -> pd.DataFrame:
+    """
+    matched cohort 를 column cache (memory-map) 에서 읽음
+
+    columns: 필요한 컬럼만 지정 (기본: PERSON_ID, case, 인구학 컬럼 전체)
+    refresh: cache 가 없거나 오래된 경우 SAS 에서 다시 변환해 cache 를 갱신할지 여부
+        (False 이면 SAS 에서 필요한 컬럼만 직접 읽어서 반환)
+    """
+    if columns is None:
+        columns = ['PERSON_ID', 'case'] + matched_demo_cols
+
+    if not matched_cache_is_fresh(cause_abb):
+
+        if not refresh:
+            # cache 없이 SAS 에서 필요한 컬럼만 읽기 (case / cause 컬럼명 모두 허용)
+            sas_file = matched_sas_file(cause_abb)
+            sas_columns = pyreadstat.read_sas7bdat(sas_file, metadataonly=True)[1].column_names
+            usecols = [col for col in sas_columns if col in columns or (col == 'cause' and 'case' in columns)]
+            matched_df = pyreadstat.read_sas7bdat(sas_file, usecols=usecols)[0]
+            return matched_df.rename(columns={'cause': 'case'})[columns]
+
+        convert_matched_cohort(cause_abb)
+
+    arrays, meta = read_column_store(matched_cache_dir(cause_abb), columns)
+    matched_df = pd.DataFrame(index=pd.RangeIndex(meta['n_rows']))
+
+    for col in columns:
+        if col in meta.get('labels', {}):
+            col_labels = np.array(list(meta['labels'][col]) + [None], dtype=object)
+            matched_df[col] = col_labels[arrays[col]]
+        else:
+            matched_df[col] = arrays[col]
+
+    return matched_df
+
+def read_matched_cause_np(cause_abb):
+
+    # matched cohort 에서 (PERSON_ID, cause) 배열만 추출
+    cause_df = load_matched_cohort(cause_abb, ['PERSON_ID', 'case'])
+
+    return cause_df[['PERSON_ID', 'case']].values
+
+def encode_values(values, categories=None):
+    """
+    values: 인코딩할 1차원 배열
+    categories: 고정된 범주 목록 (None 이면 values 의 unique 값을 정렬해서 사용)
 
+    return: (codes, categories)
+        codes 는 categories 내 위치 (0 ~ n-1), categories 에 없는 값은 -1
+    """
+    values = np.asarray(values)
+
+    if categories is None:
+        categories, codes = np.unique(values, return_inverse=True)
+        return codes.astype(np.int64), categories
+
+    categories = np.asarray(categories)
+
+    if len(categories) == 0:
+        return np.full(len(values), -1, dtype=np.int64), categories
+
+    # categories 의 원래 순서를 유지한 채 searchsorted 로 위치 검색
+    sorter = np.argsort(categories, kind='stable')
+    pos = np.searchsorted(categories, values, sorter=sorter)
+    pos = np.clip(pos, 0, len(categories) - 1)
+    codes = sorter[pos].astype(np.int64)
+    codes[categories[codes] != values] = -1
+
+    return codes, categories
+
+def load_cause_cohorts(diseases_list, processes=None):
+
+    diseases_list = list(diseases_list)
+
+    if processes is None or processes <= 1:
+        return [read_matched_cause_np(cause_abb) for cause_abb in diseases_list]
+
+    with Pool(processes=processes) as pool:
+        cohorts = pool.map(read_matched_cause_np, diseases_list)
+
+    return cohorts
+
+def build_cause_incidence_matrices(cohorts):
+    """
+    cohorts: cause 순서대로 정렬된 (PERSON_ID, cause) 배열 리스트
+
+    return: (case_matrix, control_matrix, pid_categories)
+        case_matrix[i, p] = cause i 의 matched cohort 에서 PID p 가 case(1) 로 등장한 행 수
+        control_matrix[i, p] = cause i 의 matched cohort 에서 PID p 가 control(0) 로 등장한 행 수
+        pid_categories = dense PID id -> PERSON_ID (정렬됨)
+    """
+    from scipy import sparse
+
+    lengths = np.array([len(cohort) for cohort in cohorts], dtype=np.int64)
+
+    if lengths.sum() == 0:
+        empty = sparse.csr_matrix((len(cohorts), 0), dtype=np.int64)
+        return empty, empty.copy(), np.empty(0, dtype=np.int64)
+
+    all_cohort_np = np.concatenate([np.asarray(cohort).reshape(-1, 2) for cohort in cohorts])
+    cause_idx = np.repeat(np.arange(len(cohorts)), lengths)
+
+    pid_codes, pid_categories = encode_values(all_cohort_np[:, 0].astype(np.int64))
+    flags = all_cohort_np[:, 1].astype(np.int64)
+    shape = (len(cohorts), len(pid_categories))
+
+    # 중복 PID 행은 합산되어 기존 crosstab 의 행 단위 카운트와 동일하게 유지
+    case_mask = flags == 1
+    case_matrix = sparse.csr_matrix(
+        (np.ones(case_mask.sum(), dtype=np.int64), (cause_idx[case_mask], pid_codes[case_mask])),
+        shape=shape
+    )
+
+    control_mask = flags == 0
+    control_matrix = sparse.csr_matrix(
+        (np.ones(control_mask.sum(), dtype=np.int64), (cause_idx[control_mask], pid_codes[control_mask])),
+        shape=shape
+    )
+
+    return case_matrix, control_matrix, pid_categories
+
+def build_outcome_incidence_matrix(all_outcome_np, diseases_list, pid_categories):
+    """
+    all_outcome_np: (PERSON_ID, abb_sick) 배열
+    diseases_list: outcome 컬럼 순서로 사용할 질병 코드 목록
+    pid_categories: build_cause_incidence_matrices 에서 만든 PID 목록
+
+    return: outcome_matrix[p, j] = PID p 가 outcome j 를 가지면 1 (중복 발생은 1 로 처리)
+    """
+    from scipy import sparse
+
+    disease_labels = np.asarray(list(diseases_list)).astype(str)
+    outcome_pids = all_outcome_np[:, 0].astype(np.int64)
+    disease_codes, _ = encode_values(all_outcome_np[:, 1].astype(str), disease_labels)
+
+    # matched cohort 에 한 번도 등장하지 않는 PID 는 교차표에 영향이 없으므로 제외
+    if len(pid_categories) == 0:
+        pid_pos = np.zeros(len(outcome_pids), dtype=np.int64)
+        valid = np.zeros(len(outcome_pids), dtype=bool)
     else:
-        counts_dict = df[collist].value_counts().to_dict()
-        try:
-            counts_dict = dict(
-                sorted(counts_dict.items(), key=lambda item: tuple(map(int, item[0])))
-            )
-        except ValueError:
-            print("정수로 변환할 수 없는 key가 존재합니다.")
-            raise
+        pid_pos = np.clip(np.searchsorted(pid_categories, outcome_pids), 0, len(pid_categories) - 1)
+        valid = (pid_categories[pid_pos] == outcome_pids) & (disease_codes >= 0)
 
-        # 동적 key 이름 구성
-        renamed_dict = {}
-        for k, v in counts_dict.items():
-            key_parts = [
-                f"{prefix_list[i]}_{k[i]}" for i in range(col_num)
-            ]
-            final_key = "_".join(key_parts) + "_counts"
-            renamed_dict[final_key] = v
+    outcome_matrix = sparse.csr_matrix(
+        (np.ones(valid.sum(), dtype=np.int64), (pid_pos[valid], disease_codes[valid])),
+        shape=(len(pid_categories), len(disease_labels))
+    )
+    outcome_matrix.sum_duplicates()
+    outcome_matrix.data[:] = 1
 
-        return renamed_dict
-    
-def merge_dicts(*dicts):
-    result = {}
-    for d in dicts:
-        result.update(d)
-    return result
-    
-def node_pids_info_extractor(cause_abb):
-    
-    matched_df = pyreadstat.read_sas7bdat(f'{matched_path}matched_{str(cause_abb).lower()}.sas7bdat')[0]
-    matched_df[['PERSON_ID', 'case']] = matched_df[['PERSON_ID', 'case']].astype(int)
-    
-    target_df = matched_df[matched_df['case'] == 1].copy()
-    target_df[['PERSON_ID', 'SEX', 'AGE_GROUP', 'SGG', 'CTRB_PT_TYPE_CD', 'case']] =\
-    target_df[['PERSON_ID', 'SEX', 'AGE_GROUP', 'SGG', 'CTRB_PT_TYPE_CD', 'case']].astype('category')
+    return outcome_matrix
 
-    target_df['SIDO'] = target_df['SGG'].str[:2]
+def extract_all_edge_pids(cohorts, diseases_list, outcome_matrix, pid_categories):
 
-    # 단일 컬럼
-    sex_counts_dict = make_counts_dict(target_df, ['SEX'], ['sex'])
-    age_counts_dict = make_counts_dict(target_df, ['AGE_GROUP'], ['age'])
-    sido_counts_dict = make_counts_dict(target_df, ['SIDO'], ['sido'])
-    # sgg_counts_dict = make_counts_dict(target_df, ['SGG'], ['sgg'])
-    ctrb_counts_dict = make_counts_dict(target_df, ['CTRB_PT_TYPE_CD'], ['ctrb'])
+    # process_disease_pair_unfiltered 의 edge_pids 와 동일하게 cohort 행 순서(중복 포함)를 유지
+    diseases_list = list(diseases_list)
+    disease_labels = np.asarray(diseases_list).astype(str)
+    edge_pids_dict = {}
 
-    # 다중 컬럼
-    sex_age_counts_dict = make_counts_dict(target_df, ['SEX', 'AGE_GROUP'], ['sex', 'age'])
-    sex_sido_counts_dict = make_counts_dict(target_df, ['SEX', 'SIDO'], ['sex', 'sido'])
-    # sex_sgg_counts_dict = make_counts_dict(target_df, ['SEX', 'SGG'], ['sex', 'sgg'])
-    sex_ctrb_counts_dict = make_counts_dict(target_df, ['SEX', 'CTRB_PT_TYPE_CD'], ['sex', 'ctrb'])
+    for cause_idx, cause_abb in enumerate(diseases_list):
 
-    combined_dict = merge_dicts({'node_code': f'{cause_abb}'},\
-                                sex_counts_dict,\
-                                age_counts_dict,\
-                                sido_counts_dict,\
-                                # sgg_counts_dict,\
-                                ctrb_counts_dict,\
-                                sex_age_counts_dict,\
-                                sex_sido_counts_dict,\
-                                # sex_sgg_counts_dict,\
-                                sex_ctrb_counts_dict)
-    
-    return combined_dict
+        cause_np = np.asarray(cohorts[cause_idx]).reshape(-1, 2)
+        case_pids = cause_np[cause_np[:, 1].astype(np.int64) == 1, 0].astype(np.int64)
 
-def move_column(df: pd.DataFrame, column_name, new_index):
-    # 컬럼 제거 후 삽입
-    cols = list(df.columns)
-    cols.insert(new_index, cols.pop(cols.index(column_name)))
-    return df[cols]
+        if len(case_pids) == 0:
+            continue
 
-def node_shape_col_maker(node_pids_info: pd.DataFrame):
-    
-    node_pids_info['width'] = node_pids_info['sex_2_counts'].rank(method='min') / len(node_pids_info)
-    node_pids_info['height'] = node_pids_info['sex_1_counts'].rank(method='min') / len(node_pids_info)
-    
-    node_pids_info = move_column(node_pids_info, 'width', 1)
-    node_pids_info = move_column(node_pids_info, 'height', 2)
-    
-    return node_pids_info
-    
-all_std_info = pyreadstat.read_sas7bdat(f'{sas_path}std_pop4.sas7bdat')[0]
-all_std_info['PERSON_ID'] = all_std_info['PERSON_ID'].astype(int)
-all_std_info = all_std_info.drop(columns = ['case'])
+        case_pos = np.searchsorted(pid_categories, case_pids)
+        case_outcome_csc = outcome_matrix[case_pos].tocsc()
+        case_outcome_csc.sort_indices()
 
-def edge_pids_info_extractor(one_edge_pids_item: tuple):
-    
-    if len(one_edge_pids_item) != 2:
-        raise ValueError("Error: one_edge_pids_item - tuple 길이가 2가 아닙니다.")
-    
-    edge_pids_key = one_edge_pids_item[0]
-    edge_pids_value = one_edge_pids_item[1]
-    
-    if len(edge_pids_key) != 2:
-        raise ValueError("Error: edge_pids_key - tuple 길이가 2가 아닙니다.")
-        
-    if any(not re.fullmatch(r"[A-Z][0-9]{2}", item) for item in edge_pids_key):
-        raise ValueError("Error: edge_pids_key - tuple 내부에 형식에 맞지 않는 값이 존재합니다.")
-        
-    cause_abb = edge_pids_key[0]
-    outcome_abb = edge_pids_key[1]
-        
-    target_df = all_std_info.loc[all_std_info['PERSON_ID'].isin(edge_pids_value)].reset_index(drop=True)
-    target_df['SIDO'] = target_df['SGG'].str[:2]
-    
-    # 단일 컬럼
-    sex_counts_dict = make_counts_dict(target_df, ['SEX'], ['sex'])
-    age_counts_dict = make_counts_dict(target_df, ['AGE_GROUP'], ['age'])
-    sido_counts_dict = make_counts_dict(target_df, ['SIDO'], ['sido'])
-    # sgg_counts_dict = make_counts_dict(target_df, ['SGG'], ['sgg'])
-    ctrb_counts_dict = make_counts_dict(target_df, ['CTRB_PT_TYPE_CD'], ['ctrb'])
-
-    # 다중 컬럼
-    sex_age_counts_dict = make_counts_dict(target_df, ['SEX', 'AGE_GROUP'], ['sex', 'age'])
-    sex_sido_counts_dict = make_counts_dict(target_df, ['SEX', 'SIDO'], ['sex', 'sido'])
-    # sex_sgg_counts_dict = make_counts_dict(target_df, ['SEX', 'SGG'], ['sex', 'sgg'])
-    sex_ctrb_counts_dict = make_counts_dict(target_df, ['SEX', 'CTRB_PT_TYPE_CD'], ['sex', 'ctrb'])
+        for outcome_idx in np.flatnonzero(np.diff(case_outcome_csc.indptr)):
+
+            if disease_labels[outcome_idx] == str(cause_abb):
+                continue
+
+            start, end = case_outcome_csc.indptr[outcome_idx], case_outcome_csc.indptr[outcome_idx + 1]
+            edge_pids_dict[(cause_abb, diseases_list[outcome_idx])] = case_pids[case_outcome_csc.indices[start:end]]
+
+    return edge_pids_dict
+
+def compute_all_pairs_ctable(diseases_list, all_outcome_np, cohorts=None, processes=None, return_edge_pids=False):
+    """
+    전체 (cause, outcome) 쌍의 ct00/ct01/ct10/ct11 을 희소행렬 곱으로 한 번에 계산
+
+    diseases_list: cause / outcome 질병 코드 목록 (출력 행 순서도 이 순서를 따름)
+    all_outcome_np: (PERSON_ID, abb_sick) 배열 (outcome_dt_year_{fu}.sas7bdat)
+    cohorts: load_cause_cohorts 결과 (None 이면 SAS 파일에서 새로 읽음, 연도별로 재사용 가능)
+    processes: cohorts 를 읽을 때 사용할 프로세스 수
+    return_edge_pids: True 이면 edge_pids dict 도 함께 반환
+
+    return: process_disease_pair_unfiltered 결과를 모은 ctable 과 동일한 DataFrame
+        (cause_abb, outcome_abb, ct00, ct01, ct10, ct11)
+    """
+    diseases_list = list(diseases_list)
+    disease_labels = np.asarray(diseases_list).astype(str)
+
+    if cohorts is None:
+        cohorts = load_cause_cohorts(diseases_list, processes=processes)
+
+    if len(cohorts) != len(diseases_list):
+        raise ValueError("Error: 'cohorts'와 'diseases_list'의 길이가 일치하지 않습니다.")
+
+    case_matrix, control_matrix, pid_categories = build_cause_incidence_matrices(cohorts)
+    outcome_matrix = build_outcome_incidence_matrix(all_outcome_np, diseases_list, pid_categories)
+
+    # ct11 = case 중 outcome 발생, ct01 = control 중 outcome 발생
+    ct11 = np.asarray((case_matrix @ outcome_matrix).todense(), dtype=np.int64)
+    ct01 = np.asarray((control_matrix @ outcome_matrix).todense(), dtype=np.int64)
+
+    case_number = np.asarray(case_matrix.sum(axis=1), dtype=np.int64).ravel()
+    control_number = np.asarray(control_matrix.sum(axis=1), dtype=np.int64).ravel()
+
+    ct10 = case_number[:, None] - ct11
+    ct00 = control_number[:, None] - ct01
+
+    # cause == outcome 쌍 제외 (row-major 순서 = 기존 cause 별 outcome loop 순서)
+    pair_mask = disease_labels[:, None] != disease_labels[None, :]
+    cause_idx, outcome_idx = np.nonzero(pair_mask)
+
+    full_ctable = pd.DataFrame({
+        'cause_abb' : np.asarray(diseases_list, dtype=object)[cause_idx],
+        'outcome_abb' : np.asarray(diseases_list, dtype=object)[outcome_idx],
+        'ct00' : ct00[pair_mask],
+        'ct01' : ct01[pair_mask],
+        'ct10' : ct10[pair_mask],
+        'ct11' : ct11[pair_mask]
+        })
+
+    if return_edge_pids:
+        edge_pids_dict = extract_all_edge_pids(cohorts, diseases_list, outcome_matrix, pid_categories)
+        return full_ctable, edge_pids_dict
+
+    return full_ctable
+
+def build_first_event_table(fu_list=range(1, 11)) -> pd.DataFrame:
+    """
+    outcome_dt_year_{fu}.sas7bdat 들을 합쳐 (PERSON_ID, abb_sick) 별 가장 이른 follow-up 연도만 남김
+
+    return: (PERSON_ID, abb_sick, fu) DataFrame
+    """
+    frames = []
+
+    for fu in fu_list:
+        outcome_df = pyreadstat.read_sas7bdat(f'{sas_path}outcome_dt_year_{fu}.sas7bdat', usecols=['PERSON_ID', 'abb_sick'])[0]
+        outcome_df['PERSON_ID'] = outcome_df['PERSON_ID'].astype(np.int64)
+        outcome_df['fu'] = fu
+        frames.append(outcome_df[['PERSON_ID', 'abb_sick', 'fu']])
+
+    first_event_df = pd.concat(frames, axis=0, ignore_index=True)
+    first_event_df = first_event_df.groupby(['PERSON_ID', 'abb_sick'], sort=False)['fu'].min().reset_index()
+
+    return first_event_df
+
+def compute_multi_year_ctable(diseases_list, first_event, fu_list=range(1, 11), cohorts=None, processes=None) -> pd.DataFrame:
+    """
+    first-event 테이블 하나로 모든 follow-up 연도의 ctable 을 한 번의 희소행렬 곱으로 계산
+
+    diseases_list: cause / outcome 질병 코드 목록
+    first_event: (PERSON_ID, abb_sick, fu) DataFrame 또는 배열 (build_first_event_table 결과)
+    fu_list: 계산할 follow-up 연도 (fu = k 의 ctable 은 first-event 연도 <= k 인 outcome 기준)
+    cohorts: load_cause_cohorts 결과 (None 이면 새로 읽음)
+
+    return: (fu, cause_abb, outcome_abb, ct00, ct01, ct10, ct11) long-form DataFrame
+        fu 별로 나누면 compute_all_pairs_ctable 결과와 같은 행 순서
+    """
+    from scipy import sparse
+
+    diseases_list = list(diseases_list)
+    disease_labels = np.asarray(diseases_list).astype(str)
+    fu_list = np.array(sorted(set(int(fu) for fu in fu_list)), dtype=np.int64)
+
+    if len(fu_list) == 0:
+        raise ValueError("Error: 'fu_list' 길이가 0입니다.")
+
+    if isinstance(first_event, pd.DataFrame):
+        first_event = first_event[['PERSON_ID', 'abb_sick', 'fu']].values
+
+    if cohorts is None:
+        cohorts = load_cause_cohorts(diseases_list, processes=processes)
+
+    if len(cohorts) != len(diseases_list):
+        raise ValueError("Error: 'cohorts'와 'diseases_list'의 길이가 일치하지 않습니다.")
+
+    case_matrix, control_matrix, pid_categories = build_cause_incidence_matrices(cohorts)
+
+    event_pids = first_event[:, 0].astype(np.int64)
+    event_codes, _ = encode_values(first_event[:, 1].astype(str), disease_labels)
+    event_fu = first_event[:, 2].astype(np.int64)
+
+    # event 연도를 가장 가까운 (같거나 큰) follow-up 구간으로 배정, 마지막 구간 이후 event 는 제외
+    fu_pos = np.searchsorted(fu_list, event_fu, side='left')
+
+    if len(pid_categories) == 0:
+        pid_pos = np.zeros(len(event_pids), dtype=np.int64)
+        valid = np.zeros(len(event_pids), dtype=bool)
+    else:
+        pid_pos = np.clip(np.searchsorted(pid_categories, event_pids), 0, len(pid_categories) - 1)
+        valid = (pid_categories[pid_pos] == event_pids) & (event_codes >= 0) & (fu_pos < len(fu_list))
+
+    pid_pos, event_codes, fu_pos = pid_pos[valid], event_codes[valid], fu_pos[valid]
+
+    # (PID, 질병) 중복 시 가장 이른 구간만 유지
+    order = np.lexsort((fu_pos, event_codes, pid_pos))
+    pid_pos, event_codes, fu_pos = pid_pos[order], event_codes[order], fu_pos[order]
+    keep = np.ones(len(pid_pos), dtype=bool)
+    keep[1:] = (pid_pos[1:] != pid_pos[:-1]) | (event_codes[1:] != event_codes[:-1])
+    pid_pos, event_codes, fu_pos = pid_pos[keep], event_codes[keep], fu_pos[keep]
+
+    # 컬럼 = (outcome, 구간) 으로 펼친 outcome 행렬 -> 곱 한 번으로 구간별 신규 발생 수 계산
+    n_diseases, n_fu = len(disease_labels), len(fu_list)
+    outcome_fu_matrix = sparse.csr_matrix(
+        (np.ones(len(pid_pos), dtype=np.int64), (pid_pos, event_codes * n_fu + fu_pos)),
+        shape=(len(pid_categories), n_diseases * n_fu)
+    )
+
+    new_ct11 = np.asarray((case_matrix @ outcome_fu_matrix).todense(), dtype=np.int64).reshape(len(cohorts), n_diseases, n_fu)
+    new_ct01 = np.asarray((control_matrix @ outcome_fu_matrix).todense(), dtype=np.int64).reshape(len(cohorts), n_diseases, n_fu)
+
+    # 구간별 신규 발생을 누적하면 각 follow-up 연도의 ct11 / ct01
+    ct11 = np.cumsum(new_ct11, axis=2)
+    ct01 = np.cumsum(new_ct01, axis=2)
+
+    case_number = np.asarray(case_matrix.sum(axis=1), dtype=np.int64).ravel()
+    control_number = np.asarray(control_matrix.sum(axis=1), dtype=np.int64).ravel()
+
+    pair_mask = disease_labels[:, None] != disease_labels[None, :]
+    cause_idx, outcome_idx = np.nonzero(pair_mask)
+    n_pairs = len(cause_idx)
+
+    multi_year_ctable = pd.DataFrame({
+        'fu' : np.repeat(fu_list, n_pairs),
+        'cause_abb' : np.tile(np.asarray(diseases_list, dtype=object)[cause_idx], n_fu),
+        'outcome_abb' : np.tile(np.asarray(diseases_list, dtype=object)[outcome_idx], n_fu),
+        'ct00' : (control_number[cause_idx][None, :] - ct01[cause_idx, outcome_idx, :].T).ravel(),
+        'ct01' : ct01[cause_idx, outcome_idx, :].T.ravel(),
+        'ct10' : (case_number[cause_idx][None, :] - ct11[cause_idx, outcome_idx, :].T).ravel(),
+        'ct11' : ct11[cause_idx, outcome_idx, :].T.ravel()
+        })
+
+    return multi_year_ctable
+
+def split_multi_year_ctable(multi_year_ctable: pd.DataFrame) -> dict:
+
+    # {fu: full_ctable} 형태로 분리 (full_ctable_{fu}.csv 저장용, 컬럼 순서는 기존과 동일)
+    return {
+        int(fu): fu_ctable.drop(columns=['fu']).reset_index(drop=True)
+        for fu, fu_ctable in multi_year_ctable.groupby('fu', sort=True)
+    }
+
+_shared_memory_blocks = {}
+_shared_memory_attached = {}
+_shared_arrays = {}
+_shared_meta = {}
+_shared_outcome_index = None
+
+def publish_shared_arrays(arrays: dict, meta: dict = None) -> dict:
+    """
+    arrays: {이름: 고정 폭 숫자형 NumPy 배열}
+    meta: 워커에 함께 넘길 작은 메타 정보 (질병 코드 목록, label 목록 등)
+
+    return: attach_shared_arrays 에 initargs 로 넘길 spec (shared memory 이름, shape, dtype)
+    """
+    spec = {'arrays': {}, 'meta': dict(meta or {})}
+
+    for name, array in arrays.items():
+
+        array = np.ascontiguousarray(array)
+
+        if array.dtype.kind not in 'biuf':
+            raise ValueError(f"Error: '{name}' 은(는) 고정 폭 숫자형 배열이 아닙니다. (dtype={array.dtype})")
+
+        if name in _shared_memory_blocks:
+            release_shared_arrays([name])
+
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shm_array = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        shm_array[...] = array
+
+        _shared_memory_blocks[name] = shm
+        spec['arrays'][name] = (shm.name, array.shape, array.dtype.str)
+
+    return spec
+
+def attach_shared_arrays(spec: dict):
+
+    # Pool initializer: spec 의 shared memory 를 이름으로 attach (복사 없음, 읽기 전용)
+    global _shared_outcome_index
+
+    for name, (shm_name, shape, dtype) in spec['arrays'].items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        shm_array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        shm_array.flags.writeable = False
+
+        # 배열이 buffer 를 참조하는 동안 SharedMemory 객체를 유지
+        _shared_memory_attached[name] = shm
+        _shared_arrays[name] = shm_array
+
+    _shared_meta.update(spec['meta'])
+    _shared_outcome_index = None
+
+def get_shared_array(name: str):
+
+    if name not in _shared_arrays:
+        raise KeyError(f"Error: shared array '{name}' 가 attach 되지 않았습니다.")
+
+    return _shared_arrays[name]
+
+def release_shared_arrays(names=None):
+
+    # 부모 프로세스에서 작업이 끝난 뒤 호출: shared memory 해제 (close + unlink)
+    global _shared_outcome_index
+
+    names = list(_shared_memory_blocks) if names is None else list(names)
+
+    for name in names:
+        shm = _shared_memory_blocks.pop(name, None)
+        attached_shm = _shared_memory_attached.pop(name, None)
+        _shared_arrays.pop(name, None)
+
+        if attached_shm is not None:
+            attached_shm.close()
+
+        if shm is None:
+            continue
+
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    _shared_outcome_index = None
+
+def publish_ctable_datasets(diseases_list, outcome_index, std_info: pd.DataFrame = None) -> dict:
+    """
+    ctable / edge 정보 단계에서 워커가 공유할 데이터셋을 shared memory 로 게시
+
+    diseases_list: cause / outcome 질병 코드 목록
+    outcome_index: 해당 follow-up 연도의 OutcomeIndex (또는 (PERSON_ID, abb_sick) 배열)
+    std_info: edge_pids_info_extractor 에서 사용할 인구학 정보 (None 이면 게시하지 않음)
+
+    return: Pool(initializer=attach_shared_arrays, initargs=(spec,)) 에 넘길 spec
+    """
+    if not isinstance(outcome_index, OutcomeIndex):
+        outcome_index = OutcomeIndex.from_outcome_np(outcome_index)
+
+    arrays = {
+        'outcome_offsets': outcome_index.offsets,
+        'outcome_pids': outcome_index.pids
+    }
+    meta = {
+        'diseases_list': [str(d) for d in diseases_list],
+        'outcome_codes': [str(c) for c in outcome_index.codes.tolist()]
+    }
+
+    if std_info is not None:
+        std_arrays, std_meta = std_info_to_arrays(std_info)
+        arrays.update(std_arrays)
+        meta.update(std_meta)
+
+    return publish_shared_arrays(arrays, meta)
+
+def shared_outcome_index() -> OutcomeIndex:
+
+    # 워커 내에서 shared memory 위의 OutcomeIndex 를 한 번만 구성
+    global _shared_outcome_index
+
+    if _shared_outcome_index is None:
+        _shared_outcome_index = OutcomeIndex(
+            _shared_meta['outcome_codes'],
+            get_shared_array('outcome_offsets'),
+            get_shared_array('outcome_pids')
+        )
+
+    return _shared_outcome_index
+
+def process_disease_pair_shared(cause_abb):
+
+    # pool.map 에는 cause 코드만 전달, 나머지 데이터는 attach 된 shared memory 사용
+    return process_disease_pair_unfiltered(cause_abb, _shared_meta['diseases_list'], shared_outcome_index())
+
+def edge_pids_store_dir(fu):
+    return f'{edge_pids_path}edge_pids_{fu}'
+
+class EdgePidsWriter:
+    """
+    edge_pids dict ((cause, outcome) -> PID 배열) 를 병합 없이 디스크에 이어붙이는 writer
+
+    store_dir/pids.bin : 모든 edge 의 PID 를 이어붙인 int32 배열 (append only)
+    store_dir/key_log/ : append 순서대로 기록한 (cause, outcome, start, stop) column store
+    store_dir/keys/    : finalize() 후 (cause, outcome) 정렬된 key 테이블 (EdgePidsStore 에서 사용)
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self.pids_file = os.path.join(store_dir, 'pids.bin')
+        self.key_log_dir = os.path.join(store_dir, 'key_log')
+
+        os.makedirs(store_dir, exist_ok=True)
+
+        # 이전 실행이 중단된 경우 commit 된 key 까지만 PID 를 남김
+        key_log_meta = read_column_store_meta(self.key_log_dir)
+        committed = 0
+
+        if key_log_meta is not None and key_log_meta['n_rows'] > 0:
+            committed = int(read_column_store(self.key_log_dir, ['stop'])[0]['stop'].max())
+
+        with open(self.pids_file, 'r+b' if os.path.exists(self.pids_file) else 'wb') as f:
+            f.truncate(committed * np.dtype(np.int32).itemsize)
+
+        self.n_pids = committed
+
+    def append(self, edge_pids_dict: dict):
+
+        if not edge_pids_dict:
+            return 0
+
+        causes = []
+        outcomes = []
+        lengths = []
+        pid_arrays = []
+
+        for (cause_abb, outcome_abb), edge_pids in edge_pids_dict.items():
+            edge_pids = np.asarray(edge_pids, dtype=np.int64)
+
+            if len(edge_pids) > 0 and (edge_pids.min() < np.iinfo(np.int32).min or edge_pids.max() > np.iinfo(np.int32).max):
+                raise ValueError(f"Error: ({cause_abb}, {outcome_abb}) - PERSON_ID 가 int32 범위를 벗어납니다.")
+
+            causes.append(str(cause_abb))
+            outcomes.append(str(outcome_abb))
+            lengths.append(len(edge_pids))
+            pid_arrays.append(edge_pids.astype(np.int32))
+
+        # 질병 코드 길이는 PID 를 기록하기 전에 확인 (disease_code_dtype 으로 변환하면 긴 코드가 잘림)
+        cause_codes = fixed_width_strings(causes, disease_code_dtype, 'cause_abb')
+        outcome_codes = fixed_width_strings(outcomes, disease_code_dtype, 'outcome_abb')
+
+        stops = self.n_pids + np.cumsum(lengths, dtype=np.int64)
+        starts = stops - np.asarray(lengths, dtype=np.int64)
+
+        # PID 를 먼저 기록하고 key log 를 나중에 commit
+        with open(self.pids_file, 'ab') as f:
+            np.concatenate(pid_arrays).tofile(f)
+
+        append_column_store(self.key_log_dir, {
+            'cause_abb': cause_codes,
+            'outcome_abb': outcome_codes,
+            'start': starts,
+            'stop': stops
+        })
+
+        self.n_pids = int(stops[-1])
+
+        return len(causes)
+
+    def finalize(self):
+
+        # key log 를 (cause, outcome) 순으로 정렬한 key 테이블 생성 (같은 key 는 마지막 기록 사용)
+        key_log_meta = read_column_store_meta(self.key_log_dir)
+
+        if key_log_meta is None:
+            key_log = {
+                'cause_abb': np.empty(0, dtype=disease_code_dtype),
+                'outcome_abb': np.empty(0, dtype=disease_code_dtype),
+                'start': np.empty(0, dtype=np.int64),
+                'stop': np.empty(0, dtype=np.int64)
+            }
+        else:
+            key_log = read_column_store(self.key_log_dir, mmap=False)[0]
+
+        n_keys = len(key_log['start'])
+        order = np.lexsort((np.arange(n_keys), key_log['outcome_abb'], key_log['cause_abb']))
+
+        is_last = np.ones(n_keys, dtype=bool)
+        if n_keys > 1:
+            same_key = (key_log['cause_abb'][order][1:] == key_log['cause_abb'][order][:-1]) & \
+                       (key_log['outcome_abb'][order][1:] == key_log['outcome_abb'][order][:-1])
+            is_last[:-1] = ~same_key
+        order = order[is_last]
+
+        return write_column_store(
+            os.path.join(self.store_dir, 'keys'),
+            {name: values[order] for name, values in key_log.items()},
+            {'n_pids': self.n_pids}
+        )
+
+class EdgePidsStore:
+    """
+    EdgePidsWriter 로 만든 edge PID 저장소를 memory-map 으로 읽는 reader
+
+    store[(cause, outcome)] 은 해당 edge 의 PID slice 만 읽음 (다른 edge 는 건드리지 않음)
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        keys, meta = read_column_store(os.path.join(store_dir, 'keys'))
+
+        self.cause_abb = keys['cause_abb']
+        self.outcome_abb = keys['outcome_abb']
+        self.start = keys['start']
+        self.stop = keys['stop']
+
+        if meta['n_pids'] == 0:
+            self.pids = np.empty(0, dtype=np.int32)
+        else:
+            self.pids = np.memmap(os.path.join(store_dir, 'pids.bin'), dtype=np.int32, mode='r', shape=(meta['n_pids'],))
+
+    def __len__(self):
+        return len(self.start)
+
+    def _find(self, cause_abb, outcome_abb):
+
+        # cause 구간을 찾은 뒤 그 안에서 outcome 이진 탐색
+        lo = np.searchsorted(self.cause_abb, str(cause_abb), side='left')
+        hi = np.searchsorted(self.cause_abb, str(cause_abb), side='right')
+        pos = lo + np.searchsorted(self.outcome_abb[lo:hi], str(outcome_abb), side='left')
+
+        if pos < hi and self.outcome_abb[pos] == str(outcome_abb):
+            return pos
+
+        return None
+
+    def __contains__(self, key):
+        return self._find(*key) is not None
+
+    def __getitem__(self, key):
+
+        pos = self._find(*key)
+
+        if pos is None:
+            raise KeyError(key)
+
+        return self.pids[self.start[pos]:self.stop[pos]]
+
+    def get(self, key, default=None):
+
+        pos = self._find(*key)
+
+        if pos is None:
+            return default
+
+        return self.pids[self.start[pos]:self.stop[pos]]
+
+    def keys(self):
+        return zip(self.cause_abb.tolist(), self.outcome_abb.tolist())
+
+    def items(self, cause_abb=None):
+
+        # cause_abb 를 지정하면 해당 cause 의 edge 만 순회
+        if cause_abb is None:
+            lo, hi = 0, len(self)
+        else:
+            lo = np.searchsorted(self.cause_abb, str(cause_abb), side='left')
+            hi = np.searchsorted(self.cause_abb, str(cause_abb), side='right')
+
+        for pos in range(lo, hi):
+            yield (str(self.cause_abb[pos]), str(self.outcome_abb[pos])), self.pids[self.start[pos]:self.stop[pos]]
+
+    def to_dict(self):
+        return {key: np.asarray(value, dtype=np.int64) for key, value in self.items()}
+
+def edge_pids_pickles_to_store(pkl_files: list, store_dir: str):
+
+    # 기존 edge_pids_{fu}_{chunk}.pkl (또는 edge_pids_{fu}.pkl) 들을 병합 없이 store 로 변환
+    writer = EdgePidsWriter(store_dir)
+
+    for pkl_file in pkl_files:
+        with open(pkl_file, 'rb') as f:
+            writer.append(pickle.load(f))
+
+    return writer.finalize()
+
+def cohort_row_count(cause_abb):
+
+    # 유효한 column cache 가 있으면 meta.json, 없으면 SAS metadata 만 읽어서 행 수 확인
+    if matched_cache_is_fresh(cause_abb):
+        return read_column_store_meta(matched_cache_dir(cause_abb))['n_rows']
+
+    return pyreadstat.read_sas7bdat(matched_sas_file(cause_abb), metadataonly=True)[1].number_rows
+
+def estimate_cause_costs(diseases_list, cost_model: tuple = None, row_counts: dict = None) -> dict:
+    """
+    cause 별 작업 비용 추정 (matched cohort 행 수 기준)
+
+    cost_model: calibrate_cost_model 결과 (a, b) -> 비용 = a * 행 수 ** b (초 단위 예상 시간)
+        None 이면 행 수를 그대로 비용으로 사용
+    row_counts: 이미 확인한 {cause: cohort 행 수} (없는 cause 만 새로 확인)
+    """
+    row_counts = row_counts or {}
+    costs = {}
+
+    for cause_abb in diseases_list:
+        n_rows = row_counts[cause_abb] if cause_abb in row_counts else cohort_row_count(cause_abb)
+        costs[cause_abb] = float(n_rows) if cost_model is None else float(cost_model[0] * max(n_rows, 1) ** cost_model[1])
+
+    return costs
+
+def lpt_order(items, costs: dict) -> list:
+
+    # LPT (Longest Processing Time first): 비용이 큰 작업부터 배치, 비용 정보가 없으면 맨 뒤
+    return sorted(items, key=lambda item: -costs.get(item, 0.0))
+
+def timed_task(func_item: tuple):
+
+    # 워커에서 실행 시간 측정 후 (item, 결과, wall time) 반환
+    func, item = func_item
+    start = time.perf_counter()
+    result = func(item)
+
+    return item, result, time.perf_counter() - start
+
+def run_cost_aware_tasks(func, items, costs: dict = None, processes: int = 96, initializer=None, initargs=()):
+    """
+    청크 경계 없이 하나의 Pool 로 큰 작업부터 배분하는 스케줄러 (generator)
+
+    func: 모듈 수준 함수 (예: process_disease_pair_shared, node_pids_info_extractor)
+    items: 작업 목록 (예: cause 코드)
+    costs: {item: 예상 비용} (None 이면 estimate_cause_costs 로 추정)
+
+    yield: 끝난 순서대로 (item, 결과, wall time 초)
+    """
+    items = list(items)
+    costs = estimate_cause_costs(items) if costs is None else costs
+    ordered = lpt_order(items, costs)
+
+    # chunksize=1: 비는 워커가 남은 작업 중 가장 큰 것을 가져감
+    with Pool(processes=processes, initializer=initializer, initargs=initargs) as pool:
+        for item, result, wall_time in pool.imap_unordered(timed_task, [(func, item) for item in ordered], chunksize=1):
+            yield item, result, wall_time
+
+def run_cost_aware_map(func, items, costs: dict = None, processes: int = 96, initializer=None, initargs=()):
+
+    # pool.map 대체: 결과는 items 순서로, 작업별 비용 / 실행 시간은 DataFrame 으로 반환
+    items = list(items)
+    costs = estimate_cause_costs(items) if costs is None else costs
+    results = {}
+    timings = []
+
+    for item, result, wall_time in tqdm(run_cost_aware_tasks(func, items, costs, processes, initializer, initargs), total=len(items)):
+        results[item] = result
+        timings.append({'item': item, 'estimated_cost': costs.get(item), 'wall_time': wall_time})
+
+    return [results[item] for item in items], pd.DataFrame(timings)
+
+def calibrate_cost_model(timings: pd.DataFrame, cost_col: str = 'cohort_rows', time_col: str = 'wall_time') -> tuple:
+
+    # log(wall time) = log(a) + b * log(행 수) 회귀로 비용 모델 (a, b) 추정
+    # (ctable_stage_timings 결과는 그대로, run_cost_aware_map 결과는 cost_col='estimated_cost' 로 사용)
+    valid = timings[(timings[cost_col] > 0) & (timings[time_col] > 0)]
+
+    if len(valid) < 2:
+        raise ValueError("Error: 비용 모델을 추정하기 위한 timing 기록이 부족합니다.")
+
+    b, log_a = np.polyfit(np.log(valid[cost_col].astype(float)), np.log(valid[time_col].astype(float)), 1)
+
+    return float(np.exp(log_a)), float(b)
+
+def ctable_stage_dir(fu):
+    return f'{ctable_path}ctable_{fu}'
+
+def read_ctable_manifest(stage_dir: str) -> list:
+
+    # 완료된 cause 기록 (한 줄에 하나, 중단 시 마지막 불완전한 줄은 무시)
+    manifest_file = os.path.join(stage_dir, 'manifest.jsonl')
+    records = []
+
+    if not os.path.exists(manifest_file):
+        return records
+
+    with open(manifest_file) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+
+    return records
+
+def run_ctable_stage(
+    fu,
+    diseases_list,
+    outcome_index,
+    processes: int = 96,
+    stage_dir: str = None,
+    edge_pids_dir: str = None,
+    cost_model: tuple = None
+):
+    """
+    cause 단위로 결과가 나오는 즉시 저장하는 재시작 가능한 ctable 단계
+
+    fu: follow-up 연도
+    diseases_list: cause / outcome 질병 코드 목록
+    outcome_index: 해당 연도의 OutcomeIndex (또는 (PERSON_ID, abb_sick) 배열)
+    stage_dir: ctable 행 (rows/) 과 manifest.jsonl 을 저장할 폴더 (기본: ctable_path/ctable_{fu})
+    edge_pids_dir: edge PID 저장소 폴더 (기본: edge_pids_store_dir(fu))
+    cost_model: calibrate_cost_model 결과 (None 이면 cohort 행 수를 비용으로 사용)
+
+    cause 는 예상 비용이 큰 순서로 하나의 Pool 에 배분하고 (run_cost_aware_tasks),
+    manifest 에 cause 별 예상 비용과 실행 시간을 함께 기록한다 (ctable_stage_timings 로 확인).
+
+    각 cause 의 ctable 행은 row group 으로 column store 에 이어붙이고, edge PID 는 EdgePidsWriter 로 기록한 뒤
+    manifest 에 cause 를 추가한다. 다시 실행하면 manifest 에 있는 cause 는 건너뛴다.
+    """
+    stage_dir = ctable_stage_dir(fu) if stage_dir is None else stage_dir
+    edge_pids_dir = edge_pids_store_dir(fu) if edge_pids_dir is None else edge_pids_dir
+    rows_dir = os.path.join(stage_dir, 'rows')
+    manifest_file = os.path.join(stage_dir, 'manifest.jsonl')
+
+    os.makedirs(stage_dir, exist_ok=True)
+
+    # manifest 에 기록되기 전에 중단된 cause 의 행은 버림
+    manifest = read_ctable_manifest(stage_dir)
+    committed_rows = manifest[-1]['row_stop'] if manifest else 0
+    truncate_column_store(rows_dir, committed_rows)
+
+    # 마지막 불완전한 줄을 버린 manifest 를 임시 파일에 쓴 뒤 교체 (교체 도중 중단되어도 기존 manifest 유지)
+    with open(f'{manifest_file}.tmp', 'w') as f:
+        for record in manifest:
+            f.write(json.dumps(record) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f'{manifest_file}.tmp', manifest_file)
+
+    done_causes = {record['cause_abb'] for record in manifest}
+    remaining = [cause_abb for cause_abb in diseases_list if str(cause_abb) not in done_causes]
+
+    edge_pids_writer = EdgePidsWriter(edge_pids_dir)
+
+    if remaining:
+
+        row_counts = {cause_abb: cohort_row_count(cause_abb) for cause_abb in remaining}
+        costs = estimate_cause_costs(remaining, cost_model, row_counts)
+        spec = publish_ctable_datasets(diseases_list, outcome_index)
+        row_stop = committed_rows
+
+        try:
+            with open(manifest_file, 'a') as manifest_f:
+
+                tasks = run_cost_aware_tasks(
+                    process_disease_pair_shared, remaining, costs, processes,
+                    initializer=attach_shared_arrays, initargs=(spec,)
+                )
+
+                for cause_abb, result, wall_time in tqdm(tasks, total=len(remaining)):
+
+                    cause_abb_list, outcome_abb_list, ct00_list, ct01_list, ct10_list, ct11_list, edge_pids_dict = result
+
+                    if cause_abb_list:
+                        row_stop = append_column_store(rows_dir, {
+                            'cause_abb': np.asarray(cause_abb_list, dtype=str),
+                            'outcome_abb': np.asarray(outcome_abb_list, dtype=str),
+                            'ct00': np.asarray(ct00_list, dtype=np.int64),
+                            'ct01': np.asarray(ct01_list, dtype=np.int64),
+                            'ct10': np.asarray(ct10_list, dtype=np.int64),
+                            'ct11': np.asarray(ct11_list, dtype=np.int64)
+                        })['n_rows']
+                        edge_pids_writer.append(edge_pids_dict)
+
+                    manifest_f.write(json.dumps({
+                        'cause_abb': str(cause_abb),
+                        'n_rows': len(cause_abb_list),
+                        'row_stop': row_stop,
+                        'n_edges': len(edge_pids_dict),
+                        'cohort_rows': int(row_counts[cause_abb]),
+                        'estimated_cost': costs[cause_abb],
+                        'wall_time': wall_time
+                    }) + '\n')
+                    manifest_f.flush()
+                    os.fsync(manifest_f.fileno())
+        finally:
+            release_shared_arrays()
+
+    edge_pids_writer.finalize()
+
+    return read_ctable_stage(stage_dir, diseases_list)
+
+def ctable_stage_timings(stage_dir: str) -> pd.DataFrame:
+
+    # manifest 의 cause 별 예상 비용 / 실행 시간 (calibrate_cost_model 입력으로 사용)
+    manifest = read_ctable_manifest(stage_dir)
+    timings = pd.DataFrame(
+        [record for record in manifest if 'wall_time' in record],
+        columns=['cause_abb', 'n_rows', 'n_edges', 'cohort_rows', 'estimated_cost', 'wall_time']
+    )
+
+    return timings
+
+def read_ctable_stage(stage_dir: str, diseases_list=None) -> pd.DataFrame:
+
+    # run_ctable_stage 결과를 기존 ctable CSV 와 같은 컬럼 (및 diseases_list 순서) 의 DataFrame 으로 읽기
+    manifest = read_ctable_manifest(stage_dir)
+    rows_dir = os.path.join(stage_dir, 'rows')
+    ctable_cols = ['cause_abb', 'outcome_abb', 'ct00', 'ct01', 'ct10', 'ct11']
+
+    if not manifest:
+        return pd.DataFrame(columns=ctable_cols)
+
+    # manifest 에 commit 된 행까지만 읽음 (파일은 건드리지 않음 -> 실행 중인 run_ctable_stage 와 함께 읽어도 안전)
+    row_stop = manifest[-1]['row_stop']
+    arrays, _ = read_column_store(rows_dir, ctable_cols)
+
+    ctable = pd.DataFrame({
+        col: arrays[col][:row_stop].astype(object) if col in ('cause_abb', 'outcome_abb') else np.array(arrays[col][:row_stop])
+        for col in ctable_cols
+    })
+
+    if diseases_list is not None:
+        cause_order = {str(cause_abb): idx for idx, cause_abb in enumerate(diseases_list)}
+        ctable = ctable.iloc[np.argsort(ctable['cause_abb'].map(cause_order).to_numpy(), kind='stable')]
+
+    return ctable.reset_index(drop=True)
+
+def updating_disease_pair(previous_ctable_unfiltered_np, post_distinct_ctable_unfilterd_np):
+    
+    # B의 4열의 값을 A의 3열에서 빼고, A의 4열에서 더하기
+    previous_ctable_unfiltered_np[:, 2] -= post_distinct_ctable_unfilterd_np[:, 3]  # A의 3열에 B의 4열을 뺌
+    previous_ctable_unfiltered_np[:, 3] += post_distinct_ctable_unfilterd_np[:, 3]  # A의 4열에 B의 4열을 더함
+
+    # B의 6열의 값을 A의 5열에서 빼고, A의 6열에서 더하기
+    previous_ctable_unfiltered_np[:, 4] -= post_distinct_ctable_unfilterd_np[:, 5]  # A의 5열에 B의 6열을 뺌
+    previous_ctable_unfiltered_np[:, 5] += post_distinct_ctable_unfilterd_np[:, 5]  # A의 6열에 B의 6열을 더함
+    
+    updated_df = pd.DataFrame(previous_ctable_unfiltered_np, columns=['cause_abb', 'outcome_abb', 'ct00', 'ct01', 'ct10', 'ct11'])
+        
+    return updated_df
+
+def filtered_pair_cont_part_extract(updated_need_cause):
+
+    local_cause_abb_list = []
+    local_outcome_abb_list = []
+    local_ct00_list = []
+    local_ct01_list = []
+    local_ct10_list = []
+    local_ct11_list = []
+
+    # cause 데이터 불러오기 및 NumPy 변환
+    cause_np = read_matched_cause_np(updated_need_cause)
+
+    case_number = np.sum(cause_np[:, 1] == 1)
+    control_number = np.sum(cause_np[:, 1] == 0)
+
+    local_cause_abb_list.append(updated_need_cause)
+    local_ct00_list.append(control_number)
+    local_ct01_list.append(0)
+    local_ct10_list.append(case_number)
+    local_ct11_list.append(0)
+    
+    return local_cause_abb_list, local_ct00_list, local_ct01_list, local_ct10_list, local_ct11_list
+
+def full_to_final(full_ctable, return_option=True, save_option=False, save_path=None):
+    final_ctable = full_ctable.loc[
+        (full_ctable['ct00'] >= 5) &
+        (full_ctable['ct01'] >= 5) &
+        (full_ctable['ct10'] >= 5) &
+        (full_ctable['ct11'] >= 5)
+    ]
+    
+    final_ctable = final_ctable.reset_index(drop=True)
+    
+    if save_option and save_path is not None:
+        final_ctable.to_csv(save_path, index=False)
+    
+    if return_option:
+        return final_ctable
+
+def make_counts_dict(df: pd.DataFrame, collist: list, prefix_list: list):
+    col_num = len(collist)
+    
+    if col_num != len(prefix_list):
+        raise ValueError("Error: 'collist'와 'prefix_list'의 길이가 일치하지 않습니다.")
+    
+    if col_num == 0:
+        raise ValueError("Error: 'collist' 길이가 0입니다.")
+    
+    if not all(col in df.columns for col in collist):
+        raise ValueError("Error: 'collist'에 포함된 일부 컬럼이 데이터프레임에 없습니다.")
+
+    if col_num == 1:
+        counts_dict = df[collist[0]].value_counts().to_dict()
+        try:
+            counts_dict = dict(sorted(counts_dict.items(), key=lambda item: int(item[0])))
+        except ValueError:
+            print("정수로 변환할 수 없는 key가 존재합니다.")
+            raise
+
+        counts_dict = {
+            f"{prefix_list[0]}_{k}_counts": v for k, v in counts_dict.items()
+        }
+        return counts_dict
+
+    else:
+        counts_dict = df[collist].value_counts().to_dict()
+        try:
+            counts_dict = dict(
+                sorted(counts_dict.items(), key=lambda item: tuple(map(int, item[0])))
+            )
+        except ValueError:
+            print("정수로 변환할 수 없는 key가 존재합니다.")
+            raise
+
+        # 동적 key 이름 구성
+        renamed_dict = {}
+        for k, v in counts_dict.items():
+            key_parts = [
+                f"{prefix_list[i]}_{k[i]}" for i in range(col_num)
+            ]
+            final_key = "_".join(key_parts) + "_counts"
+            renamed_dict[final_key] = v
+
+        return renamed_dict
+    
+def format_attr_counts(counts, labels: dict, collist: list, prefix_list: list, observed=None):
+
+    # collist label 축을 가진 카운트 배열 -> make_counts_dict 형식 dict (0 인 조합은 observed 인 경우만 포함)
+    col_num = len(collist)
+    sizes = [len(labels[col]) for col in collist]
+    counts = np.asarray(counts).reshape(sizes)
+
+    include = counts > 0
+    if observed is not None:
+        include |= observed
+
+    label_idx = np.nonzero(include)
+    keys = [tuple(labels[col][i] for col, i in zip(collist, idx)) for idx in zip(*[pos.tolist() for pos in label_idx])]
+
+    try:
+        items = sorted(zip(keys, counts[label_idx].tolist()), key=lambda item: tuple(map(int, item[0])))
+    except ValueError:
+        print("정수로 변환할 수 없는 key가 존재합니다.")
+        raise
+
+    return {
+        "_".join(f"{prefix_list[i]}_{k[i]}" for i in range(col_num)) + "_counts": v
+        for k, v in items
+    }
+
+def merge_dicts(*dicts):
+    result = {}
+    for d in dicts:
+        result.update(d)
+    return result
+    
+def matched_cohort_codes(cause_abb, codec: PipelineCodec = None) -> tuple:
+
+    # matched cohort 를 codec 정수 코드 배열로 읽음 (cohort 별 label -> codec 코드 재매핑, SIDO 는 SGG 앞 2자리)
+    # codec (std_pop4) 에 없는 label 은 label 목록 뒤에 추가해 자기 label 로 카운트 (PipelineCodec.extend_attr)
+    # return: (codes, labels) - labels 는 cube 축 label 목록, cohort 에 등장한 코드는 cohort 의 label 표기
+    #   (카운트 key 를 기존 make_counts_dict 와 같이 matched cohort 의 값으로 만들기 위함)
+    codec = get_codec() if codec is None else codec
+
+    if not matched_cache_is_fresh(cause_abb):
+        convert_matched_cohort(cause_abb)
+
+    arrays, meta = read_column_store(matched_cache_dir(cause_abb), ['PERSON_ID', 'case'] + matched_demo_cols)
+    codes = {'PERSON_ID': arrays['PERSON_ID'], 'case': arrays['case']}
+    labels = {col: list(col_labels) for col, col_labels in codec.attr_labels.items()}
+
+    for col in matched_demo_cols:
+
+        cohort_labels = meta['labels'][col]
+
+        if col == 'SGG':
+            col, cohort_labels = 'SIDO', [label[:2] if isinstance(label, str) else None for label in cohort_labels]
+
+        if col not in codec.attr_labels:
+            continue
+
+        col_codes, labels[col] = codec.extend_attr(col, cohort_labels)
+        remap = np.append(col_codes, -1).astype(np.int8)
+        codes[col] = remap[arrays[col if col != 'SIDO' else 'SGG']]
+
+        for label, code in zip(cohort_labels, remap[:-1].tolist()):
+            if code >= 0:
+                labels[col][code] = label
+
+    return codes, labels
+
+def node_pids_info_extractor(cause_abb):
+
+    # 사전 준비: build_codec(diseases_list, get_all_std_info()) 로 codec 을 한 번 저장해 두어야 함 (없으면 get_codec 이 ValueError)
+    codec = get_codec()
+    matched_codes, matched_labels = matched_cohort_codes(cause_abb, codec)
+
+    # case 의 SEX x AGE_GROUP x SIDO x CTRB joint histogram 을 한 번 계산한 뒤 모든 카운트는 축 합산으로 생성
+    # (cube 축은 codec label + std_pop4 에 없는 cohort label 이므로, 없는 label 이 있는 cohort 만 shape 이 커짐)
+    case_mask = matched_codes['case'] == 1
+    target_rows = np.column_stack([matched_codes[col][case_mask] for col in std_attr_cols])
+    cube = attr_cube(target_rows, matched_labels)
+
+    # 다중 컬럼은 기존 category 변환 결과와 같이 등장한 값들의 조합을 0 도 포함
+    combined_dict = merge_dicts({'node_code': f'{cause_abb}'},\
+                                cube_counts_dict(cube, matched_labels, observed_product=True))
+
+    return combined_dict
+
+def move_column(df: pd.DataFrame, column_name, new_index):
+    # 컬럼 제거 후 삽입
+    cols = list(df.columns)
+    cols.insert(new_index, cols.pop(cols.index(column_name)))
+    return df[cols]
+
+def node_shape_col_maker(node_pids_info: pd.DataFrame):
+    
+    node_pids_info['width'] = node_pids_info['sex_2_counts'].rank(method='min') / len(node_pids_info)
+    node_pids_info['height'] = node_pids_info['sex_1_counts'].rank(method='min') / len(node_pids_info)
+    
+    node_pids_info = move_column(node_pids_info, 'width', 1)
+    node_pids_info = move_column(node_pids_info, 'height', 2)
+    
+    return node_pids_info
+    
+def get_all_std_info():
+
+    # std_pop4 는 import 시점이 아니라 처음 사용할 때 한 번만 읽어서 모듈 변수 all_std_info 로 캐시
+    # (fun_py.all_std_info 에 다른 DataFrame 을 대입하면 그 값을 사용)
+    global all_std_info
+
+    if 'all_std_info' not in globals():
+        std_info = pyreadstat.read_sas7bdat(f'{sas_path}std_pop4.sas7bdat')[0]
+        std_info['PERSON_ID'] = std_info['PERSON_ID'].astype(int)
+        all_std_info = std_info.drop(columns = ['case'])
+
+    return all_std_info
+
+def __getattr__(name):
+
+    # 기존 fun_py.all_std_info 접근은 그대로 동작 (처음 접근할 때 로드)
+    if name == 'all_std_info':
+        return get_all_std_info()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+attr_count_combos = [
+    (['SEX'], ['sex']),
+    (['AGE_GROUP'], ['age']),
+    (['SIDO'], ['sido']),
+    (['CTRB_PT_TYPE_CD'], ['ctrb']),
+    (['SEX', 'AGE_GROUP'], ['sex', 'age']),
+    (['SEX', 'SIDO'], ['sex', 'sido']),
+    (['SEX', 'CTRB_PT_TYPE_CD'], ['sex', 'ctrb'])
+]
+
+_pid_attr_table = None
+
+def build_pid_attr_table(std_info: pd.DataFrame = None, codec: PipelineCodec = None):
+    """
+    codec PID 코드로 바로 조회하는 인구학 코드 테이블
+
+    return: (codec PID 수, len(std_attr_cols)) int8 배열
+        table[codec.encode_pids(PERSON_ID), j] = std_attr_cols[j] 의 codec 코드 (-1 은 결측 / 정보 없음)
+    """
+    codec = get_codec() if codec is None else codec
+    std_info = get_all_std_info() if std_info is None else std_info
+
+    pid_codes = codec.encode_pids(std_info['PERSON_ID'])
+    valid = pid_codes >= 0
+    table = np.full((len(codec.pids), len(std_attr_cols)), -1, dtype=np.int8)
+
+    for j, col in enumerate(std_attr_cols):
+        values = std_info['SGG'].str[:2] if col == 'SIDO' else std_info[col]
+        table[pid_codes[valid], j] = codec.encode_attr(col, values)[valid]
+
+    return table
+
+def std_info_to_arrays(std_info: pd.DataFrame, codec: PipelineCodec = None):
+
+    # shared memory 게시용: 정렬된 PERSON_ID (codec PID 목록) + PID 코드별 인구학 코드 테이블
+    codec = get_codec() if codec is None else codec
+
+    arrays = {
+        'std_person_id': codec.pids,
+        'pid_attr_table': build_pid_attr_table(std_info, codec)
+    }
+    meta = {'std_labels': codec.attr_labels}
+
+    return arrays, meta
+
+def pid_attr_table():
+
+    # shared memory 에 게시된 테이블이 있으면 사용, 없으면 프로세스당 한 번 생성
+    global _pid_attr_table
+
+    if 'pid_attr_table' in _shared_arrays:
+        return get_shared_array('pid_attr_table')
+
+    if _pid_attr_table is None:
+        _pid_attr_table = build_pid_attr_table()
+
+    return _pid_attr_table
+
+def attr_person_ids():
+    return get_shared_array('std_person_id') if 'std_person_id' in _shared_arrays else get_codec().pids
+
+def attr_labels():
+    return _shared_meta['std_labels'] if 'std_person_id' in _shared_arrays else get_codec().attr_labels
+
+def encode_attr_pids(pids):
+
+    # PERSON_ID -> pid_attr_table 행 번호 (정보가 없는 PID 는 -1)
+    person_ids = attr_person_ids()
+    pids = np.asarray(pids, dtype=np.int64)
+
+    if len(person_ids) == 0:
+        return np.full(pids.shape, -1, dtype=np.int64)
+
+    pos = np.searchsorted(person_ids, pids)
+    pos[pos == len(person_ids)] = 0
+    pos[person_ids[pos] != pids] = -1
+
+    return pos
+
+def pid_attr_rows(pids):
+
+    # PID 목록 (중복 제거) 의 인구학 코드 행 gather
+    pid_codes = np.unique(encode_attr_pids(pids))
+
+    return pid_codes[pid_codes >= 0], pid_attr_table()[pid_codes[pid_codes >= 0]]
+
+def attr_cube_shape(labels: dict = None) -> tuple:
+
+    # std_attr_cols 순서 (SEX, AGE_GROUP, SIDO, CTRB_PT_TYPE_CD) 의 label 수 + 결측 칸 1개
+    labels = attr_labels() if labels is None else labels
+    return tuple(len(labels[col]) + 1 for col in std_attr_cols)
+
+def attr_cube_cells(rows, shape: tuple):
+
+    # 인구학 코드 행 (n, len(std_attr_cols)) -> joint histogram 칸 번호 (결측 -1 은 각 축의 마지막 칸)
+    rows = np.asarray(rows, dtype=np.int64).reshape(-1, len(std_attr_cols))
+    rows = np.where(rows < 0, np.asarray(shape) - 1, rows)
+
+    return np.ravel_multi_index(tuple(rows.T), shape)
+
+def attr_cube(rows, labels: dict = None):
+    """
+    SEX x AGE_GROUP x SIDO x CTRB_PT_TYPE_CD joint histogram (고정 shape int64 tensor)
+
+    rows: 인구학 코드 행 (pid_attr_rows 결과 등, 열 순서 = std_attr_cols)
+    각 축의 마지막 칸은 결측 -> 단일 / 다중 컬럼 카운트는 cube_marginal 로 축을 합산해서 계산
+    """
+    shape = attr_cube_shape(labels)
+    cells = attr_cube_cells(rows, shape)
+
+    return np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+
+def cube_marginal(cube, collist: list):
+
+    # cube (앞쪽 batch 축 허용) 에서 collist 이외의 축을 합산, collist 축의 결측 칸은 제외
+    cube = np.asarray(cube)
+    n_batch_axes = cube.ndim - len(std_attr_cols)
+    axes = [std_attr_cols.index(col) for col in collist]
+
+    drop_axes = tuple(n_batch_axes + axis for axis in range(len(std_attr_cols)) if axis not in axes)
+    marginal = cube.sum(axis=drop_axes)
+
+    # 남은 축은 std_attr_cols 순서 -> collist 순서로 재배치 후 결측 칸 제거
+    kept = sorted(axes)
+    marginal = np.moveaxis(marginal, [n_batch_axes + kept.index(axis) for axis in axes], [n_batch_axes + i for i in range(len(axes))])
+
+    return marginal[(Ellipsis,) + tuple(slice(0, -1) for _ in axes)]
+
+def cube_counts_dict(cube, labels: dict = None, combos: list = None, observed_product: bool = False) -> dict:
+
+    # cube 하나에서 attr_count_combos 의 모든 카운트 dict 를 축 합산으로 생성
+    labels = attr_labels() if labels is None else labels
+    combos = attr_count_combos if combos is None else combos
+    counts_dict = {}
+
+    for collist, prefix_list in combos:
+
+        observed = None
+        if observed_product and len(collist) > 1:
+            # 각 컬럼에 등장한 값 (다른 컬럼 결측 포함) 들의 모든 조합
+            observed = np.ones([len(labels[col]) for col in collist], dtype=bool)
+            for axis, col in enumerate(collist):
+                col_observed = cube_marginal(cube, [col]) > 0
+                observed &= col_observed.reshape([-1 if i == axis else 1 for i in range(len(collist))])
+
+        counts_dict.update(format_attr_counts(cube_marginal(cube, collist), labels, collist, prefix_list, observed))
+
+    return counts_dict
+
+def batch_attr_cube_cells(pids, offsets, labels: dict = None):
+
+    # 여러 edge 의 joint histogram 을 0 이 아닌 칸만 (edge 번호, 칸 번호, 카운트) 로 계산 (PID 는 한 번만 순회)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_edges = len(offsets) - 1
+    shape = attr_cube_shape(labels)
+    n_cells = int(np.prod(shape))
+
+    edge_idx = np.repeat(np.arange(n_edges, dtype=np.int64), np.diff(offsets))
+    pid_codes = encode_attr_pids(np.asarray(pids)[offsets[0]:offsets[-1]])
+    valid = pid_codes >= 0
+
+    # edge 내 중복 PID 는 한 번만 카운트 (기존 isin 기반 추출과 동일)
+    n_person_ids = max(len(attr_person_ids()), 1)
+    keys = np.unique(edge_idx[valid] * n_person_ids + pid_codes[valid])
+    edge_idx, pid_codes = keys // n_person_ids, keys % n_person_ids
+
+    cells = attr_cube_cells(pid_attr_table()[pid_codes], shape)
+    cell_keys, cell_counts = np.unique(edge_idx * n_cells + cells, return_counts=True)
+
+    return cell_keys // n_cells, cell_keys % n_cells, cell_counts
+
+def batch_attr_cubes(pids, offsets, labels: dict = None):
+
+    # (edge 수, *attr_cube_shape()) int32 joint histogram (batch 크기는 메모리에 맞게 조절)
+    shape = attr_cube_shape(labels)
+    n_edges = len(offsets) - 1
+    edge_idx, cells, counts = batch_attr_cube_cells(pids, offsets, labels)
+
+    cubes = np.zeros((n_edges, int(np.prod(shape))), dtype=np.int32)
+    cubes[edge_idx, cells] = counts
+
+    return cubes.reshape((n_edges,) + shape)
+
+def batch_attr_counts(pids, offsets, combos: list = None) -> dict:
+    """
+    여러 edge 의 인구학 카운트를 한 번에 계산
+
+    pids: edge PID 를 이어붙인 배열
+    offsets: edge i 의 PID 는 pids[offsets[i]:offsets[i + 1]]
+    combos: [(컬럼 목록, prefix 목록), ...] (기본: attr_count_combos)
+
+    return: {tuple(컬럼 목록): (edge 수, label 조합 수) int64 카운트 행렬}
+        열 순서는 label 코드 row-major (attr_count_columns 로 컬럼명 확인)
+
+    joint histogram 의 0 이 아닌 칸을 한 번만 계산한 뒤 각 조합은 칸 -> 조합 번호 매핑으로 합산
+    """
+    combos = attr_count_combos if combos is None else combos
+    labels = attr_labels()
+    shape = attr_cube_shape(labels)
+    n_edges = len(offsets) - 1
+
+    edge_idx, cells, cell_counts = batch_attr_cube_cells(pids, offsets, labels)
+    cell_codes = np.unravel_index(np.arange(int(np.prod(shape))), shape)
+
+    count_matrices = {}
+
+    for collist, _ in combos:
+
+        # 칸 번호 -> 조합 번호 (collist 중 결측이 있는 칸은 -1)
+        sizes = [len(labels[col]) for col in collist]
+        n_bins = int(np.prod(sizes))
+        cell_bins = np.zeros(len(cell_codes[0]), dtype=np.int64)
+        cell_valid = np.ones(len(cell_codes[0]), dtype=bool)
+
+        for col, size in zip(collist, sizes):
+            col_codes = cell_codes[std_attr_cols.index(col)]
+            cell_valid &= col_codes < size
+            cell_bins = cell_bins * size + col_codes
+
+        bins = cell_bins[cells]
+        valid = cell_valid[cells]
+
+        counts = np.bincount(edge_idx[valid] * n_bins + bins[valid], weights=cell_counts[valid], minlength=n_edges * n_bins)
+        count_matrices[tuple(collist)] = counts.astype(np.int64).reshape(n_edges, n_bins)
+
+    return count_matrices
+
+def attr_count_columns(collist: list, prefix_list: list, labels: dict = None) -> list:
+
+    # batch_attr_counts 행렬의 열 이름 (make_counts_dict 의 key 형식)
+    labels = attr_labels() if labels is None else labels
+    label_grid = np.meshgrid(*[np.arange(len(labels[col])) for col in collist], indexing='ij')
+
+    return [
+        "_".join(f"{prefix}_{labels[col][i]}" for prefix, col, i in zip(prefix_list, collist, idx)) + "_counts"
+        for idx in zip(*[grid.ravel().tolist() for grid in label_grid])
+    ]
+
+def attr_count_frame(count_matrices: dict, combos: list = None, labels: dict = None, drop_zero_columns: bool = True) -> pd.DataFrame:
+
+    # 카운트 행렬 -> edge_pids_info 와 같은 wide DataFrame (label 은 정수 순 정렬)
+    # drop_zero_columns=False 이면 모든 label 조합을 컬럼으로 유지 (연도 / 데이터와 무관한 고정 schema)
+    combos = attr_count_combos if combos is None else combos
+    labels = attr_labels() if labels is None else labels
+    frames = []
+
+    for collist, prefix_list in combos:
+
+        counts = count_matrices[tuple(collist)]
+        columns = attr_count_columns(collist, prefix_list, labels)
+        keep = np.flatnonzero(counts.any(axis=0)) if drop_zero_columns else np.arange(counts.shape[1])
+
+        label_grid = np.unravel_index(keep, [len(labels[col]) for col in collist])
+        order = sorted(range(len(keep)), key=lambda i: tuple(int(labels[col][grid[i]]) for col, grid in zip(collist, label_grid)))
+        keep = keep[order]
+
+        frames.append(pd.DataFrame(counts[:, keep], columns=[columns[i] for i in keep]))
+
+    return pd.concat(frames, axis=1)
+
+def edge_pids_info_batch(edge_pids, batch_size: int = 10000, drop_zero_columns: bool = True) -> pd.DataFrame:
+    """
+    edge_pids_info_extractor 를 edge 마다 호출하는 대신 batch_size 개 edge 씩 묶어서 카운트
+
+    edge_pids: {(cause, outcome): PID 배열} dict 또는 EdgePidsStore
+    drop_zero_columns: False 이면 모든 label 조합 컬럼을 유지 (attr_count_frame 참조)
+    return: (cause_abb, outcome_abb, 카운트 컬럼...) DataFrame (pd.DataFrame(결과 list).fillna(0) 과 같은 값)
+
+    사전 준비: build_codec(diseases_list, get_all_std_info()) 로 codec 을 한 번 저장해 두어야 함 (없으면 get_codec 이 ValueError)
+    """
+    items = iter(edge_pids.items())
+    keys = []
+    count_batches = []
+
+    while True:
+
+        batch = [item for _, item in zip(range(batch_size), items)]
+
+        if not batch:
+            break
+
+        lengths = np.array([len(pids) for _, pids in batch], dtype=np.int64)
+        offsets = np.r_[0, np.cumsum(lengths)]
+        batch_pids = np.concatenate([np.asarray(pids, dtype=np.int64) for _, pids in batch]) if offsets[-1] > 0 else np.empty(0, dtype=np.int64)
+
+        keys.extend(key for key, _ in batch)
+        count_batches.append(batch_attr_counts(batch_pids, offsets))
+
+    count_matrices = {
+        tuple(collist): np.concatenate([counts[tuple(collist)] for counts in count_batches]) if count_batches
+                        else np.zeros((0, int(np.prod([len(attr_labels()[col]) for col in collist]))), dtype=np.int64)
+        for collist, _ in attr_count_combos
+    }
+
+    edge_pids_info = attr_count_frame(count_matrices, drop_zero_columns=drop_zero_columns)
+    edge_pids_info.insert(0, 'cause_abb', [str(key[0]) for key in keys])
+    edge_pids_info.insert(1, 'outcome_abb', [str(key[1]) for key in keys])
+
+    return edge_pids_info
+
+def edge_pids_info_extractor(one_edge_pids_item: tuple):
+
+    # 사전 준비: build_codec(diseases_list, get_all_std_info()) 로 codec 을 한 번 저장해 두어야 함 (없으면 get_codec 이 ValueError)
+    if len(one_edge_pids_item) != 2:
+        raise ValueError("Error: one_edge_pids_item - tuple 길이가 2가 아닙니다.")
+    
+    edge_pids_key = one_edge_pids_item[0]
+    edge_pids_value = one_edge_pids_item[1]
+    
+    if len(edge_pids_key) != 2:
+        raise ValueError("Error: edge_pids_key - tuple 길이가 2가 아닙니다.")
+        
+    if any(not re.fullmatch(r"[A-Z][0-9]{2}", item) for item in edge_pids_key):
+        raise ValueError("Error: edge_pids_key - tuple 내부에 형식에 맞지 않는 값이 존재합니다.")
+        
+    cause_abb = edge_pids_key[0]
+    outcome_abb = edge_pids_key[1]
+        
+    # edge PID 의 joint histogram 한 번으로 단일 / 다중 컬럼 카운트 생성
+    _, target_rows = pid_attr_rows(edge_pids_value)
+    cube = attr_cube(target_rows, attr_labels())
+
+    combined_dict = merge_dicts({'cause_abb': f'{cause_abb}', 'outcome_abb': f'{outcome_abb}'},\
+                                cube_counts_dict(cube, attr_labels()))
+    
+    return combined_dict
+
+def colname_type_setting(df: pd.DataFrame, set_start_col_idx: int, prefix: str):
+    
+    if set_start_col_idx < 0:
+        raise ValueError("Error: set_start_col_idx 는 0 이상이여야 합니다.")
+        
+    df_copy = df.copy(deep=True)
+    collist = list(df_copy.columns)
+    
+    for idx, colname in enumerate(collist):
+        if idx < set_start_col_idx:
+            continue
+        else:
+            df_copy[colname] = df_copy[colname].astype('Int64')
+            collist[idx] = f'{prefix}_{colname}'
+    
+    df_copy.columns = collist
+    
+    return df_copy
+
+def dict_sorting(target_dict: dict):
+    result = dict(sorted(target_dict.items(), key=lambda x: x[1], reverse=True))
+    return result
+
+def reorder_cluster_ids(cluster_assignments: dict) -> dict:
+    cluster_to_nodes = defaultdict(list)
+    for node, cluster_id in cluster_assignments.items():
+        cluster_to_nodes[cluster_id].append(node)
+    sorted_clusters = sorted(cluster_to_nodes.items(), key=lambda x: len(x[1]), reverse=True)
+    old_to_new = {old: new for new, (old, _) in enumerate(sorted_clusters)}
+    return {node: old_to_new[cluster] for node, cluster in cluster_assignments.items()}
+    
+def compute_from_file(
+    file_path,
+    auto_log_transform=True, 
+    use_largest_scc_for_clustering=True,
+    node_widths: dict = None,
+    node_heights: dict = None,
+    backend: str = 'networkx',
+    betweenness_workers: int = 1,
+    cache_dir: str = None,
+    cache_max_bytes: int = None,
+    **kwargs
+):
+    # kwargs: compute_network_features 의 betweenness_mode / betweenness_samples 등
+    # cache_dir: (파일 내용 해시 + 인자) 기준으로 결과를 저장 / 재사용할 경로 (None 이면 feature_cache_path, False 이면 cache 사용 안 함)
+    #   크기 제한은 cache_max_bytes, 저장 형식은 save_network_features (graph 는 edge 배열로만 저장 후 읽을 때 다시 생성)
+    cache_dir = feature_cache_path if cache_dir is None else cache_dir
+    params = {
+        'auto_log_transform': auto_log_transform,
+        'use_largest_scc_for_clustering': use_largest_scc_for_clustering,
+        'node_widths': node_widths,
+        'node_heights': node_heights,
+        'backend': backend,
+        **{name: value for name, value in kwargs.items() if name not in feature_cache_ignored_params}
+    }
+
+    if cache_dir:
+        key = feature_cache_key(file_path, params)
+        result = read_feature_cache(cache_dir, key, backend)
+
+        if result is not None:
+            return result
+
+    df = pd.read_csv(file_path)
+    result = compute_network_features(
+        df,
+        auto_log_transform,
+        use_largest_scc_for_clustering,
+        node_widths,
+        node_heights,
+        backend,
+        betweenness_workers,
+        **kwargs
+    )
+
+    if cache_dir:
+        n_bytes = write_feature_cache(cache_dir, key, result, {'file_path': os.path.abspath(file_path), 'params': params})
+        track_feature_cache_bytes(cache_dir, n_bytes, feature_cache_max_bytes if cache_max_bytes is None else cache_max_bytes)
+
+    return result
+
+feature_cache_path = f'{network_path}feature_cache/'
+feature_cache_max_bytes = 20 * 1024 ** 3
+
+# cache key 에 포함되는 버전 - feature 스키마 (save_network_features 형식) 나 지표 계산 코드를 바꾸면 올릴 것
+feature_cache_version = 2
+
+# 프로세스 내 cache 크기 추정치 ({절대 경로: bytes}, 처음 저장할 때 한 번만 전체를 세고 이후 저장한 항목 크기만 더함)
+_feature_cache_bytes = {}
+
+# 결과에 영향을 주지 않는 인자 (병렬 처리 / 하위 cache 설정) 는 cache key 에서 제외
+feature_cache_ignored_params = ['infomap_workers', 'infomap_cache_dir']
+
+def file_content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+
+    # 파일 내용의 sha256 (수정 시각 / 경로와 무관)
+    digest = hashlib.sha256()
+
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def feature_cache_key(file_path: str, params: dict) -> str:
+
+    # cache 버전 + 입력 파일 내용 해시 + 인자 (node 크기 dict 포함) 의 sha256
+    params_repr = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(f'{feature_cache_version}|{file_content_hash(file_path)}|{params_repr}'.encode()).hexdigest()
+
+def read_feature_cache(cache_dir: str, key: str, backend: str = 'networkx'):
+
+    # cache 에 있으면 결과를 읽고 접근 시각 갱신 (LRU 기준), 없으면 None
+    # graph 는 저장된 edge 배열에서 다시 생성 (backend='sparse' 이면 compute_network_features 와 같이 GraphCSR)
+    # 읽는 도중 다른 워커가 항목을 삭제한 경우 (파일 없음 / 길이가 맞지 않는 배열) 도 cache miss 로 처리
+    entry_dir = os.path.join(cache_dir, key)
+
+    try:
+        store = NetworkFeatureStore(entry_dir)
+        result = {name: store[name] for name in store.keys() if name != 'graph'}
+        result['graph'] = store.graph_csr() if backend == 'sparse' else store.graph()
+    except (OSError, ValueError):
+        return None
+
+    try:
+        os.utime(os.path.join(entry_dir, 'stats.json'))
+    except OSError:
+        pass
+
+    return result
+
+def write_feature_cache(cache_dir: str, key: str, result: dict, info: dict) -> int:
+
+    # save_network_features 형식 (pickle 없음) + 입력 정보 (info.json) 를 임시 디렉토리에 쓴 뒤 교체 (Parallel 워커가 동시에 써도 안전)
+    # -> 새로 저장한 항목 크기 (다른 워커가 먼저 저장했으면 0)
+    entry_dir = os.path.join(cache_dir, key)
+    tmp_dir = f'{entry_dir}.{os.getpid()}.tmp'
+
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_network_features(result, tmp_dir)
+
+    with open(os.path.join(tmp_dir, 'info.json'), 'w') as f:
+        json.dump(info, f, default=str)
+
+    n_bytes = directory_bytes(tmp_dir)
+
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # 다른 워커가 같은 key 를 먼저 저장한 경우
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return 0
+
+    return n_bytes
+
+def track_feature_cache_bytes(cache_dir: str, n_bytes: int, max_bytes: int) -> int:
+
+    # 저장할 때마다 디렉토리 전체를 세지 않도록 크기 추정치만 갱신하고, max_bytes 를 넘을 때만 evict_feature_cache 실행
+    # (다른 프로세스가 저장한 항목은 추정치에 빠지지만 evict 할 때 다시 세므로 다음 초과 시점에 반영됨) -> 삭제한 항목 수
+    cache_key = os.path.abspath(cache_dir)
+
+    if cache_key in _feature_cache_bytes:
+        _feature_cache_bytes[cache_key] += n_bytes
+    else:
+        _feature_cache_bytes[cache_key] = int(feature_cache_entries(cache_dir)['bytes'].sum())
+
+    if _feature_cache_bytes[cache_key] <= max_bytes:
+        return 0
+
+    n_removed = evict_feature_cache(cache_dir, max_bytes)
+    _feature_cache_bytes[cache_key] = int(feature_cache_entries(cache_dir)['bytes'].sum())
+
+    return n_removed
+
+def directory_bytes(path: str) -> int:
+
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except FileNotFoundError:
+                pass
+
+    return total
+
+def feature_cache_entries(cache_dir: str) -> pd.DataFrame:
+
+    # cache 항목 목록 (key, 입력 파일, 크기, 마지막 접근 시각) - 오래된 순
+    records = []
+
+    if not os.path.isdir(cache_dir):
+        return pd.DataFrame(columns=['key', 'file_path', 'bytes', 'last_used'])
+
+    for key in os.listdir(cache_dir):
+
+        entry_dir = os.path.join(cache_dir, key)
+
+        if key.endswith('.tmp') or not os.path.isdir(entry_dir):
+            continue
+
+        try:
+            last_used = os.stat(os.path.join(entry_dir, 'stats.json')).st_mtime
+        except FileNotFoundError:
+            continue
+
+        file_path = None
+        try:
+            with open(os.path.join(entry_dir, 'info.json')) as f:
+                file_path = json.load(f).get('file_path')
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        records.append({'key': key, 'file_path': file_path, 'bytes': directory_bytes(entry_dir), 'last_used': last_used})
+
+    entries = pd.DataFrame(records, columns=['key', 'file_path', 'bytes', 'last_used'])
+
+    return entries.sort_values('last_used', kind='stable').reset_index(drop=True)
+
+def remove_feature_cache_entry(cache_dir: str, key: str):
+
+    # 먼저 .tmp 이름으로 바꿔 (atomic) 새로 읽는 쪽에는 바로 cache miss 가 되게 한 뒤 삭제
+    entry_dir = os.path.join(cache_dir, key)
+    trash_dir = f'{entry_dir}.{os.getpid()}.evict.tmp'
+
+    try:
+        os.replace(entry_dir, trash_dir)
+    except OSError:
+        # 다른 워커가 이미 삭제한 경우
+        return
+
+    shutil.rmtree(trash_dir, ignore_errors=True)
+
+def evict_feature_cache(cache_dir: str, max_bytes: int = None) -> int:
+
+    # 전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 항목부터 삭제 -> 삭제한 항목 수
+    max_bytes = feature_cache_max_bytes if max_bytes is None else max_bytes
+    entries = feature_cache_entries(cache_dir)
+    excess = entries['bytes'].sum() - max_bytes
+    n_removed = 0
+
+    for key, n_bytes in zip(entries['key'], entries['bytes']):
+
+        if excess <= 0:
+            break
+
+        remove_feature_cache_entry(cache_dir, key)
+        excess -= n_bytes
+        n_removed += 1
+
+    return n_removed
+
+def invalidate_feature_cache(file_path: str = None, cache_dir: str = None) -> int:
+
+    # file_path 의 결과만 (내용이 바뀌기 전 결과 포함) 또는 전체 (file_path=None) 삭제 -> 삭제한 항목 수
+    cache_dir = feature_cache_path if cache_dir is None else cache_dir
+    entries = feature_cache_entries(cache_dir)
+
+    if file_path is not None:
+        entries = entries[entries['file_path'] == os.path.abspath(file_path)]
+
+    for key in entries['key']:
+        remove_feature_cache_entry(cache_dir, key)
+
+    return len(entries)
+
+def build_directed_graph_from_df(
+    df: pd.DataFrame,
+    weight_col: str = 'log_rr_values'
+) -> nx.DiGraph:
+    import networkx as nx
+
+    # 행 단위 add_edge 와 같은 결과 (노드 순서 = 처음 등장 순서, 중복 edge 는 마지막 weight)
+    cause, outcome, weight = edge_arrays_from_df(df, weight_col)
+
+    G = nx.DiGraph()
+    G.add_weighted_edges_from(zip(cause.tolist(), outcome.tolist(), weight.tolist()))
+    return G
+
+def edge_arrays_from_df(df: pd.DataFrame, weight_col: str = 'log_rr_values'):
+
+    # (cause, outcome, weight) 배열
+    return (
+        df['cause_abb'].to_numpy(dtype=object),
+        df['outcome_abb'].to_numpy(dtype=object),
+        df[weight_col].to_numpy(dtype=np.float64)
+    )
+
+class GraphCSR:
+    """
+    networkx 없이 수치 지표를 계산하기 위한 방향 그래프 CSR 인접 구조
+
+    nodes: 노드 이름 (처음 등장 순서 = networkx DiGraph 의 노드 순서)
+    indptr / indices / weights: source 노드 i 의 out-edge 는 indices[indptr[i]:indptr[i + 1]] (target 노드 번호 순)
+    node_attrs: {속성명: {노드: 값}} (width / height 등, to_networkx 에서 노드 속성으로 설정)
+    """
+
+    def __init__(self, nodes, indptr, indices, weights, node_attrs: dict = None):
+        self.nodes = np.asarray(nodes, dtype=object)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.node_attrs = {} if node_attrs is None else node_attrs
+
+    @classmethod
+    def from_arrays(cls, cause, outcome, weight):
+
+        cause = np.asarray(cause, dtype=object)
+        outcome = np.asarray(outcome, dtype=object)
+        weight = np.asarray(weight, dtype=np.float64)
+        n_rows = len(cause)
+
+        # (cause, outcome) 를 번갈아 나열한 뒤 factorize -> add_edge 순서의 노드 번호
+        interleaved = np.empty(2 * n_rows, dtype=object)
+        interleaved[0::2] = cause
+        interleaved[1::2] = outcome
+        codes, nodes = pd.factorize(interleaved)
+        src, dst = codes[0::2].astype(np.int64), codes[1::2].astype(np.int64)
+
+        # 같은 (source, target) 은 마지막 행의 weight 만 사용
+        n_nodes = len(nodes)
+        order = np.lexsort((np.arange(n_rows), dst, src))
+        key = src[order] * max(n_nodes, 1) + dst[order]
+        is_last = np.r_[key[1:] != key[:-1], True] if n_rows > 0 else np.zeros(0, dtype=bool)
+        order = order[is_last]
+
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src[order], minlength=n_nodes), out=indptr[1:])
+
+        return cls(np.asarray(nodes, dtype=object), indptr, dst[order], weight[order])
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, weight_col: str = 'log_rr_values'):
+        return cls.from_arrays(*edge_arrays_from_df(df, weight_col))
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def sources(self):
+
+        # edge 별 source 노드 번호 (indices 와 같은 순서)
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def subgraph(self, node_idx):
+
+        # node_idx (정렬된 노드 번호) 로 유도된 부분 그래프 (노드 순서 유지)
+        node_idx = np.asarray(node_idx, dtype=np.int64)
+        new_idx = np.full(self.n_nodes, -1, dtype=np.int64)
+        new_idx[node_idx] = np.arange(len(node_idx))
+
+        src = new_idx[self.sources()]
+        dst = new_idx[self.indices]
+        keep = (src >= 0) & (dst >= 0)
+
+        indptr = np.zeros(len(node_idx) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src[keep], minlength=len(node_idx)), out=indptr[1:])
+
+        return GraphCSR(self.nodes[node_idx], indptr, dst[keep], self.weights[keep])
+
+    def to_scipy(self):
+
+        # weight 가 0 인 edge 도 명시적 원소로 유지
+        from scipy import sparse
+
+        return sparse.csr_matrix((self.weights, self.indices, self.indptr), shape=(self.n_nodes, self.n_nodes))
+
+    def set_node_attrs(self, values: dict, name: str):
+
+        # nx.set_node_attributes 와 같이 그래프에 있는 노드의 값만 설정
+        node_set = set(self.nodes.tolist())
+        self.node_attrs.setdefault(name, {}).update({node: value for node, value in values.items() if node in node_set})
+
+    def to_networkx(self):
+
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self.nodes.tolist())
+        G.add_weighted_edges_from(zip(self.nodes[self.sources()].tolist(), self.nodes[self.indices].tolist(), self.weights.tolist()))
+
+        for name, values in self.node_attrs.items():
+            nx.set_node_attributes(G, values, name=name)
+
+        return G
+
+def network_graph(graph):
+
+    # compute_network_features 결과의 'graph' (nx.DiGraph 또는 sparse backend 의 GraphCSR) -> nx.DiGraph (그릴 때만 변환)
+    return graph.to_networkx() if isinstance(graph, GraphCSR) else graph
+
+def build_graph_from_arrays(cause, outcome, weight, return_networkx: bool = True):
+    """
+    (cause, outcome, weight) 배열에서 networkx DiGraph 와 GraphCSR 을 한 번에 생성
+
+    return_networkx: False 이면 networkx 를 import 하지 않고 (None, GraphCSR) 반환
+    return: (G, csr)
+    """
+    csr = GraphCSR.from_arrays(cause, outcome, weight)
+
+    if not return_networkx:
+        return None, csr
+
+    import networkx as nx
+
+    G = nx.DiGraph()
+    G.add_weighted_edges_from(zip(
+        np.asarray(cause, dtype=object).tolist(),
+        np.asarray(outcome, dtype=object).tolist(),
+        np.asarray(weight, dtype=np.float64).tolist()
+    ))
+
+    return G, csr
+
+def csr_pagerank(
+    csr: GraphCSR,
+    alpha: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1.0e-6,
+    nstart: dict = None,
+    return_info: bool = False
+):
+    """
+    nx.pagerank(G, weight='weight') 와 같은 power iteration (dangling 노드는 균등 분배)
+
+    nstart: {노드: 초기값} (nx.pagerank 의 nstart 와 같이 없는 노드는 0, 합이 1 이 되도록 정규화)
+    return_info: True 이면 (pagerank, {'iterations', 'residual', 'residuals'}) 반환 (residual 은 반복별 L1 변화량)
+    max_iter 회 안에 수렴하지 않으면 nx.PowerIterationFailedConvergence (networkx 는 이때만 import)
+    """
+    n_nodes = csr.n_nodes
+
+    if n_nodes == 0:
+        return (np.zeros(0), {'iterations': 0, 'residual': 0.0, 'residuals': []}) if return_info else np.zeros(0)
+
+    A = csr.to_scipy()
+    S = np.asarray(A.sum(axis=1)).ravel()
+    S[S != 0] = 1.0 / S[S != 0]
+    A = A.multiply(S[:, None]).tocsr()
+
+    if nstart is None:
+        x = np.repeat(1.0 / n_nodes, n_nodes)
+    else:
+        x = np.array([nstart.get(node, 0) for node in csr.nodes.tolist()], dtype=np.float64)
+        x /= x.sum()
+
+    p = np.repeat(1.0 / n_nodes, n_nodes)
+    is_dangling = np.where(S == 0)[0]
+    residuals = []
+
+    for iteration in range(1, max_iter + 1):
+        xlast = x
+        x = alpha * (A.T @ x + sum(x[is_dangling]) * p) + (1 - alpha) * p
+
+        residuals.append(float(np.absolute(x - xlast).sum()))
+
+        if residuals[-1] < n_nodes * tol:
+            return (x, {'iterations': iteration, 'residual': residuals[-1], 'residuals': residuals}) if return_info else x
+
+    # 수렴하지 않으면 nx.pagerank 와 같은 예외 (두 backend 에서 같은 except 로 처리)
+    import networkx as nx
+
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+def multi_year_pagerank(
+    graphs,
+    weight_col: str = 'log_rr_values',
+    alpha: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1.0e-6,
+    warm_start: bool = True,
+    compare_cold: bool = False
+):
+    """
+    follow-up 연도 순서로 PageRank 를 계산하면서 이전 연도 결과를 다음 연도의 초기값으로 사용 (sparse backend)
+
+    graphs: {fu: GraphCSR / filtered DataFrame / CSV 경로} (fu 순서대로 계산)
+    warm_start: False 이면 연도마다 균등 분포에서 시작 (nx.pagerank 와 동일)
+    compare_cold: True 이면 균등 분포 시작 반복 수 (cold_iterations) 도 함께 기록
+
+    return: ({fu: {노드: pagerank} (내림차순 정렬)}, 연도별 (fu, n_nodes, n_edges, warm_start, iterations, residual) DataFrame)
+    """
+    pageranks = {}
+    records = []
+    previous = None
+
+    for fu in sorted(graphs):
+
+        csr = graphs[fu]
+        if isinstance(csr, str):
+            csr = pd.read_csv(csr)
+        if isinstance(csr, pd.DataFrame):
+            csr = GraphCSR.from_df(csr, weight_col)
+
+        nstart = previous if warm_start else None
+
+        # 이전 연도와 겹치는 노드가 없으면 균등 분포에서 시작
+        if nstart is not None and not any(node in nstart for node in csr.nodes.tolist()):
+            nstart = None
+
+        values, info = csr_pagerank(csr, alpha, max_iter, tol, nstart=nstart, return_info=True)
+        pageranks[fu] = dict_sorting(dict(zip(csr.nodes.tolist(), values.tolist())))
+        previous = pageranks[fu]
+
+        record = {
+            'fu': fu,
+            'n_nodes': csr.n_nodes,
+            'n_edges': csr.n_edges,
+            'warm_start': nstart is not None,
+            'iterations': info['iterations'],
+            'residual': info['residual']
+        }
+
+        if compare_cold:
+            record['cold_iterations'] = info['iterations'] if nstart is None else csr_pagerank(csr, alpha, max_iter, tol, return_info=True)[1]['iterations']
+
+        records.append(record)
+
+    return pageranks, pd.DataFrame(records)
+
+temporal_value_cols = ['rr_values', 'log_rr_values']
+
+class TemporalDiseaseNetwork:
+    """
+    follow-up 연도별 최종 edge 테이블 (stat_cut_result 등) 을 하나의 edge key 배열로 합친 시계열 네트워크
+
+    nodes: 질병 코드 (모든 연도 합집합)
+    source / target: 중복 제거된 edge key (nodes 번호, (source, target) 오름차순)
+    presence: edge 별 연도 bitmask (years[i] 에 있으면 i 번째 bit)
+    values[col]: (edge x 연도) 값 행렬 (없는 연도는 NaN)
+    row_index: (edge x 연도) 원래 테이블의 행 위치 (없는 연도는 -1) -> edges(fu) 는 원래 행 순서로 복원
+
+    연도별 nx 그래프를 다시 만들지 않고 이웃 / edge 변화 / RR 추이를 배열 연산으로 조회
+    """
+
+    def __init__(self, nodes, years, source, target, presence, values: dict, row_index):
+        self.nodes = np.asarray(nodes, dtype=object)
+        self.years = list(years)
+        self.source = np.asarray(source, dtype=np.int32)
+        self.target = np.asarray(target, dtype=np.int32)
+        self.presence = np.asarray(presence)
+        self.values = {col: np.asarray(matrix, dtype=np.float64) for col, matrix in values.items()}
+        self.row_index = np.asarray(row_index, dtype=np.int32)
+
+        self._node_index = pd.Index(self.nodes)
+        self._edge_key = self.source.astype(np.int64) * max(len(self.nodes), 1) + self.target
+
+        # in-edge 조회용 (target, source) 정렬 순서
+        self._in_order = np.lexsort((self.source, self.target))
+        self._in_target = self.target[self._in_order]
+
+    @classmethod
+    def from_tables(cls, tables: dict, value_cols: list = None):
+        """
+        tables: {fu: 최종 edge DataFrame 또는 CSV 경로} (cause_abb, outcome_abb + value_cols)
+        value_cols: 연도별로 저장할 값 컬럼 (기본: rr_values, log_rr_values)
+        같은 연도 안에서 (cause, outcome) 가 중복되면 마지막 행 사용 (GraphCSR 과 동일)
+        """
+        value_cols = temporal_value_cols if value_cols is None else list(value_cols)
+        years = sorted(tables)
+
+        if len(years) > 64:
+            raise ValueError("Error: presence bitmask 는 64 개 연도까지 지원합니다.")
+
+        frames = []
+        for year_idx, fu in enumerate(years):
+            df = tables[fu]
+            if isinstance(df, str):
+                df = pd.read_csv(df, usecols=['cause_abb', 'outcome_abb', *value_cols])
+
+            frames.append(pd.DataFrame({
+                'cause_abb': df['cause_abb'].to_numpy(dtype=object),
+                'outcome_abb': df['outcome_abb'].to_numpy(dtype=object),
+                'year_idx': year_idx,
+                'row': np.arange(len(df)),
+                **{col: df[col].to_numpy(dtype=np.float64) for col in value_cols}
+            }))
+
+        long_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['cause_abb', 'outcome_abb', 'year_idx', 'row', *value_cols])
+
+        # 노드 번호는 코드 정렬 순서
+        interleaved = np.column_stack([long_df['cause_abb'].to_numpy(dtype=object), long_df['outcome_abb'].to_numpy(dtype=object)]).ravel()
+        codes, nodes = pd.factorize(interleaved, sort=True)
+        src, dst = codes[0::2].astype(np.int64), codes[1::2].astype(np.int64)
+
+        key = src * max(len(nodes), 1) + dst
+        edge_keys, edge_idx = np.unique(key, return_inverse=True)
+        year_idx = long_df['year_idx'].to_numpy(dtype=np.int64)
+
+        n_edges, n_years = len(edge_keys), len(years)
+        bitmask_dtype = np.uint16 if n_years <= 16 else (np.uint32 if n_years <= 32 else np.uint64)
+
+        # 행 순서대로 대입하므로 중복된 (edge, 연도) 는 마지막 행이 남음
+        row_index = np.full((n_edges, n_years), -1, dtype=np.int32)
+        row_index[edge_idx, year_idx] = long_df['row'].to_numpy(dtype=np.int64)
+
+        values = {}
+        for col in value_cols:
+            values[col] = np.full((n_edges, n_years), np.nan)
+            values[col][edge_idx, year_idx] = long_df[col].to_numpy(dtype=np.float64)
+
+        presence = np.zeros(n_edges, dtype=bitmask_dtype)
+        for i in range(n_years):
+            presence |= np.where(row_index[:, i] >= 0, bitmask_dtype(1 << i), bitmask_dtype(0))
+
+        n_nodes = max(len(nodes), 1)
+        return cls(nodes, years, edge_keys // n_nodes, edge_keys % n_nodes, presence, values, row_index)
+
+    @property
+    def n_edges(self):
+        return len(self.source)
+
+    def year_position(self, fu) -> int:
+        if fu not in self.years:
+            raise KeyError(f"Error: {fu} 연도가 없습니다.")
+        return self.years.index(fu)
+
+    def year_mask(self, fu) -> np.ndarray:
+
+        # fu 연도에 있는 edge 의 boolean mask
+        bit = self.presence.dtype.type(1 << self.year_position(fu))
+        return (self.presence & bit) != 0
+
+    def presence_counts(self) -> np.ndarray:
+
+        # edge 별 등장 연도 수
+        return (self.row_index >= 0).sum(axis=1)
+
+    def node_code(self, node) -> int:
+
+        code = self._node_index.get_indexer([node])[0]
+        if code < 0:
+            raise KeyError(node)
+        return code
+
+    def edge_position(self, cause, outcome):
+
+        # edge key 이진 탐색 (없으면 None)
+        key = self.node_code(cause) * max(len(self.nodes), 1) + self.node_code(outcome)
+        pos = np.searchsorted(self._edge_key, key)
+
+        if pos < self.n_edges and self._edge_key[pos] == key:
+            return pos
+        return None
+
+    def neighbors(self, node, fu, direction: str = 'out') -> list:
+        """
+        fu 연도의 이웃 노드 (direction: 'out' -> outcome, 'in' -> cause, 'both' -> 합집합, 코드 정렬 순서)
+        """
+        if direction not in ('out', 'in', 'both'):
+            raise ValueError(f"Error: 지원하지 않는 direction 입니다: {direction}")
+
+        code = self.node_code(node)
+        mask = self.year_mask(fu)
+        found = []
+
+        if direction in ('out', 'both'):
+            lo, hi = np.searchsorted(self.source, [code, code + 1])
+            found.append(self.target[lo:hi][mask[lo:hi]])
+
+        if direction in ('in', 'both'):
+            lo, hi = np.searchsorted(self._in_target, [code, code + 1])
+            in_pos = self._in_order[lo:hi]
+            found.append(self.source[in_pos][mask[in_pos]])
+
+        return self.nodes[np.unique(np.concatenate(found))].tolist()
+
+    def edges(self, fu, value_cols: list = None) -> pd.DataFrame:
+
+        # fu 연도의 edge 테이블 (원래 행 순서) -> compute_network_features / GraphCSR.from_df 입력으로 사용 가능
+        value_cols = list(self.values) if value_cols is None else value_cols
+        year_pos = self.year_position(fu)
+        pos = np.flatnonzero(self.year_mask(fu))
+        pos = pos[np.argsort(self.row_index[pos, year_pos], kind='stable')]
+
+        return pd.DataFrame({
+            'cause_abb': self.nodes[self.source[pos]],
+            'outcome_abb': self.nodes[self.target[pos]],
+            **{col: self.values[col][pos, year_pos] for col in value_cols}
+        })
+
+    def graph_csr(self, fu, weight_col: str = 'log_rr_values') -> GraphCSR:
+        return GraphCSR.from_df(self.edges(fu, [weight_col]), weight_col)
+
+    def edge_changes(self, fu_from, fu_to, value_col: str = 'rr_values') -> pd.DataFrame:
+        """
+        fu_from -> fu_to 사이에 새로 나타난 ('appeared') / 사라진 ('disappeared') edge
+        """
+        before, after = self.year_mask(fu_from), self.year_mask(fu_to)
+        pos = np.flatnonzero(before != after)
+        from_pos, to_pos = self.year_position(fu_from), self.year_position(fu_to)
+
+        return pd.DataFrame({
+            'cause_abb': self.nodes[self.source[pos]],
+            'outcome_abb': self.nodes[self.target[pos]],
+            'change': np.where(after[pos], 'appeared', 'disappeared'),
+            f'{value_col}_{fu_from}': self.values[value_col][pos, from_pos],
+            f'{value_col}_{fu_to}': self.values[value_col][pos, to_pos]
+        })
+
+    def trajectory(self, cause, outcome, value_col: str = 'rr_values') -> pd.Series:
+
+        # (cause, outcome) 의 연도별 값 (없는 연도는 NaN)
+        pos = self.edge_position(cause, outcome)
+        values = np.full(len(self.years), np.nan) if pos is None else self.values[value_col][pos]
+
+        return pd.Series(values, index=pd.Index(self.years, name='fu'), name=value_col)
+
+    def save(self, store_dir: str):
+
+        # edge key / presence / 연도별 값 컬럼을 column store 로 저장
+        columns = {'source': self.source, 'target': self.target, 'presence': self.presence}
+
+        for year_pos, fu in enumerate(self.years):
+            columns[f'row_index_{fu}'] = self.row_index[:, year_pos]
+            for col, matrix in self.values.items():
+                columns[f'{col}_{fu}'] = matrix[:, year_pos]
+
+        return write_column_store(store_dir, columns, {
+            'nodes': json_safe_labels(self.nodes),
+            'years': json_safe_labels(self.years),
+            'value_cols': list(self.values)
+        })
+
+    @classmethod
+    def load(cls, store_dir: str):
+
+        arrays, meta = read_column_store(store_dir, mmap=False)
+        years = meta['years']
+        n_edges = meta['n_rows']
+
+        def matrix(prefix, dtype):
+            if not years:
+                return np.empty((n_edges, 0), dtype=dtype)
+            return np.column_stack([arrays[f'{prefix}_{fu}'] for fu in years]).astype(dtype)
+
+        return cls(
+            meta['nodes'],
+            years,
+            arrays['source'],
+            arrays['target'],
+            arrays['presence'],
+            {col: matrix(col, np.float64) for col in meta['value_cols']},
+            matrix('row_index', np.int32)
+        )
+
+def shortest_path_dag_rank(n_nodes: int, source: int, src, dst) -> tuple:
+    """
+    최단 경로 tight edge (src -> dst) 들의 source 기준 위상 순서
+
+    weight 0 인 edge 가 있으면 거리만으로는 순서가 정해지지 않으므로 source 에서 DFS 로 위상 순서를 구하고,
+    weight 0 cycle 을 만드는 back edge 는 제외 (cycle 을 돌아 다시 오는 경로는 최단 경로에서 제외)
+
+    return: (rank: 노드별 위상 순서 (도달하지 않는 노드는 n_nodes), keep: back edge 가 아닌 edge 여부)
+    """
+    order = np.argsort(src, kind='stable')
+    offsets = np.searchsorted(src[order], np.arange(n_nodes + 1))
+    edge_dst = dst[order].tolist()
+
+    state = [0] * n_nodes  # 0: 미방문, 1: 탐색 중 (DFS stack), 2: 완료
+    keep = np.ones(len(src), dtype=bool)
+    postorder = []
+
+    state[source] = 1
+    stack = [(source, int(offsets[source]))]
+
+    while stack:
+        v, pos = stack[-1]
+
+        if pos == offsets[v + 1]:
+            stack.pop()
+            state[v] = 2
+            postorder.append(v)
+            continue
+
+        stack[-1] = (v, pos + 1)
+        w = edge_dst[pos]
+
+        if state[w] == 0:
+            state[w] = 1
+            stack.append((w, int(offsets[w])))
+        elif state[w] == 1:
+            keep[order[pos]] = False
+
+    rank = np.full(n_nodes, n_nodes, dtype=np.int64)
+    rank[postorder[::-1]] = np.arange(len(postorder))
+
+    return rank, keep
+
+def csr_betweenness_partial(csr: GraphCSR, sources) -> np.ndarray:
+    """
+    sources 에서 출발하는 최단 경로의 dependency 합 (Brandes, weight 기준, 정규화 전)
+
+    거리는 scipy.sparse.csgraph.dijkstra 로 한 번에 구하고,
+    최단 경로 DAG (dist[v] + w == dist[u] 인 edge) 위에서 위상 순서로 sigma / delta 를 누적
+    (길이 비교는 상대 오차 1e-12 허용 - nx 는 정확히 같을 때만 같은 길이로 보므로 log(2) + log(2) 와 log(4) 처럼
+    부동소수점 오차만 다른 경로가 있으면 값이 조금 다를 수 있음)
+    (weight 0 edge 는 shortest_path_dag_rank 로 순서를 정함 - weight 0 cycle 이 있으면 cycle 안의 경로 수는 DFS 순서에
+    따라 달라질 수 있음, nx.betweenness_centrality 도 이 경우 탐색 순서에 따라 값이 달라지므로 두 backend 값이 다를 수 있음)
+
+    음수 weight 는 지원하지 않음 (ValueError) - nx.betweenness_centrality 는 음수 weight 에서도 오류 없이
+    값을 반환하지만 Dijkstra 전제가 깨져 의미 있는 값이 아님
+    (compute_network_features 는 backend 와 관계없이 시작할 때 같은 메시지로 먼저 확인)
+    """
+    from scipy.sparse import csgraph
+
+    n_nodes = csr.n_nodes
+    sources = np.asarray(sources, dtype=np.int64)
+    betweenness = np.zeros(n_nodes)
+
+    if len(sources) == 0 or csr.n_edges == 0:
+        return betweenness
+
+    if (csr.weights < 0).any():
+        raise ValueError("Error: 음수 weight 가 있는 그래프는 betweenness 를 계산할 수 없습니다.")
+
+    src = csr.sources().astype(np.int64)
+    dst = csr.indices.astype(np.int64)
+    weights = csr.weights
+    not_loop = src != dst
+
+    dist = csgraph.dijkstra(csr.to_scipy(), directed=True, indices=sources)
+
+    for s, d in zip(sources.tolist(), dist):
+
+        d_src = d[src]
+        reachable = np.flatnonzero(not_loop & (dst != s) & np.isfinite(d_src))
+        tol = 1e-12 * max(1.0, float(d[np.isfinite(d)].max()))
+        tight = reachable[np.abs(d_src[reachable] + weights[reachable] - d[dst[reachable]]) <= tol]
+
+        if (d[dst[tight]] > d_src[tight]).all():
+            # 모든 tight edge 에서 거리가 증가하면 거리 순서가 곧 위상 순서
+            rank = d
+        else:
+            rank, keep = shortest_path_dag_rank(n_nodes, s, src[tight], dst[tight])
+            tight = tight[keep]
+
+        # sigma: 위상 순서가 앞선 노드에서 나가는 edge 부터 (선행 노드의 sigma 가 먼저 확정됨)
+        forward = tight[np.argsort(rank[src[tight]], kind='stable')]
+        sigma = [0.0] * n_nodes
+        sigma[s] = 1.0
+        for v, w in zip(src[forward].tolist(), dst[forward].tolist()):
+            sigma[w] += sigma[v]
+
+        # delta: 위상 순서가 뒤인 노드로 들어가는 edge 부터 (sigma 가 0 인 노드에서 나가는 edge 는 기여가 없으므로 제외)
+        backward = tight[np.argsort(-rank[dst[tight]], kind='stable')]
+        backward = backward[np.asarray(sigma)[src[backward]] > 0]
+        delta = [0.0] * n_nodes
+        for v, w in zip(src[backward].tolist(), dst[backward].tolist()):
+            delta[v] += sigma[v] * ((1 + delta[w]) / sigma[w])
+
+        delta[s] = 0.0
+        betweenness += delta
+
+    return betweenness
+
+def rescale_betweenness(betweenness, n_nodes: int, normalized: bool = True, sampled=None):
+
+    # nx.betweenness_centrality 의 방향 그래프 정규화 (1 / ((n - 1)(n - 2)))
+    # sampled (표본 source 노드 번호) 가 있으면 nx 의 k 옵션과 같이 표본 source 노드는 k - 1, 나머지는 k 개 source 기준으로 보정
+    if n_nodes <= 2:
+        return betweenness
+
+    if sampled is None:
+        return betweenness * (1 / ((n_nodes - 1) * (n_nodes - 2))) if normalized else betweenness
+
+    k = len(sampled)
+    base = 1 / (n_nodes - 2) if normalized else n_nodes - 1
+    scale = np.full(n_nodes, base / k)
+    scale[np.asarray(sampled, dtype=np.int64)] = base / (k - 1) if k > 1 else np.nan
+
+    return betweenness * scale
+
+def csr_betweenness(csr: GraphCSR, normalized: bool = True):
+
+    # nx.betweenness_centrality(G, weight='weight') 와 같은 값 (노드 순서 배열)
+    return rescale_betweenness(csr_betweenness_partial(csr, np.arange(csr.n_nodes)), csr.n_nodes, normalized)
+
+graph_shared_names = ['graph_indptr', 'graph_indices', 'graph_weights']
+
+def publish_graph_csr(csr: GraphCSR) -> dict:
+
+    # betweenness 워커가 공유할 CSR 인접 구조 (노드 이름은 넘기지 않음)
+    return publish_shared_arrays(
+        dict(zip(graph_shared_names, [csr.indptr, csr.indices, csr.weights])),
+        {'graph_n_nodes': csr.n_nodes}
+    )
+
+def shared_graph_csr() -> GraphCSR:
+
+    # 워커에서 shared memory 위의 CSR 을 복사 없이 GraphCSR 로 감쌈 (노드 이름 대신 노드 번호)
+    indptr, indices, weights = (get_shared_array(name) for name in graph_shared_names)
+    return GraphCSR(np.arange(_shared_meta['graph_n_nodes']), indptr, indices, weights)
+
+def betweenness_sources_worker(sources):
+    return csr_betweenness_partial(shared_graph_csr(), sources)
+
+def betweenness_source_partials(csr: GraphCSR, source_chunks: list, workers: int = 1) -> list:
+
+    # source 묶음별 dependency 합 (workers > 1 이면 shared memory 의 CSR 을 attach 한 Pool 에서 계산)
+    if workers <= 1 or len(source_chunks) < 2:
+        return [csr_betweenness_partial(csr, chunk) for chunk in source_chunks]
+
+    spec = publish_graph_csr(csr)
+
+    try:
+        with Pool(processes=min(workers, len(source_chunks)), initializer=attach_shared_arrays, initargs=(spec,)) as pool:
+            return pool.map(betweenness_sources_worker, source_chunks, chunksize=1)
+    finally:
+        release_shared_arrays(graph_shared_names)
+
+def parallel_betweenness(csr: GraphCSR, workers: int = 4, normalized: bool = True, chunks_per_worker: int = 4):
+    """
+    source 노드를 나눠 여러 프로세스에서 계산하는 exact betweenness (csr_betweenness 와 같은 값)
+
+    각 워커는 shared memory 의 CSR 을 attach 한 뒤 맡은 source 들의 dependency 합만 반환하고, 부모에서 합산 후 정규화
+    chunks_per_worker: 워커당 source 묶음 수 (source 는 번갈아 배분해 묶음 간 비용을 고르게 함)
+    """
+    n_nodes = csr.n_nodes
+
+    if workers <= 1 or n_nodes < 2 * workers:
+        return csr_betweenness(csr, normalized)
+
+    n_chunks = min(n_nodes, workers * chunks_per_worker)
+    sources = np.arange(n_nodes)
+    chunks = [sources[i::n_chunks] for i in range(n_chunks)]
+
+    partials = betweenness_source_partials(csr, chunks, workers)
+
+    return rescale_betweenness(np.sum(partials, axis=0), n_nodes, normalized)
+
+default_betweenness_samples = 100
+
+def betweenness_error_bound(n_nodes: int, k: int, delta: float = 0.1) -> float:
+
+    # source k 개 표본 추정에서 확률 1 - delta 이상으로 모든 노드의 (정규화) 오차가 넘지 않는 값 (Hoeffding + union bound)
+    # source 하나의 기여 dependency / (n - 2) 는 [0, 1] 범위
+    if k >= n_nodes or n_nodes <= 2:
+        return 0.0
+
+    return math.sqrt(math.log(2 * n_nodes / delta) / (2 * k))
+
+def betweenness_sample_size(n_nodes: int, target_error: float, delta: float = 0.1) -> int:
+
+    # betweenness_error_bound 가 target_error 이하가 되는 최소 source 수 (노드 수 이상이면 exact)
+    if n_nodes <= 2:
+        return n_nodes
+
+    k = math.ceil(math.log(2 * n_nodes / delta) / (2 * target_error ** 2))
+
+    return int(min(n_nodes, k))
+
+def sampled_betweenness(
+    csr: GraphCSR,
+    samples: int = None,
+    target_error: float = None,
+    seed: int = 0,
+    workers: int = 1,
+    delta: float = 0.1,
+    n_batches: int = 10
+):
+    """
+    k 개 source (pivot) 표본으로 추정한 정규화 betweenness (탐색용, nx.betweenness_centrality(k=...) 와 같은 추정량)
+
+    samples: source 표본 수 (None 이면 target_error 로 결정, 둘 다 None 이면 default_betweenness_samples)
+    target_error: 확률 1 - delta 이상으로 허용할 최대 오차 (betweenness_sample_size)
+    seed: source 표본 추출 seed
+    n_batches: 표본을 나눌 묶음 수 (묶음별 추정치의 분산으로 표준오차 추정, workers > 1 이면 묶음 단위로 병렬 계산)
+
+    return: (노드 순서 배열, {'samples', 'seed', 'delta', 'error_bound', 'max_std_error'})
+    """
+    n_nodes = csr.n_nodes
+
+    if samples is None:
+        samples = betweenness_sample_size(n_nodes, target_error, delta) if target_error is not None else default_betweenness_samples
+
+    samples = int(min(max(samples, 1), n_nodes))
+    sources = np.random.default_rng(seed).choice(n_nodes, samples, replace=False) if n_nodes > 0 else np.zeros(0, dtype=np.int64)
+
+    # 묶음마다 source 가 2 개 이상 (표본 source 노드 보정에 k - 1 사용)
+    n_batches = int(max(1, min(samples // 2, max(n_batches, 2 * workers))))
+    chunks = [sources[i::n_batches] for i in range(n_batches)]
+    partials = betweenness_source_partials(csr, chunks, workers)
+
+    betweenness = rescale_betweenness(
+        np.sum(partials, axis=0) if partials else np.zeros(n_nodes), n_nodes, True,
+        sources if samples < n_nodes else None
+    )
+
+    # 묶음별 추정치의 표준편차 / sqrt(묶음 수) (전체 노드를 모두 뽑았으면 0)
+    max_std_error = 0.0
+    if 1 < n_batches and samples < n_nodes:
+        batch_estimates = np.array([rescale_betweenness(p, n_nodes, True, c) for p, c in zip(partials, chunks)])
+        max_std_error = float((batch_estimates.std(axis=0, ddof=1) / math.sqrt(n_batches)).max())
+
+    return betweenness, {
+        'samples': samples,
+        'seed': seed,
+        'delta': delta,
+        'error_bound': betweenness_error_bound(n_nodes, samples, delta),
+        'max_std_error': max_std_error
+    }
+
+def betweenness_rank_stability(reference: dict, estimate: dict, top_k: int = 20) -> dict:
+
+    # 기준 (exact) betweenness 대비 추정치의 상위 top_k 노드 일치율, 순위 상관, 최대 절대 오차
+    from scipy import stats
+
+    nodes = list(reference)
+    ref_values = np.array([reference[node] for node in nodes], dtype=np.float64)
+    est_values = np.array([estimate.get(node, 0.0) for node in nodes], dtype=np.float64)
+
+    top_k = min(top_k, len(nodes))
+    ref_top = [nodes[i] for i in np.argsort(-ref_values, kind='stable')[:top_k]]
+    est_top = [nodes[i] for i in np.argsort(-est_values, kind='stable')[:top_k]]
+
+    return {
+        'top_k': top_k,
+        'top_k_overlap': len(set(ref_top) & set(est_top)) / top_k if top_k > 0 else 1.0,
+        'top_k_same_order': ref_top == est_top,
+        'spearman': float(stats.spearmanr(ref_values, est_values)[0]) if len(nodes) > 1 else 1.0,
+        'max_abs_error': float(np.abs(ref_values - est_values).max()) if len(nodes) > 0 else 0.0
+    }
+
+def largest_scc_index(csr: GraphCSR):
+
+    # (SCC 개수, 가장 큰 SCC 의 노드 번호) - 크기가 같으면 먼저 등장한 노드가 속한 SCC
+    from scipy.sparse import csgraph
+
+    num_scc, labels = csgraph.connected_components(csr.to_scipy(), directed=True, connection='strong')
+    sizes = np.bincount(labels, minlength=num_scc)
+    _, first_node = np.unique(labels, return_index=True)
+    largest = min(np.flatnonzero(sizes == sizes.max()), key=lambda label: first_node[label])
+
+    return num_scc, np.flatnonzero(labels == largest)
+
+def sparse_network_metrics(csr: GraphCSR, betweenness_workers: int = 1, include_betweenness: bool = True) -> dict:
+    """
+    compute_network_features (backend='sparse') 의 지표를 GraphCSR 에서 계산
+
+    degree / strength: 행 / 열 합, pagerank: csr_pagerank, betweenness: parallel_betweenness (betweenness_workers 개 프로세스)
+    SCC / 평균 최단 경로 / diameter: scipy.sparse.csgraph (largest SCC 기준, weight 미사용 - networkx 와 동일)
+    dict 지표는 노드 순서 (정렬 전), largest_scc_index 는 largest SCC 노드 번호
+    include_betweenness: False 이면 betweenness 는 None (sampled 모드에서 따로 계산)
+    """
+    from scipy.sparse import csgraph
+
+    n_nodes = csr.n_nodes
+    n_edges = csr.n_edges
+    nodes = csr.nodes.tolist()
+
+    out_degree = np.diff(csr.indptr)
+    in_degree = np.bincount(csr.indices, minlength=n_nodes)
+    out_strength = np.bincount(csr.sources(), weights=csr.weights, minlength=n_nodes)
+    in_strength = np.bincount(csr.indices, weights=csr.weights, minlength=n_nodes)
+
+    # networkx 와 같이 노드가 1 개 이하이면 중심성은 1
+    scale = 1 / (n_nodes - 1) if n_nodes > 1 else None
+
+    def centrality(degree):
+        return dict(zip(nodes, (degree * scale).tolist() if scale is not None else [1.0] * n_nodes))
+
+    num_scc, scc_index = largest_scc_index(csr)
+    scc_csr = csr.subgraph(scc_index)
+    n_scc = len(scc_index)
+
+    try:
+        if n_scc == 1:
+            avg_shortest_path, diameter = 0, 0
+        else:
+            hops = csgraph.shortest_path(scc_csr.to_scipy(), directed=True, unweighted=True)
+            avg_shortest_path = float(hops.sum() / (n_scc * (n_scc - 1)))
+            diameter = int(csgraph.shortest_path(scc_csr.to_scipy(), directed=False, unweighted=True).max())
+    except Exception:
+        avg_shortest_path = None
+        diameter = None
+
+    return {
+        'num_nodes': n_nodes,
+        'num_edges': n_edges,
+        'density': n_edges / (n_nodes * (n_nodes - 1)) if n_edges > 0 and n_nodes > 1 else 0,
+        'is_strongly_connected': num_scc == 1,
+        'num_strongly_connected_components': int(num_scc),
+        'largest_scc_size': n_scc,
+        'largest_scc_index': scc_index,
+        'avg_shortest_path_length_largest_scc': avg_shortest_path,
+        'diameter_largest_scc': diameter,
+        'degree_centrality': centrality(in_degree + out_degree),
+        'in_degree': dict(zip(nodes, in_degree.tolist())),
+        'in_degree_centrality': centrality(in_degree),
+        'out_degree': dict(zip(nodes, out_degree.tolist())),
+        'out_degree_centrality': centrality(out_degree),
+        'in_strength': dict(zip(nodes, in_strength.tolist())),
+        'out_strength': dict(zip(nodes, out_strength.tolist())),
+        'pagerank': dict(zip(nodes, csr_pagerank(csr).tolist())),
+        'betweenness': dict(zip(nodes, parallel_betweenness(csr, betweenness_workers).tolist())) if include_betweenness else None
+    }
+
+threshold_sweep_keep = {
+    # keep: (정렬 key 부호, searchsorted side) -> key 오름차순 정렬 시 남는 edge 가 항상 앞부분 (prefix)
+    'ge': (-1, 'right'),
+    'gt': (-1, 'left'),
+    'le': (1, 'right'),
+    'lt': (1, 'left')
+}
+
+def threshold_sweep(
+    edge_df: pd.DataFrame,
+    threshold_col,
+    thresholds,
+    keep: str = 'ge',
+    auto_log_transform: bool = True,
+    cause_col: str = 'cause_abb',
+    outcome_col: str = 'outcome_abb'
+) -> pd.DataFrame:
+    """
+    여러 cut-off 에서의 네트워크 스칼라 지표를 edge 정렬 1 회 + 누적 추가로 계산 (cut-off 별 CSV / compute_network_features 불필요)
+
+    edge_df: stat_cut_result 등 (cause, outcome) 이 중복 없는 edge 테이블
+    threshold_col: 기준 컬럼명 또는 edge_df 와 같은 길이의 배열
+        (예: 'rr_values', 'adjusted_fisher_p_values', edge_df[['ct00', 'ct01', 'ct10', 'ct11']].min(axis=1))
+    thresholds: cut-off 목록
+    keep: 남길 edge 조건 - 'ge' (값 >= cut-off), 'gt', 'le' (p-value 등), 'lt' / 결측 값은 항상 제외
+
+    edge 를 기준값 순서로 정렬한 뒤 느슨한 cut-off 쪽으로 차례로 추가하면서
+    weakly connected component 는 union-find, degree / strength 는 배열 누적으로 갱신
+    SCC 는 union-find 로 갱신할 수 없으므로 cut-off 마다 누적된 edge 로 csgraph 계산 (O(E))
 
-    combined_dict = merge_dicts({'cause_abb': f'{cause_abb}', 'outcome_abb': f'{outcome_abb}'},\
-                                sex_counts_dict,\
-                                age_counts_dict,\
-                                sido_counts_dict,\
-                                # sgg_counts_dict,\
-                                ctrb_counts_dict,\
-                                sex_age_counts_dict,\
-                                sex_sido_counts_dict,\
-                                # sex_sgg_counts_dict,\
-                                sex_ctrb_counts_dict)
-    
-    return combined_dict
+    return: cut-off 별 num_nodes, num_edges, density, num_strongly_connected_components, largest_scc_size,
+            num_weakly_connected_components, largest_wcc_size, max_in_degree, max_out_degree, total_strength (thresholds 순서)
+    """
+    from scipy import sparse
+    from scipy.sparse import csgraph
 
-def colname_type_setting(df: pd.DataFrame, set_start_col_idx: int, prefix: str):
-    
-    if set_start_col_idx < 0:
-        raise ValueError("Error: set_start_col_idx 는 0 이상이여야 합니다.")
-        
-    df_copy = df.copy(deep=True)
-    collist = list(df_copy.columns)
-    
-    for idx, colname in enumerate(collist):
-        if idx < set_start_col_idx:
-            continue
+    if keep not in threshold_sweep_keep:
+        raise ValueError(f"Error: 지원하지 않는 keep 입니다: {keep}")
+
+    sign, side = threshold_sweep_keep[keep]
+    weight_col = 'log_rr_values' if auto_log_transform else 'rr_values'
+
+    values = edge_df[threshold_col] if isinstance(threshold_col, str) else threshold_col
+    values = np.asarray(values, dtype=np.float64)
+
+    if len(values) != len(edge_df):
+        raise ValueError("Error: 'threshold_col'의 길이가 edge_df 와 일치하지 않습니다.")
+
+    if edge_df.duplicated([cause_col, outcome_col]).any():
+        raise ValueError("Error: edge_df 에 중복된 (cause, outcome) 이 있습니다.")
+
+    valid = ~np.isnan(values)
+    cause, outcome, weight = edge_arrays_from_df(edge_df.loc[valid], weight_col)
+    key = sign * values[valid]
+
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+
+    # 노드 번호는 전체 edge 기준으로 한 번만 부여
+    codes, nodes = pd.factorize(np.column_stack([cause[order], outcome[order]]).ravel())
+    src, dst = codes[0::2], codes[1::2]
+    weight = weight[order]
+    n_all = len(nodes)
+
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    stops = np.searchsorted(key, sign * thresholds, side=side)
+
+    in_degree = np.zeros(n_all, dtype=np.int64)
+    out_degree = np.zeros(n_all, dtype=np.int64)
+    in_strength = np.zeros(n_all, dtype=np.float64)
+    out_strength = np.zeros(n_all, dtype=np.float64)
+    present = np.zeros(n_all, dtype=bool)
+
+    # union-find (path halving + union by size)
+    parent = list(range(n_all))
+    size = [1] * n_all
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    n_present = 0
+    n_wcc = 0
+    largest_wcc = 0
+    added = 0
+    rows = {}
+
+    for stop in np.unique(stops).tolist():
+
+        batch = slice(added, stop)
+        np.add.at(out_degree, src[batch], 1)
+        np.add.at(in_degree, dst[batch], 1)
+        np.add.at(out_strength, src[batch], weight[batch])
+        np.add.at(in_strength, dst[batch], weight[batch])
+
+        for u, v in zip(src[batch].tolist(), dst[batch].tolist()):
+
+            for node in (u, v):
+                if not present[node]:
+                    present[node] = True
+                    n_present += 1
+                    n_wcc += 1
+                    largest_wcc = max(largest_wcc, 1)
+
+            root_u, root_v = find(u), find(v)
+            if root_u == root_v:
+                continue
+
+            if size[root_u] < size[root_v]:
+                root_u, root_v = root_v, root_u
+
+            parent[root_v] = root_u
+            size[root_u] += size[root_v]
+            n_wcc -= 1
+            largest_wcc = max(largest_wcc, size[root_u])
+
+        added = stop
+
+        # SCC: 누적 edge 로 계산 후 현재 그래프에 있는 노드만 집계
+        if n_present > 0:
+            adjacency = sparse.csr_matrix((np.ones(stop), (src[:stop], dst[:stop])), shape=(n_all, n_all))
+            _, labels = csgraph.connected_components(adjacency, directed=True, connection='strong')
+            scc_sizes = np.bincount(labels[present])
+            scc_sizes = scc_sizes[scc_sizes > 0]
         else:
-            df_copy[colname] = df_copy[colname].astype('Int64')
-            collist[idx] = f'{prefix}_{colname}'
-    
-    df_copy.columns = collist
-    
-    return df_copy
+            scc_sizes = np.zeros(0, dtype=np.int64)
+
+        rows[stop] = {
+            'num_nodes': n_present,
+            'num_edges': stop,
+            'density': stop / (n_present * (n_present - 1)) if stop > 0 and n_present > 1 else 0,
+            'is_strongly_connected': len(scc_sizes) == 1,
+            'num_strongly_connected_components': len(scc_sizes),
+            'largest_scc_size': int(scc_sizes.max()) if len(scc_sizes) > 0 else 0,
+            'num_weakly_connected_components': n_wcc,
+            'largest_wcc_size': largest_wcc,
+            'max_in_degree': int(in_degree.max()) if n_all > 0 else 0,
+            'max_out_degree': int(out_degree.max()) if n_all > 0 else 0,
+            'total_strength': float(out_strength.sum())
+        }
 
-def dict_sorting(target_dict: dict):
-    result = dict(sorted(target_dict.items(), key=lambda x: x[1], reverse=True))
-    return result
+    return pd.DataFrame([{'threshold': threshold, **rows[stop]} for threshold, stop in zip(thresholds.tolist(), stops.tolist())])
 
-def reorder_cluster_ids(cluster_assignments: dict) -> dict:
-    cluster_to_nodes = defaultdict(list)
-    for node, cluster_id in cluster_assignments.items():
-        cluster_to_nodes[cluster_id].append(node)
-    sorted_clusters = sorted(cluster_to_nodes.items(), key=lambda x: len(x[1]), reverse=True)
-    old_to_new = {old: new for new, (old, _) in enumerate(sorted_clusters)}
-    return {node: old_to_new[cluster] for node, cluster in cluster_assignments.items()}
-    
-def compute_from_file(
-    file_path,
-    auto_log_transform=True, 
-    use_largest_scc_for_clustering=True,
-    node_widths: dict = None,
-    node_heights: dict = None
-):
-    df = pd.read_csv(file_path)
-    return compute_network_features(
-        df,
-        auto_log_transform,
-        use_largest_scc_for_clustering,
-        node_widths,
-        node_heights
-    )
+infomap_cache_path = f'{network_path}infomap_cache/'
+infomap_shared_names = ['infomap_src', 'infomap_dst', 'infomap_weight']
 
-def build_directed_graph_from_df(
-    df: pd.DataFrame,
-    weight_col: str = 'log_rr_values'
-) -> nx.DiGraph:
-    G = nx.DiGraph()
-    for _, row in df.iterrows():
-        G.add_edge(row['cause_abb'], row['outcome_abb'], weight=row[weight_col])
-    return G
+def infomap_trial(src, dst, weights, seed: int, silent: bool = True):
+
+    # seed 하나로 Infomap 1 회 실행 -> (codelength, node id 배열, module id 배열) (im.nodes 순서)
+    from infomap import Infomap
+
+    im = Infomap(seed=int(seed), num_trials=1, silent=silent)
+
+    for u, v, weight in zip(np.asarray(src).tolist(), np.asarray(dst).tolist(), np.asarray(weights, dtype=np.float64).tolist()):
+        im.add_link(u, v, weight)
+
+    im.run()
+
+    node_ids, module_ids = [], []
+    for node in im.nodes:
+        node_ids.append(node.node_id)
+        module_ids.append(node.module_id)
+
+    return float(im.codelength), np.asarray(node_ids, dtype=np.int64), np.asarray(module_ids, dtype=np.int64)
+
+def infomap_trial_worker(seed: int):
+    return (seed,) + infomap_trial(*(get_shared_array(name) for name in infomap_shared_names), seed)
+
+def infomap_cache_key(src, dst, weights, params: dict) -> str:
+
+    # (link 목록, weight, 실행 옵션) 의 sha256 (link 순서도 결과에 영향을 주므로 그대로 포함)
+    digest = hashlib.sha256()
+
+    for values, dtype in ((src, np.int64), (dst, np.int64), (weights, np.float64)):
+        digest.update(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        digest.update(b'|')
+
+    digest.update(json.dumps(params, sort_keys=True).encode())
+
+    return digest.hexdigest()
+
+def run_infomap(
+    src,
+    dst,
+    weights,
+    trials: int = 1,
+    seed: int = 123,
+    workers: int = 1,
+    cache_dir: str = None
+) -> dict:
+    """
+    seed, seed + 1, ..., seed + trials - 1 로 Infomap 을 실행해 codelength 가 가장 작은 결과를 사용
+
+    src / dst / weights: link 배열 (노드 id 는 0 부터 시작하는 정수)
+    workers: 2 이상이면 trial 을 여러 프로세스에 분배 (link 배열은 shared memory 로 공유)
+    cache_dir: 지정하면 (link, weight, trials, seed) 해시로 결과를 저장하고, 같은 입력이면 다시 실행하지 않음
+
+    return: {'node_ids', 'module_ids' (im.nodes 순서), 'codelength', 'seed' (선택된 trial), 'cached'}
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    seeds = [seed + trial for trial in range(max(int(trials), 1))]
+
+    cache_file = None
+    if cache_dir is not None:
+        key = infomap_cache_key(src, dst, weights, {'trials': len(seeds), 'seed': seed})
+        cache_file = os.path.join(cache_dir, f'{key}.json')
+
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                cached = json.load(f)
+            return {
+                'node_ids': np.asarray(cached['node_ids'], dtype=np.int64),
+                'module_ids': np.asarray(cached['module_ids'], dtype=np.int64),
+                'codelength': cached['codelength'],
+                'seed': cached['seed'],
+                'cached': True
+            }
+
+    if workers <= 1 or len(seeds) == 1:
+        results = [(trial_seed,) + infomap_trial(src, dst, weights, trial_seed) for trial_seed in seeds]
+    else:
+        spec = publish_shared_arrays(dict(zip(infomap_shared_names, [src, dst, weights])))
+        try:
+            with Pool(processes=min(workers, len(seeds)), initializer=attach_shared_arrays, initargs=(spec,)) as pool:
+                results = pool.map(infomap_trial_worker, seeds, chunksize=1)
+        finally:
+            release_shared_arrays(infomap_shared_names)
+
+    # codelength 가 같으면 작은 seed
+    best_seed, codelength, node_ids, module_ids = min(results, key=lambda result: (result[1], result[0]))
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(f'{cache_file}.tmp', 'w') as f:
+            json.dump({
+                'node_ids': node_ids.tolist(),
+                'module_ids': module_ids.tolist(),
+                'codelength': codelength,
+                'seed': best_seed
+            }, f)
+        os.replace(f'{cache_file}.tmp', cache_file)
+
+    return {'node_ids': node_ids, 'module_ids': module_ids, 'codelength': codelength, 'seed': best_seed, 'cached': False}
 
 def compute_network_features(
     filtered_df: pd.DataFrame,
     auto_log_transform=True,
     use_largest_scc_for_clustering=True,
     node_widths: dict = None,
-    node_heights: dict = None
+    node_heights: dict = None,
+    backend: str = 'networkx',
+    betweenness_workers: int = 1,
+    betweenness_mode: str = 'exact',
+    betweenness_samples: int = None,
+    betweenness_error: float = None,
+    betweenness_seed: int = 0,
+    betweenness_reference: dict = None,
+    infomap_trials: int = 1,
+    infomap_seed: int = 123,
+    infomap_workers: int = 1,
+    infomap_cache_dir: str = None
 ) -> dict:
-    
+
+    # backend: 'networkx' (기존) 또는 'sparse' (GraphCSR + scipy.sparse.csgraph 로 같은 지표 계산, sparse_network_metrics 참조)
+    #   sparse 이면 networkx 를 사용하지 않고 결과의 'graph' 도 GraphCSR (그릴 때 network_graph 로 nx.DiGraph 변환)
+    # filtered_df 의 weight (auto_log_transform 이면 log_rr_values, 아니면 rr_values) 는 음수가 아니어야 함
+    #   RR < 1 edge 가 있으면 log RR 이 음수 -> backend / betweenness 설정과 관계없이 ValueError (미리 RR >= 1 로 필터링)
+    # betweenness_workers: 2 이상이면 betweenness 를 source 분할 프로세스 병렬로 계산 (parallel_betweenness, 두 backend 공통)
+    # betweenness_mode: 'exact' 또는 'sampled' (탐색용, betweenness_samples 개 / betweenness_error 오차의 source 표본 추정)
+    #   sampled 이면 결과에 'betweenness_sampling' (표본 수, 오차 추정, betweenness_reference 대비 순위 안정성) 추가
+    # infomap_trials / infomap_seed / infomap_workers / infomap_cache_dir: run_infomap 참조 (기본값은 기존 Infomap() 1 회 실행과 같은 seed)
+    if backend not in ('networkx', 'sparse'):
+        raise ValueError(f"Error: 지원하지 않는 backend 입니다: {backend}")
+
+    if betweenness_mode not in ('exact', 'sampled'):
+        raise ValueError(f"Error: 지원하지 않는 betweenness_mode 입니다: {betweenness_mode}")
+
     # 엣지 추가
     weight_col = 'log_rr_values' if auto_log_transform else 'rr_values'
-    G = build_directed_graph_from_df(filtered_df, weight_col=weight_col)
-
-    # 노드 크기 속성 추가 (선택적)
-    if node_widths:
-        nx.set_node_attributes(G, node_widths, name='width')
-    if node_heights:
-        nx.set_node_attributes(G, node_heights, name='height')
-    
-    num_nodes = G.number_of_nodes()
-    num_edges = G.number_of_edges()
-    density = nx.density(G)
-    is_strongly_connected = nx.is_strongly_connected(G)
-    scc_list = list(nx.strongly_connected_components(G))
-    num_scc = len(scc_list)
-    largest_scc_nodes = max(scc_list, key=len)
-    largest_scc_size = len(largest_scc_nodes)
-    G_scc = G.subgraph(largest_scc_nodes).copy()
-
-    # 중심성 지표 (전체 그래프 기준)
-    degree_centrality = dict_sorting(nx.degree_centrality(G))
-    in_degree = dict_sorting(dict(G.in_degree()))
-    in_degree_centrality = dict_sorting(nx.in_degree_centrality(G))
-    out_degree = dict_sorting(dict(G.out_degree()))
-    out_degree_centrality = dict_sorting(nx.out_degree_centrality(G))
-    in_strength = dict_sorting(dict(G.in_degree(weight='weight')))
-    out_strength = dict_sorting(dict(G.out_degree(weight='weight')))
-    pagerank = dict_sorting(nx.pagerank(G, weight='weight'))
-    betweenness = dict_sorting(nx.betweenness_centrality(G, weight='weight'))
-
-    # 거리 지표 (largest SCC 기준)
-    try:
-        avg_shortest_path = nx.average_shortest_path_length(G_scc)
-        diameter = nx.diameter(G_scc.to_undirected())
-    except:
-        avg_shortest_path = None
-        diameter = None
+
+    # 음수 weight 는 모든 backend 에서 같은 오류 (betweenness 의 Dijkstra 전제, csr_betweenness_partial 참조)
+    if (filtered_df[weight_col] < 0).any():
+        raise ValueError("Error: 음수 weight 가 있는 그래프는 betweenness 를 계산할 수 없습니다.")
+
+    if backend == 'sparse':
+
+        _, csr = build_graph_from_arrays(*edge_arrays_from_df(filtered_df, weight_col), return_networkx=False)
+        G = csr
+
+        # 노드 크기 속성 추가 (선택적)
+        if node_widths:
+            csr.set_node_attrs(node_widths, 'width')
+        if node_heights:
+            csr.set_node_attrs(node_heights, 'height')
+
+        metrics = sparse_network_metrics(csr, betweenness_workers, include_betweenness=(betweenness_mode == 'exact'))
+
+        num_nodes = metrics['num_nodes']
+        num_edges = metrics['num_edges']
+        density = metrics['density']
+        is_strongly_connected = metrics['is_strongly_connected']
+        num_scc = metrics['num_strongly_connected_components']
+        largest_scc_size = metrics['largest_scc_size']
+        G_scc = csr.subgraph(metrics['largest_scc_index'])
+
+        degree_centrality = dict_sorting(metrics['degree_centrality'])
+        in_degree = dict_sorting(metrics['in_degree'])
+        in_degree_centrality = dict_sorting(metrics['in_degree_centrality'])
+        out_degree = dict_sorting(metrics['out_degree'])
+        out_degree_centrality = dict_sorting(metrics['out_degree_centrality'])
+        in_strength = dict_sorting(metrics['in_strength'])
+        out_strength = dict_sorting(metrics['out_strength'])
+        pagerank = dict_sorting(metrics['pagerank'])
+        betweenness = dict_sorting(metrics['betweenness']) if betweenness_mode == 'exact' else None
+
+        avg_shortest_path = metrics['avg_shortest_path_length_largest_scc']
+        diameter = metrics['diameter_largest_scc']
+
+    else:
+
+        import networkx as nx
+
+        G = build_directed_graph_from_df(filtered_df, weight_col=weight_col)
+
+        # 노드 크기 속성 추가 (선택적)
+        if node_widths:
+            nx.set_node_attributes(G, node_widths, name='width')
+        if node_heights:
+            nx.set_node_attributes(G, node_heights, name='height')
+
+        num_nodes = G.number_of_nodes()
+        num_edges = G.number_of_edges()
+        density = nx.density(G)
+        is_strongly_connected = nx.is_strongly_connected(G)
+        scc_list = list(nx.strongly_connected_components(G))
+        num_scc = len(scc_list)
+        largest_scc_nodes = max(scc_list, key=len)
+        largest_scc_size = len(largest_scc_nodes)
+        G_scc = G.subgraph(largest_scc_nodes).copy()
+
+        # 중심성 지표 (전체 그래프 기준)
+        degree_centrality = dict_sorting(nx.degree_centrality(G))
+        in_degree = dict_sorting(dict(G.in_degree()))
+        in_degree_centrality = dict_sorting(nx.in_degree_centrality(G))
+        out_degree = dict_sorting(dict(G.out_degree()))
+        out_degree_centrality = dict_sorting(nx.out_degree_centrality(G))
+        in_strength = dict_sorting(dict(G.in_degree(weight='weight')))
+        out_strength = dict_sorting(dict(G.out_degree(weight='weight')))
+        pagerank = dict_sorting(nx.pagerank(G, weight='weight'))
+
+        if betweenness_mode == 'sampled':
+            csr = GraphCSR.from_df(filtered_df, weight_col)
+            betweenness = None
+        elif betweenness_workers > 1:
+            csr = GraphCSR.from_df(filtered_df, weight_col)
+            betweenness = dict_sorting(dict(zip(csr.nodes.tolist(), parallel_betweenness(csr, betweenness_workers).tolist())))
+        else:
+            betweenness = dict_sorting(nx.betweenness_centrality(G, weight='weight'))
+
+        # 거리 지표 (largest SCC 기준)
+        try:
+            avg_shortest_path = nx.average_shortest_path_length(G_scc)
+            diameter = nx.diameter(G_scc.to_undirected())
+        except:
+            avg_shortest_path = None
+            diameter = None
+
+    # 표본 추정 betweenness (두 backend 공통, GraphCSR 기준)
+    betweenness_sampling = None
+    if betweenness_mode == 'sampled':
+        values, betweenness_sampling = sampled_betweenness(csr, betweenness_samples, betweenness_error, betweenness_seed, betweenness_workers)
+        betweenness = dict_sorting(dict(zip(csr.nodes.tolist(), values.tolist())))
+
+        if betweenness_reference is not None:
+            reference = betweenness_reference.get('betweenness', betweenness_reference)
+            betweenness_sampling['rank_stability'] = betweenness_rank_stability(reference, betweenness)
 
     # 클러스터링 대상 설정
-    if use_largest_scc_for_clustering:
-        clustering_graph = G_scc
-        scc_nodes = list(G_scc.nodes())
+    clustering_graph = G_scc if use_largest_scc_for_clustering else G
+
+    # Infomap 클러스터링 (노드 번호 = clustering_graph 의 노드 순서)
+    if backend == 'sparse':
+        id_to_node = dict(enumerate(clustering_graph.nodes.tolist()))
+        src, dst, link_weights = clustering_graph.sources(), clustering_graph.indices, clustering_graph.weights
     else:
-        clustering_graph = G
-        scc_nodes = list(G.nodes())  # 전체 노드 반환
+        node_to_id = {node: idx for idx, node in enumerate(clustering_graph.nodes())}
+        id_to_node = {idx: node for node, idx in node_to_id.items()}
 
-    # Infomap 클러스터링
-    im = Infomap()
-    node_to_id = {node: idx for idx, node in enumerate(clustering_graph.nodes())}
-    id_to_node = {idx: node for node, idx in node_to_id.items()}
+        links = [(node_to_id[u], node_to_id[v], float(data.get('weight', 1.0))) for u, v, data in clustering_graph.edges(data=True)]
+        src, dst, link_weights = (np.array(values) for values in zip(*links)) if links else (np.zeros(0),) * 3
 
-    for u, v, data in clustering_graph.edges(data=True):
-        weight = float(data.get('weight', 1.0))
-        im.add_link(node_to_id[u], node_to_id[v], weight)
+    scc_nodes = list(id_to_node.values())  # use_largest_scc_for_clustering=False 이면 전체 노드
 
-    im.run()
+    infomap_result = run_infomap(src, dst, link_weights, infomap_trials, infomap_seed, infomap_workers, infomap_cache_dir)
 
     cluster_assignments_raw = {
-        id_to_node[node.node_id]: node.module_id
-        for node in im.nodes
+        id_to_node[node_id]: module_id
+        for node_id, module_id in zip(infomap_result['node_ids'].tolist(), infomap_result['module_ids'].tolist())
     }
     cluster_assignments_sub = reorder_cluster_ids(cluster_assignments_raw)
 
     # 전체 노드에 대해 클러스터 결과를 매핑
     if use_largest_scc_for_clustering:
+        all_nodes = csr.nodes.tolist() if backend == 'sparse' else G.nodes()
         cluster_assignments = {
-            node: cluster_assignments_sub.get(node, None) for node in G.nodes()
+            node: cluster_assignments_sub.get(node, None) for node in all_nodes
         }
     else:
         cluster_assignments = cluster_assignments_sub
@@ -610,7 +3393,7 @@ def compute_network_features(
     num_clustered_nodes = len([v for v in cluster_assignments.values() if v is not None])
     non_clustered_nodes = [node for node, cluster in cluster_assignments.items() if cluster is None]
 
-    return {
+    result = {
         'num_nodes': num_nodes,
         'num_edges': num_edges,
         'density': density,
@@ -632,9 +3415,243 @@ def compute_network_features(
         'scc_nodes': scc_nodes,
         'non_clustered_nodes': non_clustered_nodes,
         'num_clustered_nodes': num_clustered_nodes,
+        'infomap_codelength': infomap_result['codelength'],
         'graph': G
     }
 
+    if betweenness_sampling is not None:
+        result['betweenness_sampling'] = betweenness_sampling
+
+    return result
+
+network_node_metric_keys = [
+    'degree_centrality', 'in_degree', 'in_degree_centrality', 'out_degree', 'out_degree_centrality',
+    'in_strength', 'out_strength', 'pagerank', 'betweenness'
+]
+
+network_node_attr_keys = ['width', 'height']
+
+def json_safe_value(value):
+
+    # json.dump 의 default: NumPy scalar / 배열을 파이썬 값으로 변환
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+
+    raise TypeError(f"Error: json 으로 저장할 수 없는 값입니다: {type(value)}")
+
+def dict_order_index(nodes: list, ordered_keys) -> np.ndarray:
+
+    # 노드별로 ordered_keys 안의 위치 (없으면 -1) -> dict / list 순서를 그대로 복원하기 위해 저장
+    position = {node: idx for idx, node in enumerate(ordered_keys)}
+    return np.array([position.get(node, -1) for node in nodes], dtype=np.int32)
+
+def save_network_features(result: dict, save_dir: str):
+    """
+    compute_network_features 결과를 pickle 대신 컬럼 단위로 저장
+
+    save_dir/nodes/  : 노드 테이블 (graph 노드 순서) - node, 중심성 / strength / pagerank / betweenness, cluster,
+                       (cluster_order, scc_order: 원래 dict / list 순서), width / height
+    save_dir/edges/  : edge 배열 (source, target: nodes 행 번호, weight) - graph 의 edge 순서
+    save_dir/stats.json : 나머지 스칼라 지표 (num_nodes, density, diameter, infomap_codelength 등)
+
+    load_network_features 로 필요한 컬럼만 읽을 수 있음
+    """
+    G = result['graph']
+    is_csr = isinstance(G, GraphCSR)
+    nodes = G.nodes.tolist() if is_csr else list(G.nodes())
+    node_index = {node: idx for idx, node in enumerate(nodes)}
+
+    node_columns = {'node': np.asarray([str(node) for node in nodes], dtype=str)}
+    stored_metrics = []
+
+    for key in network_node_metric_keys:
+
+        values = result.get(key)
+        if values is None:
+            continue
+
+        column = np.array([values[node] for node in nodes])
+        node_columns[key] = column.astype(np.int64 if column.dtype.kind in 'iub' else np.float64)
+        stored_metrics.append(key)
+
+    # 클러스터가 없는 노드 (largest SCC 밖) 는 -1
+    cluster_assignments = result['cluster_assignments']
+    node_columns['cluster'] = np.array([
+        -1 if cluster_assignments.get(node) is None else cluster_assignments[node] for node in nodes
+    ], dtype=np.int32)
+    node_columns['cluster_order'] = dict_order_index(nodes, cluster_assignments)
+    node_columns['scc_order'] = dict_order_index(nodes, result['scc_nodes'])
+
+    node_attrs = []
+    for attr in network_node_attr_keys:
+        attr_values = G.node_attrs.get(attr, {}) if is_csr else {node: data[attr] for node, data in G.nodes(data=True) if attr in data}
+        if attr_values:
+            node_columns[attr] = np.array([attr_values.get(node, np.nan) for node in nodes], dtype=np.float64)
+            node_attrs.append(attr)
+
+    if is_csr:
+        edge_columns = {'source': G.sources(), 'target': G.indices.astype(np.int32), 'weight': G.weights}
+    else:
+        edges = list(G.edges(data='weight', default=1.0))
+        edge_columns = {
+            'source': np.array([node_index[u] for u, _, _ in edges], dtype=np.int32),
+            'target': np.array([node_index[v] for _, v, _ in edges], dtype=np.int32),
+            'weight': np.array([weight for _, _, weight in edges], dtype=np.float64)
+        }
+
+    write_column_store(os.path.join(save_dir, 'nodes'), node_columns)
+    write_column_store(os.path.join(save_dir, 'edges'), edge_columns)
+
+    # stats.json 이 commit 시점 (nodes / edges 저장 후 마지막에 기록)
+    stats = {
+        key: value for key, value in result.items()
+        if key not in network_node_metric_keys
+        and key not in ('cluster_assignments', 'scc_nodes', 'non_clustered_nodes', 'graph')
+    }
+    stats.update({'node_metrics': stored_metrics, 'node_attrs': node_attrs})
+
+    stats_file = os.path.join(save_dir, 'stats.json')
+    with open(f'{stats_file}.tmp', 'w') as f:
+        json.dump(stats, f, default=json_safe_value)
+    os.replace(f'{stats_file}.tmp', stats_file)
+
+    return stats
+
+class NetworkFeatureStore:
+    """
+    save_network_features 로 저장한 결과를 필요한 부분만 읽는 reader (dict 처럼 사용)
+
+    store['pagerank'] 는 nodes/ 의 node, pagerank 컬럼만 memory-map 으로 읽어 기존과 같은 정렬된 dict 로 반환
+    store['graph'] 를 요청할 때만 edge 배열을 읽어 nx.DiGraph 를 다시 만듦 (graph_csr 는 networkx 없이 GraphCSR 로 복원)
+    """
+
+    def __init__(self, save_dir: str):
+        self.save_dir = save_dir
+        self.nodes_dir = os.path.join(save_dir, 'nodes')
+        self.edges_dir = os.path.join(save_dir, 'edges')
+
+        stats_file = os.path.join(save_dir, 'stats.json')
+        if not os.path.exists(stats_file):
+            raise FileNotFoundError(f"Error: 저장된 network feature 가 없습니다: {save_dir}")
+
+        with open(stats_file) as f:
+            self.stats = json.load(f)
+
+        self.node_metrics = self.stats.pop('node_metrics')
+        self.node_attrs = self.stats.pop('node_attrs')
+        self._nodes = None
+
+    @property
+    def nodes(self) -> list:
+        if self._nodes is None:
+            self._nodes = read_column_store(self.nodes_dir, ['node'])[0]['node'].tolist()
+        return self._nodes
+
+    def column(self, name: str) -> np.ndarray:
+        return read_column_store(self.nodes_dir, [name])[0][name]
+
+    def metric(self, name: str) -> pd.Series:
+
+        # 노드 순서 (graph 노드 순서) 그대로의 Series
+        if name not in self.node_metrics:
+            raise KeyError(name)
+        return pd.Series(np.asarray(self.column(name)), index=self.nodes, name=name)
+
+    def metric_frame(self, names: list = None) -> pd.DataFrame:
+        names = self.node_metrics if names is None else names
+        return pd.DataFrame({name: np.asarray(self.column(name)) for name in names}, index=pd.Index(self.nodes, name='node'))
+
+    def _ordered(self, order_col: str) -> list:
+
+        # 저장된 위치 순서대로 노드 목록 복원
+        order = np.asarray(self.column(order_col))
+        present = np.flatnonzero(order >= 0)
+        return [self.nodes[idx] for idx in present[np.argsort(order[present])]]
+
+    def cluster_assignments(self) -> dict:
+        clusters = self.column('cluster').tolist()
+        position = {node: idx for idx, node in enumerate(self.nodes)}
+        return {
+            node: None if clusters[position[node]] < 0 else clusters[position[node]]
+            for node in self._ordered('cluster_order')
+        }
+
+    def graph(self):
+
+        import networkx as nx
+
+        G = nx.DiGraph()
+        nodes = self.nodes
+        attrs = {attr: np.asarray(self.column(attr)).tolist() for attr in self.node_attrs}
+
+        for idx, node in enumerate(nodes):
+            G.add_node(node, **{attr: values[idx] for attr, values in attrs.items() if not np.isnan(values[idx])})
+
+        edges, _ = read_column_store(self.edges_dir)
+        G.add_weighted_edges_from(zip(
+            [nodes[idx] for idx in edges['source'].tolist()],
+            [nodes[idx] for idx in edges['target'].tolist()],
+            edges['weight'].tolist()
+        ))
+
+        return G
+
+    def graph_csr(self) -> GraphCSR:
+
+        # networkx 없이 edge 배열에서 GraphCSR 로 복원 (source, target 노드 번호 순)
+        nodes = self.nodes
+        edges, _ = read_column_store(self.edges_dir, mmap=False)
+        order = np.lexsort((edges['target'], edges['source']))
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edges['source'][order], minlength=len(nodes)), out=indptr[1:])
+
+        node_attrs = {}
+        for attr in self.node_attrs:
+            values = np.asarray(self.column(attr)).tolist()
+            node_attrs[attr] = {node: value for node, value in zip(nodes, values) if not np.isnan(value)}
+
+        return GraphCSR(np.asarray(nodes, dtype=object), indptr, edges['target'][order], edges['weight'][order], node_attrs)
+
+    def keys(self):
+        return [*self.stats, *self.node_metrics, 'cluster_assignments', 'scc_nodes', 'non_clustered_nodes', 'graph']
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __getitem__(self, key):
+
+        if key in self.stats:
+            return self.stats[key]
+
+        if key in self.node_metrics:
+            return dict_sorting(dict(zip(self.nodes, self.column(key).tolist())))
+
+        if key == 'cluster_assignments':
+            return self.cluster_assignments()
+
+        if key == 'scc_nodes':
+            return self._ordered('scc_order')
+
+        if key == 'non_clustered_nodes':
+            return [node for node, cluster in self.cluster_assignments().items() if cluster is None]
+
+        if key == 'graph':
+            return self.graph()
+
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def to_dict(self) -> dict:
+
+        # compute_network_features 결과와 같은 dict (전체 로드)
+        return {key: self[key] for key in self.keys()}
+
+def load_network_features(save_dir: str) -> NetworkFeatureStore:
+    return NetworkFeatureStore(save_dir)
+
 def get_top_percent(df: pd.DataFrame, col: str, percent: float) -> pd.DataFrame:
     """
     df: 대상 데이터프레임
@@ -845,6 +3862,8 @@ def get_top_percent(df: pd.DataFrame, col: str, percent: float) -> pd.DataFrame:
 #     plt.show()
 
 def draw_directed_edges_with_arrows(ax, G, pos, node_size_scale=0.03):
+    from matplotlib.patches import FancyArrowPatch
+
     for u, v, data in G.edges(data=True):
         if u not in pos or v not in pos:
             continue
@@ -891,7 +3910,13 @@ def visualize_clusters_from_result(
     save_path = None,
     title_set = None
 ):
-    G = result['graph']
+    import networkx as nx
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    from matplotlib.patches import Rectangle
+    import seaborn as sns
+
+    G = original_G = network_graph(result['graph'])
     cluster_assignments = result['cluster_assignments']
 
     if scc:
@@ -900,7 +3925,7 @@ def visualize_clusters_from_result(
         cluster_assignments = {n: c for n, c in cluster_assignments.items() if n in G.nodes()}
         
         print(f"[DEBUG] Filtered G: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-        print(f"[DEBUG] Original G: {result['graph'].number_of_nodes()} nodes, {result['graph'].number_of_edges()} edges")
+        print(f"[DEBUG] Original G: {original_G.number_of_nodes()} nodes, {original_G.number_of_edges()} edges")
 
     # 레이아웃 좌표 생성
     if layout == 'kamada':
@@ -1037,106 +4062,191 @@ def edge_stat_attr_maker(filename: str):
     
     return edge_stat, edge_attr
 
-def melting_edge_attr(edge_attr: pd.DataFrame):
-    
-    # 1. melt로 cause_abb, outcome_abb를 제외한 나머지를 long-form으로 변환
-    id_vars = ['cause_abb', 'outcome_abb']
-    value_vars = [col for col in edge_attr.columns if col not in id_vars]
+attr_long_cols = ['attribute_1', 'value_1', 'attribute_2', 'value_2', 'count']
+
+def parse_attr_columns(columns, strip_prefix: str = None) -> pd.DataFrame:
+    """
+    카운트 컬럼명 (예: sex_1_counts, sex_1_age_0_counts) 을 distinct 컬럼당 한 번만 파싱
+
+    strip_prefix: 컬럼명에서 제거할 접두어 (edge_stat_attr_maker 결과는 'edge_')
+    return: 컬럼 순서의 (attribute_1, value_1, attribute_2, value_2) DataFrame (단일 속성이면 attribute_2 / value_2 는 결측)
+    """
+    parsed = []
 
-    df_long = edge_attr.melt(id_vars=id_vars, value_vars=value_vars,
-                               var_name='attribute_combo', value_name='count')
+    for attr_str in columns:
 
-    # 2. count가 0인 항목은 제거
-    df_long = df_long[df_long['count'] > 0].copy()
+        name = attr_str.replace(strip_prefix, '') if strip_prefix else attr_str
+        parts = name.replace('_counts', '').split('_')
 
-    # 3. attribute_1, value_1, attribute_2, value_2 파싱
-    def parse_attributes(attr_str):
-        parts = attr_str.replace('edge_', '').replace('_counts', '').split('_')
         if len(parts) == 2:
             # 예: sex_1
-            return parts[0], parts[1], None, None
+            parsed.append((parts[0], parts[1], None, None))
         elif len(parts) == 4:
             # 예: sex_1_age_0
-            return parts[0], parts[1], parts[2], parts[3]
+            parsed.append((parts[0], parts[1], parts[2], parts[3]))
         else:
             raise ValueError(f"예상하지 못한 칼럼명 구조: {attr_str}")
 
-    df_long[['attribute_1', 'value_1', 'attribute_2', 'value_2']] = df_long['attribute_combo'].apply(lambda x: pd.Series(parse_attributes(x)))
+    return pd.DataFrame({col: [parts[i] for parts in parsed] for i, col in enumerate(attr_long_cols[:4])})
 
-    # 4. 최종 컬럼 정리
-    melt_edge_attr = df_long[['cause_abb', 'outcome_abb', 'attribute_1', 'value_1', 'attribute_2', 'value_2', 'count']].reset_index(drop=True)
-    
-    return melt_edge_attr
+def melt_attr_frame(wide: pd.DataFrame, id_vars: list, strip_prefix: str = None, keep_id_vars: list = None) -> pd.DataFrame:
+    """
+    wide 카운트 DataFrame -> (id_vars, attribute_1, value_1, attribute_2, value_2, count) long-format
+
+    melt -> count > 0 필터 -> 행 단위 파싱과 같은 결과 (행 순서도 melt 와 같은 컬럼 우선 순서)
+    컬럼명은 parse_attr_columns 로 한 번만 파싱하고, 행은 0 이 아닌 칸의 (컬럼, 행) 위치로 바로 생성
+    keep_id_vars: 결과에 남길 id 컬럼 (None 이면 id_vars 전체)
+    """
+    keep_id_vars = id_vars if keep_id_vars is None else keep_id_vars
+    value_vars = [col for col in wide.columns if col not in id_vars]
+    lookup = parse_attr_columns(value_vars, strip_prefix)
+
+    values = wide[value_vars].to_numpy()
+    col_idx, row_idx = np.nonzero(values.T > 0)
+
+    melted = lookup.iloc[col_idx].reset_index(drop=True)
+    for i, col in enumerate(keep_id_vars):
+        melted.insert(i, col, wide[col].to_numpy()[row_idx])
+    melted['count'] = values[row_idx, col_idx]
 
-def transform_edge_attr(fu_attr_tuple: tuple):
-    fu, edge_attr = fu_attr_tuple
-    melted = melting_edge_attr(edge_attr).copy()
-    melted['fu'] = fu
-    melted = melted[['fu'] + [col for col in melted.columns if col != 'fu']]
     return melted
 
-def melting_node_attr(node_info: pd.DataFrame):
-    
-    # 1. melt로 node_code를 제외한 나머지를 long-form으로 변환
-    id_vars = ['node_code', 'width', 'height', 'Korean', 'English']
-    value_vars = [col for col in node_info.columns if col not in id_vars]
+def attr_long_from_counts(count_matrices: dict, keys: list, combos: list = None, labels: dict = None) -> pd.DataFrame:
+    """
+    batch_attr_counts 카운트 행렬에서 wide DataFrame 없이 바로 long-format 생성
 
-    df_long = node_info.melt(id_vars=id_vars, value_vars=value_vars,
-                             var_name='attribute_combo', value_name='count')
+    keys: 행렬 행 순서의 (cause, outcome) 목록
+    return: (cause_abb, outcome_abb, attribute_1, value_1, attribute_2, value_2, count)
+        attr_count_frame -> DBver_melting_edge_attr 결과와 같은 값 / 순서 (value 는 문자열, count > 0 인 칸만)
+    """
+    combos = attr_count_combos if combos is None else combos
+    labels = attr_labels() if labels is None else labels
 
-    # 2. count가 0인 항목은 제거
-    df_long = df_long[df_long['count'] > 0].copy()
+    cause_abb = np.empty(len(keys), dtype=object)
+    cause_abb[:] = [str(key[0]) for key in keys]
+    outcome_abb = np.empty(len(keys), dtype=object)
+    outcome_abb[:] = [str(key[1]) for key in keys]
 
-    # 3. attribute_1, value_1, attribute_2, value_2 파싱
-    def parse_attributes(attr_str):
-        parts = attr_str.replace('_counts', '').split('_')
-        if len(parts) == 2:
-            # 예: sex_1
-            return parts[0], parts[1], None, None
-        elif len(parts) == 4:
-            # 예: sex_1_age_0
-            return parts[0], parts[1], parts[2], parts[3]
-        else:
-            raise ValueError(f"예상하지 못한 칼럼명 구조: {attr_str}")
+    columns = []
+    col_idx_list, row_idx_list, count_list = [], [], []
 
-    df_long[['attribute_1', 'value_1', 'attribute_2', 'value_2']] = df_long['attribute_combo'].apply(lambda x: pd.Series(parse_attributes(x)))
+    for collist, prefix_list in combos:
 
-    # 4. 최종 컬럼 정리
-    melt_node_attr = df_long[['node_code', 'attribute_1', 'value_1', 'attribute_2', 'value_2', 'count']].reset_index(drop=True)
-    
-    return melt_node_attr
+        counts = count_matrices[tuple(collist)]
 
-def DBver_melting_edge_attr(edge_attr: pd.DataFrame):
-    # edge_pids_info_1~10.csv 를 바탕으로 그냥 edge_attr를 직접 생성
+        # 컬럼 순서는 attr_count_frame 과 같이 label 정수 순
+        label_grid = np.unravel_index(np.arange(counts.shape[1]), [len(labels[col]) for col in collist])
+        order = np.array(sorted(range(counts.shape[1]), key=lambda i: tuple(int(labels[col][grid[i]]) for col, grid in zip(collist, label_grid))), dtype=np.int64)
+        combo_columns = attr_count_columns(collist, prefix_list, labels)
 
-    # 1. melt로 cause_abb, outcome_abb를 제외한 나머지를 long-form으로 변환
-    id_vars = ['cause_abb', 'outcome_abb']
-    value_vars = [col for col in edge_attr.columns if col not in id_vars]
+        col_idx, row_idx = np.nonzero(counts[:, order].T > 0)
 
-    df_long = edge_attr.melt(id_vars=id_vars, value_vars=value_vars,
-                                var_name='attribute_combo', value_name='count')
+        col_idx_list.append(len(columns) + col_idx)
+        row_idx_list.append(row_idx)
+        count_list.append(counts[row_idx, order[col_idx]])
+        columns.extend(combo_columns[i] for i in order)
 
-    # 2. count가 0인 항목은 제거
-    df_long = df_long[df_long['count'] > 0].copy()
+    col_idx = np.concatenate(col_idx_list)
+    row_idx = np.concatenate(row_idx_list)
 
-    # 3. attribute_1, value_1, attribute_2, value_2 파싱
-    def parse_attributes(attr_str):
-        parts = attr_str.replace('_counts', '').split('_')
-        if len(parts) == 2:
-            # 예: sex_1
-            return parts[0], parts[1], None, None
-        elif len(parts) == 4:
-            # 예: sex_1_age_0
-            return parts[0], parts[1], parts[2], parts[3]
-        else:
-            raise ValueError(f"예상하지 못한 칼럼명 구조: {attr_str}")
+    # 전체 컬럼명은 한 번만 파싱
+    edge_attr_long = parse_attr_columns(columns).iloc[col_idx].reset_index(drop=True)
+    edge_attr_long.insert(0, 'cause_abb', cause_abb[row_idx])
+    edge_attr_long.insert(1, 'outcome_abb', outcome_abb[row_idx])
+    edge_attr_long['count'] = np.concatenate(count_list)
+
+    return edge_attr_long
+
+def iter_edge_attr_long(fu, edge_pids, batch_size: int = 10000):
+    """
+    edge_pids ({(cause, outcome): PID 배열} dict 또는 EdgePidsStore) 를 batch_size 개 edge 씩 long-format 으로 변환 (generator)
+
+    yield: (fu, cause_abb, outcome_abb, attribute_1, value_1, attribute_2, value_2, count) DataFrame
+        edge_pids_info CSV 없이 DBver_transform_edge_attr 와 같은 행을 생성 (순서만 batch 단위)
+    """
+    items = iter(edge_pids.items())
+
+    while True:
+
+        batch = [item for _, item in zip(range(batch_size), items)]
+
+        if not batch:
+            break
+
+        lengths = np.array([len(pids) for _, pids in batch], dtype=np.int64)
+        offsets = np.r_[0, np.cumsum(lengths)]
+        batch_pids = np.concatenate([np.asarray(pids, dtype=np.int64) for _, pids in batch]) if offsets[-1] > 0 else np.empty(0, dtype=np.int64)
+
+        edge_attr_long = attr_long_from_counts(batch_attr_counts(batch_pids, offsets), [key for key, _ in batch])
+        edge_attr_long.insert(0, 'fu', fu)
+
+        yield edge_attr_long
+
+def write_attr_long_csv(frames, save_path: str):
 
-    df_long[['attribute_1', 'value_1', 'attribute_2', 'value_2']] = df_long['attribute_combo'].apply(lambda x: pd.Series(parse_attributes(x)))
+    # long-format DataFrame 들을 하나의 CSV 에 이어쓰기 (header 는 처음 한 번만, 전체를 메모리에 모으지 않음)
+    n_rows = 0
 
-    # 4. 최종 컬럼 정리
-    melt_edge_attr = df_long[['cause_abb', 'outcome_abb', 'attribute_1', 'value_1', 'attribute_2', 'value_2', 'count']].reset_index(drop=True)
+    with open(save_path, 'w', newline='') as f:
+        for frame in frames:
+            frame.to_csv(f, index=False, header=(n_rows == 0))
+            n_rows += len(frame)
 
-    return melt_edge_attr
+    return n_rows
+
+def stream_edge_attr_long(edge_pids_by_fu, save_path: str, batch_size: int = 10000):
+    """
+    follow-up 연도 순서로 edge 속성 long-format 을 CSV 에 바로 기록 (DBver_edge_attr.csv 대체)
+
+    edge_pids_by_fu: {fu: edge_pids dict / EdgePidsStore} 또는 (fu, edge_pids) 목록
+    return: 기록한 행 수
+    """
+    items = edge_pids_by_fu.items() if isinstance(edge_pids_by_fu, dict) else edge_pids_by_fu
+
+    return write_attr_long_csv(
+        (frame for fu, edge_pids in items for frame in iter_edge_attr_long(fu, edge_pids, batch_size)),
+        save_path
+    )
+
+def stream_edge_attr_csv_long(attr_tasks, save_path: str, strip_prefix: str = None):
+    """
+    기존 edge_pids_info_{fu}.csv (wide) 를 연도별로 하나씩 읽어 long-format CSV 로 이어쓰기
+
+    attr_tasks: (fu, wide CSV 경로) 목록
+    strip_prefix: edge_stat_attr_maker 결과처럼 컬럼명에 'edge_' 가 붙어 있으면 'edge_'
+    """
+    def frames():
+        for fu, file_path in attr_tasks:
+            melted = melt_attr_frame(pd.read_csv(file_path), ['cause_abb', 'outcome_abb'], strip_prefix)
+            melted.insert(0, 'fu', fu)
+            yield melted
+
+    return write_attr_long_csv(frames(), save_path)
+
+def melting_edge_attr(edge_attr: pd.DataFrame):
+
+    # cause_abb, outcome_abb 를 제외한 'edge_' 카운트 컬럼을 long-form 으로 변환 (count 가 0 인 항목은 제거)
+    return melt_attr_frame(edge_attr, ['cause_abb', 'outcome_abb'], strip_prefix='edge_')
+
+def transform_edge_attr(fu_attr_tuple: tuple):
+    fu, edge_attr = fu_attr_tuple
+    melted = melting_edge_attr(edge_attr).copy()
+    melted['fu'] = fu
+    melted = melted[['fu'] + [col for col in melted.columns if col != 'fu']]
+    return melted
+
+def melting_node_attr(node_info: pd.DataFrame):
+
+    # node_code 등 노드 정보 컬럼을 제외한 나머지를 long-form 으로 변환 (count 가 0 인 항목은 제거)
+    id_vars = ['node_code', 'width', 'height', 'Korean', 'English']
+
+    return melt_attr_frame(node_info, id_vars, keep_id_vars=['node_code'])
+
+def DBver_melting_edge_attr(edge_attr: pd.DataFrame):
+    # edge_pids_info_1~10.csv 를 바탕으로 그냥 edge_attr를 직접 생성
+
+    # cause_abb, outcome_abb 를 제외한 나머지를 long-form 으로 변환 (count 가 0 인 항목은 제거)
+    return melt_attr_frame(edge_attr, ['cause_abb', 'outcome_abb'])
 
 def DBver_transform_edge_attr(fu_attr_tuple: tuple):
     fu, edge_attr = fu_attr_tuple
@@ -1165,6 +4275,9 @@ def plot_advanced_histogram(df, column, plot_type='hist', bins=30,
     - lower_percentile: 하위 제거할 퍼센트 (기본값: 2.5)
     - upper_percentile: 상위 제거할 퍼센트 (기본값: 97.5)
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     data = df[column].dropna()
     
     if len(data) == 0:
@@ -1274,6 +4387,8 @@ def compare_two_datasets(df1, df2, column, name1='Dataset 1', name2='Dataset 2',
     두 데이터셋의 분포를 비교하는 함수 (4개 서브플롯)
     """
     
+    import matplotlib.pyplot as plt
+
     def remove_outliers_percentile(data, lower_percentile=2.5, upper_percentile=97.5):
         """퍼센타일 기반 아웃라이어 제거 함수"""
         lower_bound = np.percentile(data, lower_percentile)
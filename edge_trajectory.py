@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+from column_store import write_column_store, read_column_store
+from disease_network_funs import TemporalDiseaseNetwork
+
+# follow-up 연도별 edge 통계 (edge_stat_attr_maker 결과) 를 TemporalDiseaseNetwork 로 한 번에 정렬한 뒤
+# 모든 edge 의 연도별 추이 (기울기 / 등장 / 소멸) 를 배열 연산으로 분류하고 하나의 column store 로 저장
+
+edge_trajectory_cols = ['rr_values', 'rr_lower_cis', 'rr_upper_cis', 'log_rr_values', 'adjusted_fisher_p_values']
+edge_trajectory_labels = ['stable', 'strengthening', 'weakening', 'emerging', 'vanishing', 'transient']
+
+def edge_stats_by_fu(edge_stats) -> dict:
+    """
+    edge_stats: 다음 중 하나 -> {fu: edge_stat DataFrame}
+        - {fu: edge_stat DataFrame 또는 CSV 경로}
+        - edge_stat_attr_maker 결과 목록 [(edge_stat, edge_attr), ...] (fu 순서, 1 부터)
+        - 모든 연도를 합친 edge_stat DataFrame ('fu' 컬럼 포함, 예: whole_edge_stat)
+    """
+    if isinstance(edge_stats, dict):
+        return edge_stats
+
+    if isinstance(edge_stats, pd.DataFrame):
+        return {fu: group for fu, group in edge_stats.groupby('fu', sort=True)}
+
+    return {idx + 1: item[0] if isinstance(item, tuple) else item for idx, item in enumerate(edge_stats)}
+
+def masked_linear_fit(x, y, mask):
+    """
+    행마다 mask 가 True 인 칸만으로 y = intercept + slope * x 최소제곱 적합 (행 단위 반복 없이)
+
+    x: (연도,) / y, mask: (행, 연도)
+    return: slope, intercept, slope_se (점이 2 개 미만이면 NaN, se 는 3 개 미만이면 NaN)
+    """
+    w = mask.astype(np.float64)
+    y = np.where(mask, y, 0.0)
+
+    n = w.sum(axis=1)
+    sx = w @ x
+    sy = y.sum(axis=1)
+    sxx = w @ (x * x)
+    sxy = y @ x
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+
+        sxx_centered = sxx - sx * sx / n
+        slope = (sxy - sx * sy / n) / sxx_centered
+        intercept = (sy - slope * sx) / n
+
+        residual = np.where(mask, y - intercept[:, None] - slope[:, None] * x, 0.0)
+        slope_se = np.sqrt((residual ** 2).sum(axis=1) / (n - 2) / sxx_centered)
+
+    slope[(n < 2) | ~(sxx_centered > 0)] = np.nan
+    intercept[np.isnan(slope)] = np.nan
+    slope_se[(n < 3) | np.isnan(slope)] = np.nan
+
+    return slope, intercept, slope_se
+
+def classify_edge_trajectories(
+    temporal: TemporalDiseaseNetwork,
+    slope_col: str = 'log_rr_values',
+    slope_tol: float = 0.01,
+    batch_size: int = 1_000_000
+) -> pd.DataFrame:
+    """
+    모든 edge 의 연도별 추이를 일괄 분류 (batch_size 개 edge 단위 배열 연산)
+
+    첫 연도 / 마지막 연도에 있는지로 구분
+        - 둘 다 있음: slope_col (기본 log RR) 의 연도별 기울기 > slope_tol 이면 'strengthening', < -slope_tol 이면 'weakening', 나머지 'stable'
+        - 마지막 연도에만 있음: 'emerging' / 첫 연도에만 있음: 'vanishing' / 둘 다 없음 (중간 연도에만 있음): 'transient'
+
+    return: edge 별 cause_abb, outcome_abb, presence, n_years, first_fu, last_fu, slope / intercept / slope_se,
+            trajectory, {값 컬럼}_{fu} (연도별 정렬 행렬)
+    """
+    years = np.asarray(temporal.years)
+    n_edges, n_years = temporal.n_edges, len(temporal.years)
+
+    if n_years == 0:
+        raise ValueError("Error: 연도가 없습니다.")
+
+    labels = np.asarray(edge_trajectory_labels, dtype=object)
+    columns = {
+        'n_years': np.empty(n_edges, dtype=np.int64),
+        'first_fu': np.empty(n_edges, dtype=years.dtype),
+        'last_fu': np.empty(n_edges, dtype=years.dtype),
+        'slope': np.empty(n_edges),
+        'intercept': np.empty(n_edges),
+        'slope_se': np.empty(n_edges),
+        'trajectory': np.empty(n_edges, dtype=np.int8)
+    }
+
+    for start in range(0, n_edges, batch_size):
+
+        stop = min(start + batch_size, n_edges)
+        present = temporal.row_index[start:stop] >= 0
+
+        slope, intercept, slope_se = masked_linear_fit(years.astype(np.float64), temporal.values[slope_col][start:stop], present)
+
+        in_first, in_last = present[:, 0], present[:, -1]
+        trajectory = np.select(
+            [
+                in_first & in_last & (slope > slope_tol),
+                in_first & in_last & (slope < -slope_tol),
+                in_first & in_last,
+                in_last,
+                in_first
+            ],
+            [1, 2, 0, 3, 4],
+            default=5
+        )
+
+        columns['n_years'][start:stop] = present.sum(axis=1)
+        columns['first_fu'][start:stop] = years[present.argmax(axis=1)]
+        columns['last_fu'][start:stop] = years[n_years - 1 - present[:, ::-1].argmax(axis=1)]
+        columns['slope'][start:stop] = slope
+        columns['intercept'][start:stop] = intercept
+        columns['slope_se'][start:stop] = slope_se
+        columns['trajectory'][start:stop] = trajectory
+
+    table = pd.DataFrame({
+        'cause_abb': temporal.nodes[temporal.source],
+        'outcome_abb': temporal.nodes[temporal.target],
+        'presence': temporal.presence,
+        **{name: values for name, values in columns.items() if name != 'trajectory'},
+        'trajectory': labels[columns['trajectory']]
+    })
+
+    year_columns = {
+        f'{col}_{fu}': matrix[:, year_pos]
+        for col, matrix in temporal.values.items()
+        for year_pos, fu in enumerate(temporal.years)
+    }
+
+    return pd.concat([table, pd.DataFrame(year_columns)], axis=1)
+
+def edge_trajectory_table(
+    edge_stats,
+    value_cols: list = None,
+    slope_col: str = 'log_rr_values',
+    slope_tol: float = 0.01,
+    batch_size: int = 1_000_000,
+    save_dir: str = None
+) -> pd.DataFrame:
+    """
+    연도별 edge_stat (edge_stat_attr_maker 결과 등, edge_stats_by_fu 참조) 을 한 번에 정렬 -> 추이 분류
+
+    value_cols: 연도별로 정렬할 값 컬럼 (기본: edge_trajectory_cols)
+    save_dir: 지정하면 write_edge_trajectories 로 column store 저장
+    """
+    value_cols = edge_trajectory_cols if value_cols is None else list(value_cols)
+
+    if slope_col not in value_cols:
+        value_cols = [*value_cols, slope_col]
+
+    temporal = TemporalDiseaseNetwork.from_tables(edge_stats_by_fu(edge_stats), value_cols)
+    table = classify_edge_trajectories(temporal, slope_col, slope_tol, batch_size)
+
+    if save_dir is not None:
+        write_edge_trajectories(table, save_dir)
+
+    return table
+
+def write_edge_trajectories(table: pd.DataFrame, store_dir: str):
+
+    # 하나의 column store 로 저장 (질병 코드는 고정 폭 문자열, trajectory 는 edge_trajectory_labels 의 int8 코드)
+    columns = {}
+
+    for col in table.columns:
+        if col in ('cause_abb', 'outcome_abb'):
+            columns[col] = np.asarray(table[col].to_numpy(dtype=object), dtype=str)
+        elif col == 'trajectory':
+            columns[col] = pd.Index(edge_trajectory_labels).get_indexer(table[col]).astype(np.int8)
+        else:
+            columns[col] = table[col].to_numpy()
+
+    return write_column_store(store_dir, columns, {'trajectory_labels': edge_trajectory_labels})
+
+def read_edge_trajectories(store_dir: str, columns: list = None) -> pd.DataFrame:
+
+    # 필요한 컬럼만 읽기 (예: ['cause_abb', 'outcome_abb', 'trajectory', 'rr_values_7'])
+    arrays, meta = read_column_store(store_dir, columns, mmap=False)
+    labels = np.asarray(meta['trajectory_labels'], dtype=object)
+
+    return pd.DataFrame({
+        col: labels[values] if col == 'trajectory' else values.astype(object) if col in ('cause_abb', 'outcome_abb') else values
+        for col, values in arrays.items()
+    })
@@ -0,0 +1,188 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from column_store import write_column_store, read_column_store_meta, read_column_store, json_safe_labels, fixed_width_strings
+
+# 파이프라인 공통 인코딩 (질병 코드 / PERSON_ID / 인구학 label -> 고정 정수 코드)
+# 워커 / 단계마다 문자열을 다시 정렬하지 않도록 build_codec 으로 한 번 저장한 뒤 get_codec 으로 재사용
+
+disease_code_dtype = '<U3'
+std_attr_cols = ['SEX', 'AGE_GROUP', 'SIDO', 'CTRB_PT_TYPE_CD']
+
+def factorize_column(values):
+
+    # 문자열/object 컬럼을 작은 정수 코드 + label 목록으로 변환 (결측은 -1)
+    codes, labels = pd.factorize(pd.Series(values), sort=True)
+
+    if len(labels) < np.iinfo(np.int8).max:
+        codes = codes.astype(np.int8)
+    elif len(labels) < np.iinfo(np.int16).max:
+        codes = codes.astype(np.int16)
+    else:
+        codes = codes.astype(np.int32)
+
+    return codes, list(labels)
+
+codec_path = "/home/hashjamm/results/disease_network/codec/"
+
+# 프로세스 내 codec cache ({절대 경로: PipelineCodec}, 경로마다 한 번만 읽음)
+_codecs = {}
+
+class PipelineCodec:
+    """
+    파이프라인 공통 정수 인코딩 (고정 dictionary, 저장 후 모든 단계 / 워커에서 재사용)
+
+    diseases: 질병 코드 목록 -> int16 코드 (목록 내 위치)
+    pids: 정렬된 PERSON_ID 목록 -> dense int32 코드 (목록 내 위치)
+    attr_labels: {SEX / AGE_GROUP / SIDO / CTRB_PT_TYPE_CD: label 목록} -> int8 코드
+
+    목록에 없는 값은 -1 로 인코딩 (인구학 컬럼은 결측만 -1 허용)
+    """
+
+    def __init__(self, diseases, pids, attr_labels: dict):
+        self.diseases = fixed_width_strings([str(d) for d in diseases], disease_code_dtype, 'diseases')
+        self.pids = np.asarray(pids, dtype=np.int64)
+        self.attr_labels = {col: list(labels) for col, labels in attr_labels.items()}
+
+        if len(self.diseases) > np.iinfo(np.int16).max:
+            raise ValueError("Error: 질병 코드 수가 int16 범위를 벗어납니다.")
+
+        if len(self.pids) > np.iinfo(np.int32).max:
+            raise ValueError("Error: PERSON_ID 수가 int32 범위를 벗어납니다.")
+
+        if len(self.pids) > 1 and not (np.diff(self.pids) > 0).all():
+            raise ValueError("Error: 'pids'는 정렬 + 중복 제거된 배열이어야 합니다.")
+
+        for col, labels in self.attr_labels.items():
+            if len(labels) > np.iinfo(np.int8).max:
+                raise ValueError(f"Error: '{col}' label 수가 int8 범위를 벗어납니다.")
+
+        self._disease_index = pd.Index(self.diseases)
+        self._attr_index = {col: pd.Index(labels, dtype=object) for col, labels in self.attr_labels.items()}
+
+    @classmethod
+    def build(cls, diseases_list, std_info: pd.DataFrame):
+
+        # PID / 인구학 label 은 전체 인구 (std_pop4, disease_network_funs.get_all_std_info()) 기준으로 고정
+
+        attr_labels = {}
+        for col in std_attr_cols:
+            values = std_info['SGG'].str[:2] if col == 'SIDO' else std_info[col]
+            attr_labels[col] = factorize_column(values)[1]
+
+        return cls(
+            [str(d) for d in diseases_list],
+            np.unique(std_info['PERSON_ID'].to_numpy(dtype=np.int64)),
+            attr_labels
+        )
+
+    def save(self, codec_dir: str = None):
+        codec_dir = codec_path if codec_dir is None else codec_dir
+
+        return write_column_store(codec_dir, {'PERSON_ID': self.pids}, {
+            'diseases': self.diseases.tolist(),
+            'attr_labels': {col: json_safe_labels(labels) for col, labels in self.attr_labels.items()}
+        })
+
+    @classmethod
+    def load(cls, codec_dir: str = None):
+        codec_dir = codec_path if codec_dir is None else codec_dir
+        arrays, meta = read_column_store(codec_dir, mmap=False)
+
+        return cls(meta['diseases'], arrays['PERSON_ID'], meta['attr_labels'])
+
+    def encode_diseases(self, values):
+        return self._disease_index.get_indexer(np.asarray(values).astype(str)).astype(np.int16)
+
+    def decode_diseases(self, codes):
+        return self.diseases[np.asarray(codes)]
+
+    def encode_pids(self, values):
+
+        values = np.asarray(values, dtype=np.int64)
+
+        if len(self.pids) == 0:
+            return np.full(values.shape, -1, dtype=np.int32)
+
+        pos = np.searchsorted(self.pids, values)
+        pos[pos == len(self.pids)] = 0
+        pos[self.pids[pos] != values] = -1
+
+        return pos.astype(np.int32)
+
+    def decode_pids(self, codes):
+        return self.pids[np.asarray(codes)]
+
+    def encode_attr(self, col: str, values):
+
+        values = pd.Series(values).to_numpy(dtype=object)
+        codes = self._attr_index[col].get_indexer(values).astype(np.int8)
+
+        unknown = (codes < 0) & pd.notna(values)
+        if unknown.any():
+            raise ValueError(f"Error: '{col}' - codec 에 없는 값이 존재합니다: {values[unknown][:5].tolist()}")
+
+        return codes
+
+    def extend_attr(self, col: str, values):
+
+        # codec label 목록 뒤에 codec 에 없는 값 (결측 제외) 을 추가한 (코드, label 목록) 반환
+        # (std_pop4 에 없는 matched cohort label 도 결측으로 버리지 않고 자기 label 로 카운트하기 위함)
+        values = pd.Series(values).to_numpy(dtype=object)
+        codes = self._attr_index[col].get_indexer(values).astype(np.int64)
+        n_known = len(self.attr_labels[col])
+        extra = []
+
+        for pos in np.flatnonzero((codes < 0) & pd.notna(values)):
+            if values[pos] not in extra:
+                extra.append(values[pos])
+            codes[pos] = n_known + extra.index(values[pos])
+
+        if n_known + len(extra) > np.iinfo(np.int8).max:
+            raise ValueError(f"Error: '{col}' label 수가 int8 범위를 벗어납니다.")
+
+        return codes.astype(np.int8), self.attr_labels[col] + extra
+
+    def decode_attr(self, col: str, codes):
+
+        # -1 (결측) 은 None
+        labels = np.array(list(self.attr_labels[col]) + [None], dtype=object)
+        return labels[np.asarray(codes)]
+
+    def encode_outcome_np(self, all_outcome_np):
+
+        # (PERSON_ID, abb_sick) object 배열 -> (int64 PERSON_ID, int16 질병 코드), 목록에 없는 질병 행은 제외
+        disease_codes = self.encode_diseases(all_outcome_np[:, 1])
+        valid = disease_codes >= 0
+
+        return all_outcome_np[valid, 0].astype(np.int64), disease_codes[valid]
+
+def codec_cache_key(codec_dir: str = None) -> str:
+    return os.path.abspath(codec_path if codec_dir is None else codec_dir)
+
+def build_codec(diseases_list, std_info: pd.DataFrame, codec_dir: str = None):
+
+    # 최초 1회 실행: 고정 dictionary 생성 후 저장
+    # (node_pids_info_extractor / edge_pids_info_extractor 등 인구학 코드를 쓰는 단계보다 먼저 실행해야 함)
+    codec = PipelineCodec.build(diseases_list, std_info)
+    codec.save(codec_dir)
+    _codecs[codec_cache_key(codec_dir)] = codec
+
+    return codec
+
+def get_codec(codec_dir: str = None):
+
+    # 저장된 codec 을 경로별로 프로세스당 한 번만 읽음
+    # (저장된 codec 이 없으면 오류 - 질병 목록이 빈 codec 으로 모든 질병이 '목록에 없음' 처리되는 것을 막기 위함)
+    key = codec_cache_key(codec_dir)
+
+    if key not in _codecs:
+
+        if read_column_store_meta(key) is None:
+            raise ValueError(f"Error: 저장된 codec 이 없습니다: {key} (build_codec(diseases_list, std_info) 를 먼저 실행하세요)")
+
+        _codecs[key] = PipelineCodec.load(key)
+
+    return _codecs[key]
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from column_store import append_column_store, read_column_store, fixed_width_strings
+
+
+def test_append_round_trip(tmp_path):
+
+    store_dir = str(tmp_path / 'store')
+    append_column_store(store_dir, {'code': np.array(['A01', 'B02']), 'n': np.array([1, 2])})
+    append_column_store(store_dir, {'code': ['C03'], 'n': [3]})
+
+    arrays, meta = read_column_store(store_dir, mmap=False)
+
+    assert meta['n_rows'] == 3
+    assert arrays['code'].tolist() == ['A01', 'B02', 'C03']
+    assert arrays['n'].tolist() == [1, 2, 3]
+
+
+def test_long_strings_are_rejected_not_truncated(tmp_path):
+
+    with pytest.raises(ValueError, match='ABCD'):
+        fixed_width_strings(['A01', 'ABCD'], '<U3')
+
+    store_dir = str(tmp_path / 'store')
+    append_column_store(store_dir, {'code': np.array(['A01'])})
+
+    with pytest.raises(ValueError):
+        append_column_store(store_dir, {'code': np.array(['ABCD'])})
+
+    assert read_column_store(store_dir, mmap=False)[0]['code'].tolist() == ['A01']
+
+
+def test_edge_pids_writer_rejects_long_codes_before_writing(tmp_path):
+
+    import disease_network_funs as fun_py
+
+    writer = fun_py.EdgePidsWriter(str(tmp_path / 'edge_pids'))
+
+    with pytest.raises(ValueError, match='ABCD'):
+        writer.append({('ABCD', 'B02'): [1, 2]})
+
+    assert writer.n_pids == 0
+    assert os.path.getsize(writer.pids_file) == 0
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import disease_network_funs as fun_py
+
+
+diseases_list = ['A01', 'B02', 'C03', 'D04', 'E05']
+
+
+def synthetic_data(seed=0):
+
+    # cause 별 matched cohort (PERSON_ID, case) 와 (PERSON_ID, abb_sick, fu) first-event 테이블
+    rng = np.random.default_rng(seed)
+    pid_pool = np.arange(1000, 1400, dtype=np.int64)
+
+    cohorts = []
+    for _ in diseases_list:
+        pids = rng.choice(pid_pool, size=60)  # 중복 PID 포함
+        flags = (rng.random(60) < 0.3).astype(np.int64)
+        cohorts.append(np.column_stack([pids, flags]))
+
+    n_events = 700
+    first_event = pd.DataFrame({
+        'PERSON_ID': rng.choice(pid_pool, size=n_events),
+        'abb_sick': rng.choice(diseases_list + ['Z99'], size=n_events),
+        'fu': rng.integers(1, 6, size=n_events)
+    })
+    first_event = first_event.groupby(['PERSON_ID', 'abb_sick'], sort=False)['fu'].min().reset_index()
+
+    return cohorts, first_event
+
+
+def reference_ctable(cohorts, outcome_np):
+
+    # 기존 cause 별 loop (np.isin + crosstab) 를 그대로 옮긴 기준 구현
+    rows, edge_pids_dict = [], {}
+
+    for cause_abb, cause_np in zip(diseases_list, cohorts):
+        for outcome_abb in diseases_list:
+
+            if cause_abb == outcome_abb:
+                continue
+
+            outcome_pids = outcome_np[outcome_np[:, 1] == outcome_abb, 0].astype(np.int64)
+            has_outcome = np.isin(cause_np[:, 0], outcome_pids)
+            is_case = cause_np[:, 1] == 1
+
+            rows.append((cause_abb, outcome_abb,
+                         int(np.sum(~is_case & ~has_outcome)), int(np.sum(~is_case & has_outcome)),
+                         int(np.sum(is_case & ~has_outcome)), int(np.sum(is_case & has_outcome))))
+
+            if np.any(is_case & has_outcome):
+                edge_pids_dict[(cause_abb, outcome_abb)] = cause_np[is_case & has_outcome, 0]
+
+    ctable = pd.DataFrame(rows, columns=['cause_abb', 'outcome_abb', 'ct00', 'ct01', 'ct10', 'ct11'])
+
+    return ctable, edge_pids_dict
+
+
+def outcome_np_for(first_event, fu):
+    return first_event.loc[first_event['fu'] <= fu, ['PERSON_ID', 'abb_sick']].values
+
+
+def assert_ctable_equal(result, expected):
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True).astype({col: np.int64 for col in ['ct00', 'ct01', 'ct10', 'ct11']}).astype({'cause_abb': object, 'outcome_abb': object}),
+        expected.astype({'cause_abb': object, 'outcome_abb': object}),
+        check_dtype=False
+    )
+
+
+def assert_edge_pids_equal(result, expected):
+    assert result.keys() == expected.keys()
+    for key in expected:
+        np.testing.assert_array_equal(result[key], expected[key])
+
+
+def test_all_pairs_ctable_matches_reference():
+
+    cohorts, first_event = synthetic_data()
+    outcome_np = outcome_np_for(first_event, 3)
+
+    full_ctable, edge_pids_dict = fun_py.compute_all_pairs_ctable(diseases_list, outcome_np, cohorts=cohorts, return_edge_pids=True)
+    expected_ctable, expected_edge_pids = reference_ctable(cohorts, outcome_np)
+
+    assert_ctable_equal(full_ctable, expected_ctable)
+    assert_edge_pids_equal(edge_pids_dict, expected_edge_pids)
+
+
+def test_process_disease_pair_matches_reference(monkeypatch):
+
+    cohorts, first_event = synthetic_data(seed=1)
+    outcome_np = outcome_np_for(first_event, 5)
+    cohort_by_cause = dict(zip(diseases_list, cohorts))
+    monkeypatch.setattr(fun_py, 'read_matched_cause_np', lambda cause_abb: cohort_by_cause[cause_abb])
+
+    expected_ctable, expected_edge_pids = reference_ctable(cohorts, outcome_np)
+    outcome_index = fun_py.OutcomeIndex.from_outcome_np(outcome_np)
+
+    frames, edge_pids_dict = [], {}
+    for cause_abb in diseases_list:
+        *columns, local_edge_pids = fun_py.process_disease_pair_unfiltered(cause_abb, diseases_list, outcome_index)
+        frames.append(pd.DataFrame(dict(zip(['cause_abb', 'outcome_abb', 'ct00', 'ct01', 'ct10', 'ct11'], columns))))
+        edge_pids_dict.update(local_edge_pids)
+
+    assert_ctable_equal(pd.concat(frames, ignore_index=True), expected_ctable)
+    assert_edge_pids_equal(edge_pids_dict, expected_edge_pids)
+
+
+@pytest.mark.parametrize('fu_list', [range(1, 6), [2, 4]])
+def test_multi_year_ctable_matches_reference(fu_list):
+
+    cohorts, first_event = synthetic_data(seed=2)
+
+    multi_year_ctable = fun_py.compute_multi_year_ctable(diseases_list, first_event, fu_list=fu_list, cohorts=cohorts)
+
+    assert sorted(multi_year_ctable['fu'].unique()) == list(fu_list)
+    for fu in fu_list:
+        expected_ctable, _ = reference_ctable(cohorts, outcome_np_for(first_event, fu))
+        assert_ctable_equal(multi_year_ctable[multi_year_ctable['fu'] == fu].drop(columns='fu'), expected_ctable)
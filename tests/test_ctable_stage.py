@@ -0,0 +1,52 @@
+import json
+import os
+
+import numpy as np
+
+import disease_network_funs as fun_py
+from column_store import append_column_store, read_column_store_meta
+
+
+def write_rows(rows_dir, cause_abb, n_rows):
+    return append_column_store(rows_dir, {
+        'cause_abb': np.full(n_rows, cause_abb),
+        'outcome_abb': np.array([f'O{i:02d}' for i in range(n_rows)]),
+        'ct00': np.arange(n_rows), 'ct01': np.arange(n_rows), 'ct10': np.arange(n_rows), 'ct11': np.arange(n_rows)
+    })['n_rows']
+
+
+def test_read_ctable_stage_ignores_uncommitted_rows(tmp_path):
+
+    stage_dir = str(tmp_path / 'stage')
+    rows_dir = os.path.join(stage_dir, 'rows')
+    os.makedirs(stage_dir)
+
+    row_stop = write_rows(rows_dir, 'A01', 3)
+    with open(os.path.join(stage_dir, 'manifest.jsonl'), 'w') as f:
+        f.write(json.dumps({'cause_abb': 'A01', 'n_rows': 3, 'row_stop': row_stop}) + '\n')
+
+    # manifest 에 기록되기 전의 행 (다른 프로세스가 쓰는 중)
+    write_rows(rows_dir, 'B02', 2)
+
+    ctable = fun_py.read_ctable_stage(stage_dir)
+
+    assert ctable['cause_abb'].tolist() == ['A01'] * 3
+    assert read_column_store_meta(rows_dir)['n_rows'] == 5
+
+
+def test_run_ctable_stage_keeps_committed_manifest(tmp_path):
+
+    stage_dir = str(tmp_path / 'stage')
+    os.makedirs(stage_dir)
+
+    row_stop = write_rows(os.path.join(stage_dir, 'rows'), 'A01', 3)
+    with open(os.path.join(stage_dir, 'manifest.jsonl'), 'w') as f:
+        f.write(json.dumps({'cause_abb': 'A01', 'n_rows': 3, 'row_stop': row_stop}) + '\n')
+        f.write('{"cause_abb": "B0')
+
+    # 모든 cause 가 manifest 에 있으면 Pool 없이 manifest 정리 후 바로 읽음
+    ctable = fun_py.run_ctable_stage(1, ['A01'], None, stage_dir=stage_dir, edge_pids_dir=str(tmp_path / 'edge_pids'))
+
+    assert len(ctable) == 3
+    assert fun_py.read_ctable_manifest(stage_dir) == [{'cause_abb': 'A01', 'n_rows': 3, 'row_stop': 3}]
+    assert not os.path.exists(os.path.join(stage_dir, 'manifest.jsonl.tmp'))
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from scipy.stats import contingency
+
+from ctable_stats import fisher_exact_p_values, p_adjust, compute_ctable_stats, final_to_stat
+
+
+def random_tables(n_rows, seed=0):
+
+    # 작은 칸 / 0 칸 / 큰 칸 (matched cohort 크기) 이 섞인 2x2 테이블
+    rng = np.random.default_rng(seed)
+    scale = rng.choice([5, 50, 5000, 200000], size=(n_rows, 1))
+    tables = rng.integers(0, scale, size=(n_rows, 4))
+    tables[::7, 3] = 0
+    return tables.T
+
+
+def test_fisher_matches_scipy():
+
+    ct00, ct01, ct10, ct11 = random_tables(300)
+    p_values = fisher_exact_p_values(ct00, ct01, ct10, ct11)
+
+    expected = np.array([
+        stats.fisher_exact([[a, b], [c, d]])[1] for a, b, c, d in zip(ct00, ct01, ct10, ct11)
+    ])
+
+    np.testing.assert_allclose(p_values, expected, rtol=1e-10, atol=1e-300)
+
+
+def test_rr_ci_and_chisq_match_scipy():
+
+    ct00, ct01, ct10, ct11 = random_tables(200, seed=1) + 1
+    result = compute_ctable_stats(ct00, ct01, ct10, ct11, batch_size=64)
+
+    for i in range(len(ct00)):
+
+        rr = contingency.relative_risk(ct11[i], ct10[i] + ct11[i], ct01[i], ct00[i] + ct01[i])
+        ci = rr.confidence_interval(0.95)
+        chisq, chisq_p, _, _ = stats.chi2_contingency([[ct00[i], ct01[i]], [ct10[i], ct11[i]]], correction=False)
+
+        assert result['rr_values'][i] == pytest.approx(rr.relative_risk, rel=1e-12)
+        assert result['log_rr_values'][i] == pytest.approx(np.log(rr.relative_risk), rel=1e-9, abs=1e-12)
+        assert result['rr_lower_cis'][i] == pytest.approx(ci.low, rel=1e-9)
+        assert result['rr_upper_cis'][i] == pytest.approx(ci.high, rel=1e-9)
+        assert result['chisq_values'][i] == pytest.approx(chisq, rel=1e-9)
+        assert result['chisq_p_values'][i] == pytest.approx(chisq_p, rel=1e-9, abs=1e-300)
+
+
+def test_p_adjust_matches_scipy_bh():
+
+    rng = np.random.default_rng(2)
+    p_values = rng.uniform(0, 0.2, 500) ** 2
+    p_values[[3, 50, 400]] = np.nan
+    valid = ~np.isnan(p_values)
+
+    adjusted = p_adjust(p_values, 'fdr')
+
+    np.testing.assert_allclose(adjusted[valid], stats.false_discovery_control(p_values[valid], method='bh'), rtol=1e-12)
+    assert np.isnan(adjusted[~valid]).all()
+    np.testing.assert_allclose(p_adjust(p_values, 'bonferroni')[valid], np.minimum(p_values[valid] * valid.sum(), 1.0))
+
+
+def test_final_to_stat_columns_and_order():
+
+    ct00, ct01, ct10, ct11 = random_tables(50, seed=3) + 1
+    final_ctable = pd.DataFrame({
+        'cause_abb': [f'C{i:02d}' for i in range(50)], 'outcome_abb': 'O01',
+        'ct00': ct00, 'ct01': ct01, 'ct10': ct10, 'ct11': ct11
+    })
+
+    stat_ctable = final_to_stat(final_ctable)
+
+    assert list(stat_ctable.columns) == [
+        'cause_abb', 'outcome_abb', 'ct00', 'ct01', 'ct10', 'ct11', 'rr_values', 'rr_lower_cis', 'rr_upper_cis', 'log_rr_values',
+        'chisq_p_values', 'fisher_p_values', 'adjusted_chisq_p_values', 'adjusted_fisher_p_values'
+    ]
+    assert (np.diff(stat_ctable['rr_values'].to_numpy()) <= 0).all()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import edge_trajectory
+
+
+def test_masked_linear_fit_matches_linregress():
+
+    rng = np.random.default_rng(0)
+    x = np.arange(1, 11, dtype=np.float64)
+    y = rng.normal(size=(200, 10))
+    mask = rng.random((200, 10)) < 0.6
+    mask[:3] = [[True] + [False] * 9, [True, True] + [False] * 8, [True] * 3 + [False] * 7]
+
+    slope, intercept, slope_se = edge_trajectory.masked_linear_fit(x, y, mask)
+
+    for i in range(len(y)):
+
+        n = mask[i].sum()
+        if n < 2:
+            assert np.isnan(slope[i]) and np.isnan(intercept[i]) and np.isnan(slope_se[i])
+            continue
+
+        expected = stats.linregress(x[mask[i]], y[i, mask[i]])
+        np.testing.assert_allclose([slope[i], intercept[i]], [expected.slope, expected.intercept], rtol=1e-9, atol=1e-12)
+
+        if n < 3:
+            assert np.isnan(slope_se[i])
+        else:
+            np.testing.assert_allclose(slope_se[i], expected.stderr, rtol=1e-9, atol=1e-12)
+
+
+def edge_stat(pairs_rr):
+    df = pd.DataFrame(pairs_rr, columns=['cause_abb', 'outcome_abb', 'rr_values'])
+    df['log_rr_values'] = np.log(df['rr_values'])
+    return df
+
+
+def test_trajectory_classification_and_round_trip(tmp_path):
+
+    edge_stats = {
+        1: edge_stat([('A', 'B', 1.5), ('A', 'C', 3.0), ('B', 'C', 2.0), ('C', 'A', 1.2), ('D', 'A', 2.0)]),
+        2: edge_stat([('A', 'B', 2.0), ('A', 'C', 2.0), ('B', 'C', 2.0), ('C', 'D', 1.3), ('D', 'A', 2.0)]),
+        3: edge_stat([('A', 'B', 3.0), ('A', 'C', 1.5), ('B', 'C', 2.0), ('B', 'D', 1.4)])
+    }
+
+    table = edge_trajectory.edge_trajectory_table(edge_stats, value_cols=['rr_values'], save_dir=str(tmp_path / 'trajectories'))
+    trajectory = dict(zip(zip(table['cause_abb'], table['outcome_abb']), table['trajectory']))
+
+    assert trajectory == {
+        ('A', 'B'): 'strengthening', ('A', 'C'): 'weakening', ('B', 'C'): 'stable',
+        ('B', 'D'): 'emerging', ('C', 'A'): 'vanishing', ('C', 'D'): 'transient', ('D', 'A'): 'vanishing'
+    }
+    assert table.loc[table['cause_abb'].eq('A') & table['outcome_abb'].eq('B'), 'rr_values_2'].item() == 2.0
+
+    loaded = edge_trajectory.read_edge_trajectories(str(tmp_path / 'trajectories'))
+    pd.testing.assert_frame_equal(loaded, table, check_dtype=False)
@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import disease_network_funs as fun_py
+
+
+@pytest.fixture
+def edge_file(tmp_path):
+
+    rng = np.random.default_rng(0)
+    nodes = [f'N{i:02d}' for i in range(30)]
+    df = pd.DataFrame({
+        'cause_abb': rng.choice(nodes, 150),
+        'outcome_abb': rng.choice(nodes, 150),
+        'rr_values': rng.uniform(1.05, 4, 150)
+    })
+    df['log_rr_values'] = np.log(df['rr_values'])
+
+    file_path = tmp_path / 'cut.csv'
+    df.to_csv(file_path, index=False)
+
+    return str(file_path)
+
+
+@pytest.fixture(autouse=True)
+def empty_size_estimates(monkeypatch):
+    monkeypatch.setattr(fun_py, '_feature_cache_bytes', {})
+
+
+@pytest.fixture
+def compute_calls(monkeypatch):
+
+    calls = []
+    compute_network_features = fun_py.compute_network_features
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return compute_network_features(*args, **kwargs)
+
+    monkeypatch.setattr(fun_py, 'compute_network_features', counting)
+
+    return calls
+
+
+def cache_files(cache_dir):
+    return [os.path.join(root, name) for root, _, files in os.walk(cache_dir) for name in files]
+
+
+@pytest.mark.parametrize('backend', ['networkx', 'sparse'])
+def test_cached_result_matches_computed(tmp_path, edge_file, compute_calls, backend):
+
+    cache_dir = str(tmp_path / 'cache')
+    widths = {'N01': 2.0, 'N05': 0.5}
+
+    computed = fun_py.compute_from_file(edge_file, node_widths=widths, backend=backend, cache_dir=cache_dir)
+    cached = fun_py.compute_from_file(edge_file, node_widths=widths, backend=backend, cache_dir=cache_dir)
+
+    assert len(compute_calls) == 1
+    assert not any(name.endswith('.pkl') for name in cache_files(cache_dir))
+
+    assert set(cached) == set(computed)
+    for key in computed:
+        if key != 'graph':
+            assert cached[key] == computed[key], key
+            assert not isinstance(computed[key], dict) or list(cached[key]) == list(computed[key]), key
+
+    # graph 는 같은 형식으로 복원 (sparse 는 networkx 없이 GraphCSR)
+    assert type(cached['graph']) is type(computed['graph'])
+    G, H = fun_py.network_graph(computed['graph']), fun_py.network_graph(cached['graph'])
+    assert list(G.nodes(data=True)) == list(H.nodes(data=True))
+    assert sorted(G.edges(data='weight')) == sorted(H.edges(data='weight'))
+
+
+def test_cache_defaults_to_feature_cache_path(tmp_path, monkeypatch, edge_file, compute_calls):
+
+    monkeypatch.setattr(fun_py, 'feature_cache_path', str(tmp_path / 'default_cache'))
+
+    fun_py.compute_from_file(edge_file)
+    fun_py.compute_from_file(edge_file)
+
+    assert len(compute_calls) == 1
+    assert len(fun_py.feature_cache_entries(fun_py.feature_cache_path)) == 1
+
+
+def test_cache_disabled(tmp_path, monkeypatch, edge_file, compute_calls):
+
+    monkeypatch.setattr(fun_py, 'feature_cache_path', str(tmp_path / 'default_cache'))
+
+    fun_py.compute_from_file(edge_file, cache_dir=False)
+    fun_py.compute_from_file(edge_file, cache_dir=False)
+
+    assert len(compute_calls) == 2
+    assert not os.path.exists(fun_py.feature_cache_path)
+
+
+def test_evict_and_invalidate(tmp_path, edge_file):
+
+    cache_dir = str(tmp_path / 'cache')
+
+    fun_py.compute_from_file(edge_file, cache_dir=cache_dir)
+    fun_py.compute_from_file(edge_file, auto_log_transform=False, cache_dir=cache_dir)
+    entries = fun_py.feature_cache_entries(cache_dir)
+
+    assert len(entries) == 2 and (entries['file_path'] == os.path.abspath(edge_file)).all()
+    assert fun_py.evict_feature_cache(cache_dir, entries['bytes'].sum() - 1) == 1
+    assert fun_py.invalidate_feature_cache(edge_file, cache_dir) == 1
+    assert os.listdir(cache_dir) == []
+
+
+def test_cache_version_is_part_of_key(tmp_path, monkeypatch, edge_file, compute_calls):
+
+    cache_dir = str(tmp_path / 'cache')
+
+    fun_py.compute_from_file(edge_file, cache_dir=cache_dir)
+    monkeypatch.setattr(fun_py, 'feature_cache_version', fun_py.feature_cache_version + 1)
+    fun_py.compute_from_file(edge_file, cache_dir=cache_dir)
+
+    assert len(compute_calls) == 2
+    assert len(fun_py.feature_cache_entries(cache_dir)) == 2
+
+
+def test_evict_only_over_size_limit(tmp_path, monkeypatch, edge_file):
+
+    cache_dir = str(tmp_path / 'cache')
+    evict_calls = []
+    evict_feature_cache = fun_py.evict_feature_cache
+
+    def counting(*args, **kwargs):
+        evict_calls.append(args)
+        return evict_feature_cache(*args, **kwargs)
+
+    monkeypatch.setattr(fun_py, 'evict_feature_cache', counting)
+
+    fun_py.compute_from_file(edge_file, cache_dir=cache_dir)
+    fun_py.compute_from_file(edge_file, auto_log_transform=False, cache_dir=cache_dir)
+    assert evict_calls == []
+
+    # 추정치가 한도를 넘으면 오래된 항목부터 삭제하고 추정치를 실제 크기로 맞춤
+    entry_bytes = fun_py.feature_cache_entries(cache_dir)['bytes'].max()
+    fun_py.compute_from_file(edge_file, backend='sparse', cache_dir=cache_dir, cache_max_bytes=2 * entry_bytes)
+
+    entries = fun_py.feature_cache_entries(cache_dir)
+    assert len(evict_calls) == 1 and len(entries) == 2
+    assert fun_py._feature_cache_bytes[os.path.abspath(cache_dir)] == entries['bytes'].sum()
+
+
+def test_entry_removed_while_reading_is_a_miss(tmp_path, monkeypatch, edge_file, compute_calls):
+
+    cache_dir = str(tmp_path / 'cache')
+    fun_py.compute_from_file(edge_file, cache_dir=cache_dir)
+    key = fun_py.feature_cache_entries(cache_dir)['key'].iloc[0]
+
+    # graph 를 읽기 직전에 다른 워커가 항목을 삭제한 경우
+    graph = fun_py.NetworkFeatureStore.graph
+
+    def removed_then_read(store):
+        fun_py.remove_feature_cache_entry(cache_dir, key)
+        return graph(store)
+
+    monkeypatch.setattr(fun_py.NetworkFeatureStore, 'graph', removed_then_read)
+
+    assert fun_py.read_feature_cache(cache_dir, key) is None
+    assert os.listdir(cache_dir) == []
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+
+# 모듈 import 시간 허용치 (Pool 워커 생성 / reload(fun_py) 마다 반복되는 비용)
+import_time_budget = 1.0
+heavy_modules = ['networkx', 'infomap', 'matplotlib', 'seaborn', 'scipy', 'joblib']
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module_name='disease_network_funs'):
+
+    # 새 Python 프로세스에서 import 시간과 import 시점에 로드된 heavy_modules 측정
+    code = (
+        "import sys, time, json\n"
+        f"sys.path.insert(0, {repo_dir!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {module_name}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'heavy_loaded': [m for m in {heavy_modules!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_modules():
+
+    assert measure_import()['heavy_loaded'] == []
+
+
+def test_import_time_within_budget():
+
+    # 첫 실행은 .pyc 생성 / 디스크 캐시 영향이 있으므로 제외하고 중앙값으로 판단
+    measure_import()
+    times = [measure_import()['elapsed'] for _ in range(5)]
+
+    assert np.median(times) <= import_time_budget, f"import 시간 {np.median(times):.3f}s 가 허용 시간 {import_time_budget:.3f}s 를 넘습니다: {times}"
@@ -0,0 +1,258 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import networkx as nx
+import pandas as pd
+import pytest
+
+import disease_network_funs as fun_py
+
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def graph_from_edges(edges):
+    cause, outcome, weight = zip(*edges)
+    return fun_py.build_graph_from_arrays(cause, outcome, weight)
+
+
+def csr_betweenness_dict(csr, normalized=True):
+    return dict(zip(csr.nodes.tolist(), fun_py.csr_betweenness(csr, normalized).tolist()))
+
+
+def path_count_betweenness(G):
+
+    # 모든 simple path 를 나열해 세는 기준 구현 (정규화 전, 작은 DAG 용)
+    betweenness = dict.fromkeys(G, 0.0)
+
+    for s in G:
+        for t in G:
+
+            if s == t:
+                continue
+
+            paths = list(nx.all_simple_paths(G, s, t))
+            if not paths:
+                continue
+
+            lengths = np.array([nx.path_weight(G, path, 'weight') for path in paths])
+            shortest = [path for path, length in zip(paths, lengths) if np.isclose(length, lengths.min())]
+
+            for path in shortest:
+                for v in path[1:-1]:
+                    betweenness[v] += 1 / len(shortest)
+
+    return betweenness
+
+
+def test_betweenness_matches_networkx_with_ties():
+
+    edges = [('a', 'b', 1.0), ('a', 'c', 1.0), ('b', 'd', 1.0), ('c', 'd', 1.0), ('d', 'e', 0.5), ('e', 'a', 0.5), ('c', 'e', 1.5)]
+    G, csr = graph_from_edges(edges)
+
+    assert csr_betweenness_dict(csr) == pytest.approx(nx.betweenness_centrality(G, weight='weight'))
+
+
+@pytest.mark.parametrize('edges', [
+    [('s', 'a', 0.0), ('a', 'b', 0.0), ('s', 'b', 0.0), ('b', 'c', 1.0)],
+    [('s', 'b', 0.0), ('s', 'a', 0.0), ('a', 'b', 0.0), ('b', 'c', 1.0), ('c', 'd', 0.0), ('a', 'd', 1.0)]
+])
+def test_betweenness_zero_weight_dag_matches_path_count(edges):
+
+    G, csr = graph_from_edges(edges)
+
+    assert csr_betweenness_dict(csr, normalized=False) == pytest.approx(path_count_betweenness(G))
+
+
+def test_betweenness_zero_weight_cycle():
+
+    # weight 0 cycle (a -> b -> a) 에서도 ZeroDivisionError 없이 유한한 값
+    G, csr = graph_from_edges([('a', 'b', 0.0), ('b', 'a', 0.0)])
+    assert csr_betweenness_dict(csr) == {'a': 0.0, 'b': 0.0}
+
+    G, csr = graph_from_edges([('a', 'b', 0.0), ('b', 'a', 0.0), ('b', 'c', 1.0), ('c', 'd', 0.0), ('d', 'b', 0.0), ('a', 'd', 1.0)])
+    assert np.isfinite(list(csr_betweenness_dict(csr).values())).all()
+
+
+def test_betweenness_float_ties_within_tolerance():
+
+    # 0.1 + 0.2 와 0.3 은 같은 길이의 최단 경로로 취급
+    G, csr = graph_from_edges([('a', 'b', 0.1), ('b', 'c', 0.2), ('a', 'x', 0.3), ('x', 'c', 0.0), ('a', 'c', 0.5)])
+
+    assert csr_betweenness_dict(csr, normalized=False) == pytest.approx(path_count_betweenness(G))
+
+
+def test_betweenness_rejects_negative_weights():
+
+    G, csr = graph_from_edges([('a', 'b', -0.5), ('b', 'c', 1.0)])
+
+    with pytest.raises(ValueError):
+        fun_py.csr_betweenness(csr)
+
+
+
+def random_edge_df(n_nodes=40, n_edges=200, seed=0):
+
+    # log RR 합이 부동소수점 오차로만 겹치는 경로가 없도록 반올림하지 않은 RR 사용
+    rng = np.random.default_rng(seed)
+    nodes = [f'N{i:02d}' for i in range(n_nodes)]
+    df = pd.DataFrame({
+        'cause_abb': rng.choice(nodes, n_edges),
+        'outcome_abb': rng.choice(nodes, n_edges),
+        'rr_values': rng.uniform(1.05, 4, n_edges)
+    })
+    df['log_rr_values'] = np.log(df['rr_values'])
+
+    return df
+
+
+@pytest.mark.parametrize('backend, workers', [('networkx', 1), ('networkx', 2), ('sparse', 1)])
+def test_compute_network_features_rejects_rr_below_one(backend, workers):
+
+    # log RR 에서 RR < 1 은 음수 weight -> backend 와 관계없이 같은 오류
+    df = random_edge_df()
+    df.loc[0, 'rr_values'] = 0.8
+    df['log_rr_values'] = np.log(df['rr_values'])
+
+    with pytest.raises(ValueError, match='음수 weight'):
+        fun_py.compute_network_features(df, backend=backend, betweenness_workers=workers)
+
+    assert fun_py.compute_network_features(df, auto_log_transform=False, backend=backend)['betweenness']
+
+
+def test_sparse_backend_does_not_import_networkx():
+
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {repo_dir!r})\n"
+        "import numpy as np, pandas as pd\n"
+        "import disease_network_funs as fun_py\n"
+        "df = pd.DataFrame({'cause_abb': ['a', 'b', 'c', 'a'], 'outcome_abb': ['b', 'c', 'a', 'c'], 'rr_values': [1.5, 2.0, 1.2, 3.0]})\n"
+        "df['log_rr_values'] = np.log(df['rr_values'])\n"
+        "result = fun_py.compute_network_features(df, backend='sparse', node_widths={'a': 1.0})\n"
+        "print('networkx' in sys.modules, type(result['graph']).__name__)\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert output.split() == ['False', 'GraphCSR']
+
+
+def test_sparse_graph_converts_to_networkx_graph():
+
+    df = random_edge_df()
+    widths = {f'N{i:02d}': float(i) for i in range(0, 40, 3)}
+
+    G = fun_py.compute_network_features(df, node_widths=widths)['graph']
+    H = fun_py.network_graph(fun_py.compute_network_features(df, backend='sparse', node_widths=widths)['graph'])
+
+    assert list(G.nodes(data=True)) == list(H.nodes(data=True))
+    assert sorted(G.edges(data='weight')) == sorted(H.edges(data='weight'))
+
+
+network_metric_keys = [
+    'num_nodes', 'num_edges', 'density', 'is_strongly_connected', 'num_strongly_connected_components',
+    'largest_scc_size', 'avg_shortest_path_length_largest_scc', 'diameter_largest_scc',
+    'degree_centrality', 'in_degree', 'in_degree_centrality', 'out_degree', 'out_degree_centrality',
+    'in_strength', 'out_strength', 'pagerank', 'betweenness',
+    'cluster_assignments', 'scc_nodes', 'non_clustered_nodes', 'num_clustered_nodes', 'infomap_codelength'
+]
+
+
+def assert_same_value(a, b, key):
+
+    if isinstance(a, dict):
+        assert list(a) == list(b), key  # dict_sorting 순서까지 동일
+        assert [a[node] for node in a] == pytest.approx([b[node] for node in a], rel=1e-9, abs=1e-12), key
+    elif isinstance(a, (list, bool, str)) or a is None:
+        assert a == b, key
+    else:
+        assert a == pytest.approx(b, rel=1e-9, abs=1e-12), key
+
+
+def integer_rr_df(n_nodes=30, n_edges=150, seed=0):
+
+    # 정수 RR (auto_log_transform=False) -> 길이가 정확히 같은 최단 경로 (tie) 가 많은 그래프
+    df = random_edge_df(n_nodes, n_edges, seed)
+    df['rr_values'] = np.ceil(df['rr_values'])
+
+    return df
+
+
+def strongly_connected_df(n_nodes=25, seed=0):
+
+    # 모든 노드를 잇는 cycle + 임의 edge
+    df = random_edge_df(n_nodes, 60, seed)
+    ring = pd.DataFrame({
+        'cause_abb': [f'N{i:02d}' for i in range(n_nodes)],
+        'outcome_abb': [f'N{(i + 1) % n_nodes:02d}' for i in range(n_nodes)],
+        'rr_values': np.linspace(1.1, 3.0, n_nodes)
+    })
+    ring['log_rr_values'] = np.log(ring['rr_values'])
+
+    return pd.concat([ring, df], ignore_index=True)
+
+
+def not_strongly_connected_df(seed=0):
+
+    # strongly connected 그래프 + 들어오는 edge 만 있는 노드 5개
+    # (networkx backend 는 largest SCC 가 전체 노드의 절반 이하이면 G.subgraph 의 노드 순서가 set 순서가 되어
+    #  Infomap 입력 순서가 문자열 hash 에 따라 달라지므로, largest SCC 가 절반을 넘는 그래프로 비교)
+    rng = np.random.default_rng(seed)
+    df = strongly_connected_df(seed=seed)
+    sinks = pd.DataFrame({
+        'cause_abb': rng.choice(df['cause_abb'].unique(), 10),
+        'outcome_abb': [f'S{i}' for i in range(5)] * 2,
+        'rr_values': rng.uniform(1.05, 4, 10)
+    })
+    sinks['log_rr_values'] = np.log(sinks['rr_values'])
+
+    return pd.concat([df, sinks], ignore_index=True)
+
+
+@pytest.mark.parametrize('df, kwargs', [
+    (not_strongly_connected_df(), {}),
+    (random_edge_df(40, 60, seed=1), {'use_largest_scc_for_clustering': False}),
+    (random_edge_df(60, 400, seed=2), {'auto_log_transform': False}),
+    (integer_rr_df(), {'auto_log_transform': False}),
+    (strongly_connected_df(), {}),
+], ids=['not_strongly_connected', 'cluster_all_nodes', 'no_log', 'ties', 'strongly_connected'])
+def test_backends_match_key_by_key(df, kwargs):
+
+    nx_result = fun_py.compute_network_features(df, backend='networkx', **kwargs)
+    sparse_result = fun_py.compute_network_features(df, backend='sparse', **kwargs)
+
+    # networkx backend 의 scc_nodes 는 G.subgraph(set) 순서 (문자열 hash 에 따라 달라짐) 이므로 구성만 비교
+    assert sorted(nx_result['scc_nodes']) == sorted(sparse_result['scc_nodes'])
+
+    for key in network_metric_keys:
+        if key != 'scc_nodes':
+            assert_same_value(nx_result[key], sparse_result[key], key)
+
+
+def test_backend_fixtures_cover_connectivity_and_ties():
+
+    result = fun_py.compute_network_features(not_strongly_connected_df(), backend='sparse')
+    assert not result['is_strongly_connected'] and result['num_strongly_connected_components'] > 1
+    assert fun_py.compute_network_features(strongly_connected_df(), backend='sparse')['is_strongly_connected']
+
+    # 같은 길이의 최단 경로가 실제로 있는지 (source -> target 최단 경로가 2개 이상인 쌍)
+    G = fun_py.build_directed_graph_from_df(integer_rr_df(), weight_col='rr_values')
+    assert any(
+        len(list(nx.all_shortest_paths(G, s, t, weight='weight'))) > 1
+        for s in list(G)[:10] for t in G if s != t and nx.has_path(G, s, t)
+    )
+
+
+def test_pagerank_non_convergence_raises_networkx_error():
+
+    df = random_edge_df()
+    G = fun_py.build_directed_graph_from_df(df)
+    csr = fun_py.GraphCSR.from_df(df)
+
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        nx.pagerank(G, weight='weight', max_iter=2)
+
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        fun_py.csr_pagerank(csr, max_iter=2)
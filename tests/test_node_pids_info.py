@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import disease_network_funs as fun_py
+import pipeline_codec
+
+
+def std_info():
+    rng = np.random.default_rng(0)
+    n = 400
+    return pd.DataFrame({
+        'PERSON_ID': np.arange(1, n + 1),
+        'SEX': rng.choice(['1', '2'], n),
+        'AGE_GROUP': rng.choice([str(age) for age in range(1, 19)], n),
+        'SGG': rng.choice(['11010', '11020', '26110', '41110', '48120'], n),
+        'CTRB_PT_TYPE_CD': rng.choice(['1', '5', '9'], n)
+    })
+
+
+def baseline_node_counts(matched_df, cause_abb):
+
+    # 기존 node_pids_info_extractor (category 변환 + make_counts_dict)
+    target_df = matched_df[matched_df['case'] == 1].copy()
+    target_df[['SEX', 'AGE_GROUP', 'SGG', 'CTRB_PT_TYPE_CD']] = target_df[['SEX', 'AGE_GROUP', 'SGG', 'CTRB_PT_TYPE_CD']].astype('category')
+    target_df['SIDO'] = target_df['SGG'].str[:2]
+
+    return fun_py.merge_dicts(
+        {'node_code': f'{cause_abb}'},
+        fun_py.make_counts_dict(target_df, ['SEX'], ['sex']),
+        fun_py.make_counts_dict(target_df, ['AGE_GROUP'], ['age']),
+        fun_py.make_counts_dict(target_df, ['SIDO'], ['sido']),
+        fun_py.make_counts_dict(target_df, ['CTRB_PT_TYPE_CD'], ['ctrb']),
+        fun_py.make_counts_dict(target_df, ['SEX', 'AGE_GROUP'], ['sex', 'age']),
+        fun_py.make_counts_dict(target_df, ['SEX', 'SIDO'], ['sex', 'sido']),
+        fun_py.make_counts_dict(target_df, ['SEX', 'CTRB_PT_TYPE_CD'], ['sex', 'ctrb'])
+    )
+
+
+@pytest.fixture
+def matched_df(tmp_path, monkeypatch):
+
+    std_df = std_info()
+    matched_df = std_df.sample(120, random_state=1).reset_index(drop=True)
+    matched_df['case'] = np.arange(len(matched_df)) % 3 == 0
+
+    monkeypatch.setattr(fun_py, 'matched_path', f'{tmp_path}/matched/')
+    monkeypatch.setattr(fun_py, 'matched_cache_path', f'{tmp_path}/matched_cache/')
+    monkeypatch.setattr(pipeline_codec, '_codecs', {pipeline_codec.codec_cache_key(): pipeline_codec.PipelineCodec.build(['A01', 'B02'], std_df)})
+    monkeypatch.setattr(fun_py.pyreadstat, 'read_sas7bdat', lambda *args, **kwargs: (matched_df.astype({'case': int}), None))
+
+    (tmp_path / 'matched').mkdir()
+    (tmp_path / 'matched' / 'matched_a01.sas7bdat').touch()
+
+    return matched_df
+
+
+def test_node_counts_match_baseline(matched_df):
+
+    assert fun_py.node_pids_info_extractor('A01') == baseline_node_counts(matched_df, 'A01')
+
+
+def test_labels_missing_from_codec_are_counted_under_own_label(matched_df):
+
+    # std_pop4 에 없는 SIDO ('99') 도 기존과 같이 자기 label 로 카운트
+    matched_df.loc[0, 'SGG'] = '99110'
+
+    expected = baseline_node_counts(matched_df, 'A01')
+
+    assert 'sido_99_counts' in expected
+    assert fun_py.node_pids_info_extractor('A01') == expected
+
+
+def test_label_type_mismatch_with_codec(matched_df, monkeypatch):
+
+    # std_pop4 의 AGE_GROUP 이 숫자, matched cohort 는 문자열이어도 카운트가 사라지지 않음
+    std_df = std_info()
+    std_df['AGE_GROUP'] = std_df['AGE_GROUP'].astype(int)
+    monkeypatch.setattr(pipeline_codec, '_codecs', {pipeline_codec.codec_cache_key(): pipeline_codec.PipelineCodec.build(['A01', 'B02'], std_df)})
+
+    assert fun_py.node_pids_info_extractor('A01') == baseline_node_counts(matched_df, 'A01')
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pipeline_codec
+
+
+@pytest.fixture
+def std_info():
+    return pd.DataFrame({
+        'PERSON_ID': [30, 10, 20, 40],
+        'SEX': ['1', '2', '1', '2'],
+        'AGE_GROUP': ['3', '1', '2', None],
+        'SGG': ['11010', '26110', '11020', '41110'],
+        'CTRB_PT_TYPE_CD': ['5', '5', '9', '1']
+    })
+
+
+@pytest.fixture(autouse=True)
+def reset_codec(monkeypatch):
+    monkeypatch.setattr(pipeline_codec, '_codecs', {})
+
+
+def test_codec_round_trip(tmp_path, std_info):
+
+    codec = pipeline_codec.build_codec(['A01', 'B02', 'C03'], std_info, str(tmp_path / 'codec'))
+    loaded = pipeline_codec.PipelineCodec.load(str(tmp_path / 'codec'))
+
+    assert loaded.diseases.tolist() == ['A01', 'B02', 'C03']
+    assert loaded.pids.tolist() == [10, 20, 30, 40]
+    assert loaded.attr_labels == codec.attr_labels
+
+    assert loaded.encode_diseases(['C03', 'A01', 'Z99']).tolist() == [2, 0, -1]
+    assert loaded.encode_pids([40, 10, 99]).tolist() == [3, 0, -1]
+
+    codes = loaded.encode_attr('AGE_GROUP', std_info['AGE_GROUP'])
+    assert loaded.decode_attr('AGE_GROUP', codes).tolist() == ['3', '1', '2', None]
+    assert loaded.attr_labels['SIDO'] == ['11', '26', '41']
+
+
+def test_get_codec_requires_saved_codec(tmp_path, std_info):
+
+    with pytest.raises(ValueError, match='codec'):
+        pipeline_codec.get_codec(str(tmp_path / 'missing'))
+
+    pipeline_codec.build_codec(['A01'], std_info, str(tmp_path / 'codec'))
+    pipeline_codec._codecs.clear()
+
+    assert pipeline_codec.get_codec(str(tmp_path / 'codec')).diseases.tolist() == ['A01']
+
+
+def test_get_codec_is_cached_per_directory(tmp_path, std_info):
+
+    first = pipeline_codec.build_codec(['A01'], std_info, str(tmp_path / 'first'))
+    second = pipeline_codec.build_codec(['A01', 'B02'], std_info, str(tmp_path / 'second'))
+    pipeline_codec._codecs.clear()
+
+    assert pipeline_codec.get_codec(str(tmp_path / 'first')).diseases.tolist() == ['A01']
+    assert pipeline_codec.get_codec(str(tmp_path / 'second')).diseases.tolist() == ['A01', 'B02']
+    assert pipeline_codec.get_codec(str(tmp_path / 'first')) is pipeline_codec.get_codec(str(tmp_path / 'first') + '/')
+    assert first is not second